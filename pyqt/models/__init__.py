@@ -63,10 +63,11 @@ class Model:
             # Update the settings model
             self.settings_model.update_settings(settings)
 
-            # Save to JSON file
+            # Save to JSON file, keeping settings that are not edited in the UI
             json_file_path = "pyqt/settings.json"
             from utils.json_manipulation import save_json
-            save_json(settings, path=json_file_path)
+            save_json(self.settings_model.get_all_settings(),
+                      path=json_file_path)
             print("Settings saved successfully")
             return True
         return False
@@ -7,6 +7,34 @@ class SettingModel:
         self.report_output_path = "reports"
         self.recursive_folder_search = False
         self.threshold = 0.7
+        self.batch_size = 8
+        self.decode_workers = 4
+        self.write_workers = 2
+        self.execution_mode = "threaded"
+        self.num_workers = 0
+        self.motion_gating = False
+        self.motion_threshold = 0.002
+        self.sampling_mode = "all"
+        self.frame_stride = 5
+        self.target_fps = 2.0
+        self.fill_mode = "hold"
+        self.parquet_output = False
+        self.sqlite_output = False
+        self.resume_predictions = False
+        self.use_result_cache = True
+        self.keep_raw_predictions = False
+        self.raw_threshold_floor = 0.05
+        self.tiled_inference = "off"
+        self.tile_size = 640
+        self.tile_overlap = 0.2
+        self.tile_merge = "nms"
+        self.tile_fallback_threshold = 0.5
+        self.cascade_filter = False
+        self.cascade_screen_size = 320
+        self.cascade_screen_threshold = 0.1
+        self.sequence_grouping = False
+        self.sequence_gap_seconds = 10.0
+        self.sequence_ambiguity_floor = 0.25
 
     def set_general_settings(self, json_file):
         self.theme = json_file.get("theme", self.theme)
@@ -17,6 +45,50 @@ class SettingModel:
         self.recursive_folder_search = json_file.get(
             "recursive_folder_search", self.recursive_folder_search)
         self.threshold = json_file.get("threshold", self.threshold)
+        self.batch_size = json_file.get("batch_size", self.batch_size)
+        self.decode_workers = json_file.get(
+            "decode_workers", self.decode_workers)
+        self.write_workers = json_file.get("write_workers", self.write_workers)
+        self.execution_mode = json_file.get(
+            "execution_mode", self.execution_mode)
+        self.num_workers = json_file.get("num_workers", self.num_workers)
+        self.motion_gating = json_file.get("motion_gating", self.motion_gating)
+        self.motion_threshold = json_file.get(
+            "motion_threshold", self.motion_threshold)
+        self.sampling_mode = json_file.get("sampling_mode", self.sampling_mode)
+        self.frame_stride = json_file.get("frame_stride", self.frame_stride)
+        self.target_fps = json_file.get("target_fps", self.target_fps)
+        self.fill_mode = json_file.get("fill_mode", self.fill_mode)
+        self.parquet_output = json_file.get(
+            "parquet_output", self.parquet_output)
+        self.sqlite_output = json_file.get("sqlite_output", self.sqlite_output)
+        self.resume_predictions = json_file.get(
+            "resume_predictions", self.resume_predictions)
+        self.use_result_cache = json_file.get(
+            "use_result_cache", self.use_result_cache)
+        self.keep_raw_predictions = json_file.get(
+            "keep_raw_predictions", self.keep_raw_predictions)
+        self.raw_threshold_floor = json_file.get(
+            "raw_threshold_floor", self.raw_threshold_floor)
+        self.tiled_inference = json_file.get(
+            "tiled_inference", self.tiled_inference)
+        self.tile_size = json_file.get("tile_size", self.tile_size)
+        self.tile_overlap = json_file.get("tile_overlap", self.tile_overlap)
+        self.tile_merge = json_file.get("tile_merge", self.tile_merge)
+        self.tile_fallback_threshold = json_file.get(
+            "tile_fallback_threshold", self.tile_fallback_threshold)
+        self.cascade_filter = json_file.get(
+            "cascade_filter", self.cascade_filter)
+        self.cascade_screen_size = json_file.get(
+            "cascade_screen_size", self.cascade_screen_size)
+        self.cascade_screen_threshold = json_file.get(
+            "cascade_screen_threshold", self.cascade_screen_threshold)
+        self.sequence_grouping = json_file.get(
+            "sequence_grouping", self.sequence_grouping)
+        self.sequence_gap_seconds = json_file.get(
+            "sequence_gap_seconds", self.sequence_gap_seconds)
+        self.sequence_ambiguity_floor = json_file.get(
+            "sequence_ambiguity_floor", self.sequence_ambiguity_floor)
 
     def get_all_settings(self):
         """Get all current settings as a dictionary"""
@@ -25,7 +97,35 @@ class SettingModel:
             "media_output_path": self.media_output_path,
             "report_output_path": self.report_output_path,
             "recursive_folder_search": self.recursive_folder_search,
-            "threshold": self.threshold
+            "threshold": self.threshold,
+            "batch_size": self.batch_size,
+            "decode_workers": self.decode_workers,
+            "write_workers": self.write_workers,
+            "execution_mode": self.execution_mode,
+            "num_workers": self.num_workers,
+            "motion_gating": self.motion_gating,
+            "motion_threshold": self.motion_threshold,
+            "sampling_mode": self.sampling_mode,
+            "frame_stride": self.frame_stride,
+            "target_fps": self.target_fps,
+            "fill_mode": self.fill_mode,
+            "parquet_output": self.parquet_output,
+            "sqlite_output": self.sqlite_output,
+            "resume_predictions": self.resume_predictions,
+            "use_result_cache": self.use_result_cache,
+            "keep_raw_predictions": self.keep_raw_predictions,
+            "raw_threshold_floor": self.raw_threshold_floor,
+            "tiled_inference": self.tiled_inference,
+            "tile_size": self.tile_size,
+            "tile_overlap": self.tile_overlap,
+            "tile_merge": self.tile_merge,
+            "tile_fallback_threshold": self.tile_fallback_threshold,
+            "cascade_filter": self.cascade_filter,
+            "cascade_screen_size": self.cascade_screen_size,
+            "cascade_screen_threshold": self.cascade_screen_threshold,
+            "sequence_grouping": self.sequence_grouping,
+            "sequence_gap_seconds": self.sequence_gap_seconds,
+            "sequence_ambiguity_floor": self.sequence_ambiguity_floor
         }
 
     def update_settings(self, settings_dict):
@@ -1,7 +1,16 @@
+import json
+
 import cv2
+import torch
 
 from ultralytics import YOLO
 
+from utils.letterbox import LetterboxBuffer, letterbox_geometry, unletterbox_boxes
+from utils.tiling import (MERGE_METHODS, TILING_MODES, merge_detections,
+                          offset_detections, tile_grid)
+from utils.render import (BOX_COLOR, BOX_THICKNESS, LABEL_FONT_SCALE,
+                          LABEL_THICKNESS, draw_detections)
+
 
 class ObjectDetector:
     def __init__(self, result=None, model_path='yolov8n.pt'):
@@ -9,6 +18,25 @@ class ObjectDetector:
             self.result = result
             self.x1, self.y1, self.x2, self.y2, self.score, self.class_id = result
         self.threshold = 0.5
+        # Confidence floor inference runs at when low-confidence predictions
+        # are kept, None runs at the threshold
+        self.raw_threshold = None
+        self.model_path = model_path
+        self.batch_size = 8
+        # Square model input; frames are letterboxed into a reused buffer
+        self.input_size = 640
+        self._input_buffer = LetterboxBuffer(self.input_size)
+        # Tiled inference for high-resolution stills, see set_tiling()
+        self.tiling_mode = 'off'
+        self.tile_size = 640
+        self.tile_overlap = 0.2
+        self.tile_merge = 'nms'
+        self.tile_fallback_threshold = 0.5
+        # Cascade: a low-resolution pass that screens out empty frames
+        # before full detection, see set_cascade()
+        self.screen_size = None
+        self.screen_threshold = 0.1
+        self._screen_buffer = None
         # self.model = YOLO("yolov8n.pt")  # pre trained by yolo
         self.model = YOLO(model_path)
         # self.class_dict = self.model.names
@@ -26,21 +54,228 @@ class ObjectDetector:
     def set_threshold(self, threshold):
         self.threshold = threshold
 
+    def set_batch_size(self, batch_size):
+        self.batch_size = max(1, int(batch_size))
+
+    def set_raw_threshold(self, raw_threshold):
+        """Keep predictions down to raw_threshold, or only those above the threshold with None."""
+        self.raw_threshold = raw_threshold
+
+    def set_tiling(self, mode, tile_size=640, overlap=0.2, merge='nms',
+                   fallback_threshold=0.5):
+        """
+        Configure tiled inference.
+
+        Args:
+            mode (str): 'off', 'always' to add a tiled pass to every image, or
+                'fallback' to tile only images where the full-frame pass found
+                nothing at fallback_threshold
+            tile_size (int): Tile width and height in original image pixels
+            overlap (float): Fraction of a tile shared with its neighbours
+            merge (str): 'nms' or 'wbf', see tiling.merge_detections()
+            fallback_threshold (float): Confidence a full-frame box needs to
+                skip tiling under 'fallback'. It is fixed rather than the
+                detection threshold, so cached and raw predictions can be
+                filtered to another threshold
+        """
+        if mode not in TILING_MODES:
+            raise ValueError(f"Unknown tiling mode: {mode}")
+        if merge not in MERGE_METHODS:
+            raise ValueError(f"Unknown tile merge method: {merge}")
+        self.tiling_mode = mode
+        self.tile_size = max(32, int(tile_size))
+        self.tile_overlap = overlap
+        self.tile_merge = merge
+        self.tile_fallback_threshold = fallback_threshold
+
+    def set_cascade(self, screen_size=None, screen_threshold=0.1):
+        """
+        Configure the empty-frame screening stage.
+
+        Args:
+            screen_size (int, optional): Input size of the screening pass,
+                None disables the cascade
+            screen_threshold (float): Confidence a screening box needs for the
+                frame to go on to full detection
+        """
+        if screen_size:
+            # Model inputs must be a multiple of the 32 px network stride
+            self.screen_size = max(32, int(screen_size) // 32 * 32)
+            self._screen_buffer = LetterboxBuffer(self.screen_size)
+        else:
+            self.screen_size = None
+            self._screen_buffer = None
+        self.screen_threshold = screen_threshold
+
+    @property
+    def cascade_enabled(self):
+        return self.screen_size is not None
+
+    @property
+    def cache_options(self):
+        """Tiling and cascade settings that change the detections, '' when both are off"""
+        options = {}
+        if self.tiling_mode != 'off':
+            options.update({
+                'tiling_mode': self.tiling_mode,
+                'tile_size': self.tile_size,
+                'tile_overlap': self.tile_overlap,
+                'tile_merge': self.tile_merge
+            })
+            if self.tiling_mode == 'fallback':
+                options['tile_fallback_threshold'] = self.tile_fallback_threshold
+        if self.cascade_enabled:
+            options.update({
+                'screen_size': self.screen_size,
+                'screen_threshold': self.screen_threshold
+            })
+        return json.dumps(options, sort_keys=True) if options else ""
+
+    @property
+    def inference_threshold(self):
+        """Confidence threshold passed to YOLO"""
+        if self.raw_threshold is None:
+            return self.threshold
+        return min(self.threshold, self.raw_threshold)
+
     # def set_class_dict(self, class_dict):
     #     self.class_dict = class_dict
 
     def detect(self, image):
-        # Run YOLO detection with our confidence threshold
-        results = self.model(image, conf=self.threshold)[0]
+        # Run YOLO detection with our confidence threshold, or the lower floor
+        # when low-confidence predictions are kept
+        return self.detect_batch([image])[0]
+
+    def detect_batch(self, images):
+        """
+        Run YOLO detection on a list of images, batch_size images per forward pass.
+
+        Images are passed at their original size. Each batch is letterboxed
+        into a reused input buffer and handed to the model as a tensor, so
+        YOLO does not resize it again; extract_detections() maps the boxes back.
+
+        Returns:
+            List of results, one per input image and in the same order
+        """
+        results = []
+        for start in range(0, len(images), self.batch_size):
+            batch, _ = self._input_buffer.fill(images[start:start + self.batch_size])
+            results.extend(self.model(self._to_tensor(batch),
+                                      conf=self.inference_threshold))
         return results
 
+    def screen_batch(self, images):
+        """
+        Run the cheap screening pass of the cascade on a list of images.
+
+        The images are letterboxed to screen_size and run at screen_threshold,
+        batch_size images per forward pass.
+
+        Returns:
+            List of booleans, True for images that may contain an object and
+            need full detection. All True when the cascade is disabled.
+        """
+        if not self.cascade_enabled:
+            return [True] * len(images)
+
+        non_empty = []
+        for start in range(0, len(images), self.batch_size):
+            batch, _ = self._screen_buffer.fill(images[start:start + self.batch_size])
+            for results in self.model(self._to_tensor(batch), conf=self.screen_threshold):
+                non_empty.append(results.boxes is not None and len(results.boxes) > 0)
+        return non_empty
+
+    def detect_tiles(self, image, detections):
+        """
+        Add a tiled pass to the full-frame detections of an image.
+
+        The image is cut into overlapping tiles at its original resolution,
+        which are run through the model as one batch, so small or distant
+        objects are not lost to downscaling. Tile detections are merged with
+        the full-frame ones across tile borders.
+
+        Args:
+            image: Original BGR image
+            detections (list): Raw detections of the full-frame pass
+
+        Returns:
+            The merged detections, or the full-frame detections when tiling is
+            off, not needed under the 'fallback' mode, or the image fits in a tile
+        """
+        if self.tiling_mode == 'off':
+            return detections
+        if self.tiling_mode == 'fallback' and any(
+                detection['confidence'] >= self.tile_fallback_threshold
+                for detection in detections):
+            return detections
+
+        height, width = image.shape[:2]
+        tiles = tile_grid(width, height, self.tile_size, self.tile_overlap)
+        if not tiles:
+            return detections
+
+        tile_results = self.detect_batch(
+            [image[y:y + tile_height, x:x + tile_width]
+             for x, y, tile_width, tile_height in tiles])
+
+        tiled_detections = list(detections)
+        for (x, y, tile_width, tile_height), results in zip(tiles, tile_results):
+            tiled_detections.extend(offset_detections(
+                self.extract_detections(results, tile_width, tile_height), x, y))
+        return merge_detections(tiled_detections, self.tile_merge)
+
+    @staticmethod
+    def _to_tensor(batch):
+        """Convert a BGR uint8 NHWC batch into the RGB float NCHW tensor YOLO expects."""
+        return torch.from_numpy(batch).flip(-1).permute(0, 3, 1, 2).float().div_(255)
+
+    def extract_detections(self, results, original_width, original_height, input_size=None):
+        """
+        Convert YOLO results from the letterboxed input frame into detection
+        dicts in original image coordinates, as expected by the CSV logger.
+
+        All predictions down to inference_threshold are returned, filter them
+        with result_cache.filter_detections() for the threshold.
+        """
+        detections = []
+        if results.boxes is None or len(results.boxes) == 0:
+            return detections
+
+        data = results.boxes.data.cpu().numpy()
+        boxes = unletterbox_boxes(
+            data[:, :4],
+            letterbox_geometry(original_width, original_height,
+                               input_size or self.input_size),
+            original_width, original_height)
+
+        for (x1_orig, y1_orig, x2_orig, y2_orig), confidence, class_id in zip(
+                boxes.tolist(), data[:, 4].tolist(), data[:, 5].astype(int).tolist()):
+            detections.append({
+                'class': self.model.names[class_id],
+                'confidence': confidence,
+                'bbox': {
+                    'x_center': (x1_orig + x2_orig) / 2,
+                    'y_center': (y1_orig + y2_orig) / 2,
+                    'width': x2_orig - x1_orig,
+                    'height': y2_orig - y1_orig
+                }
+            })
+        return detections
+
     def process_results(self, image, results):
-        self.set_image(image)
-        for result in results.boxes.data.tolist():
-            self.set_result(result)
-            self.draw_bounding_box()
+        """Draw the detections above the threshold onto the original image."""
+        height, width = image.shape[:2]
+        # Low-confidence predictions are kept for the raw output only
+        detections = [detection for detection in
+                      self.extract_detections(results, width, height)
+                      if detection['confidence'] >= self.threshold]
+        self.set_image(draw_detections(image, detections))
         return self.image
 
+    def draw_detections(self, image, detections):
+        """Draw detection dicts (original image coordinates) onto an image."""
+        return draw_detections(image, detections)
+
     def draw_bounding_box(self, image=None):
         if image:
             self.set_image(image)
@@ -49,7 +284,7 @@ class ObjectDetector:
 
     def draw_rectangle(self):
         cv2.rectangle(self.image, (int(self.x1), int(self.y1)),
-                      (int(self.x2), int(self.y2)), (0, 255, 0), 4)
+                      (int(self.x2), int(self.y2)), BOX_COLOR, BOX_THICKNESS)
 
     def draw_text(self):
         cv2.putText(
@@ -57,8 +292,8 @@ class ObjectDetector:
             self.model.names[int(self.class_id)].upper(),
             (int(self.x1), int(self.y1 - 10)),
             cv2.FONT_HERSHEY_SIMPLEX,
-            1.3,
-            (0, 255, 0),
-            3,
+            LABEL_FONT_SCALE,
+            BOX_COLOR,
+            LABEL_THICKNESS,
             cv2.LINE_AA
         )
@@ -1,23 +1,35 @@
+import multiprocessing
 import os
+import shutil
 import cv2
+import functools
 import time
+import torch
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Optional, List
 
 from object_detector import ObjectDetector
 from utils.csv_logger import DetectionCSVLogger
+from utils.pipeline import StageBacklog
+from utils.result_cache import ResultCache, filter_detections
 
 
-def label_image(name: str,
-                folder_path,
-                folder_path_output="/output",
-                detector: ObjectDetector = ObjectDetector(),
-                csv_logger: Optional[DetectionCSVLogger] = None
-                ) -> Dict[str, Any]:
+def _load_image(name: str, folder_path: str, folder_path_output: str,
+                detector: Optional[ObjectDetector] = None,
+                result_cache: Optional[ResultCache] = None) -> Dict[str, Any]:
     """
-    Process a single image and optionally log detections to CSV.
+    Read an image from disk. It is kept at its original size: the detector
+    letterboxes it into the model input and the detections are drawn onto it.
+
+    With a result_cache (and the detector it is keyed on), the image is
+    looked up by its contents first. A cached image is not sent to the model:
+    its output is drawn from the cached detections, and the returned dict has
+    'cached' set and carries the detections instead of the image.
 
     Returns:
-        Dict with processing results including detection data for CSV logging
+        Dict with the image, paths and original dimensions, or a
+        failure result if the file could not be read
     """
     image_path = folder_path.replace("\\", "/") + "/" + name
     image_path_out = folder_path_output.replace("\\", "/") + "/" + name
@@ -27,6 +39,15 @@ def label_image(name: str,
     os.makedirs(output_dir, exist_ok=True)
 
     start_time = time.time()
+    content_hash = None
+    if result_cache is not None and detector is not None:
+        content_hash, cached = result_cache.lookup(
+            image_path, detector.model_path, detector.inference_threshold,
+            options=detector.cache_options)
+        if cached is not None:
+            return _reuse_cached_image(cached, image_path, image_path_out,
+                                       detector, start_time)
+
     img = cv2.imread(image_path)
 
     if img is None:
@@ -38,78 +59,312 @@ def label_image(name: str,
             'processing_time_ms': 0
         }
 
-    original_img = img.copy()
     original_height, original_width = img.shape[:2]
-    img = cv2.resize(img, (640, 640))  # Resize image to model input size
 
-    # Detect objects
-    results = detector.detect(img)
-
-    # Extract detection data for CSV logging
-    # Note: YOLO already filtered by threshold in detector.detect()
-    detections = []
-    if results.boxes is not None and len(results.boxes) > 0:
-        for box_data in results.boxes.data.tolist():
-            x1, y1, x2, y2, confidence, class_id = box_data
-
-            # Convert to original image coordinates
-            x1_orig = (x1 / 640) * original_width
-            y1_orig = (y1 / 640) * original_height
-            x2_orig = (x2 / 640) * original_width
-            y2_orig = (y2 / 640) * original_height
-
-            # Calculate center and dimensions
-            x_center = (x1_orig + x2_orig) / 2
-            y_center = (y1_orig + y2_orig) / 2
-            width = x2_orig - x1_orig
-            height = y2_orig - y1_orig
-
-            detection = {
-                'class': detector.model.names[int(class_id)],
-                'confidence': confidence,
-                'bbox': {
-                    'x_center': x_center,
-                    'y_center': y_center,
-                    'width': width,
-                    'height': height
-                }
+    return {
+        'success': True,
+        'image': img,
+        'image_path': image_path,
+        'image_path_out': image_path_out,
+        'original_width': original_width,
+        'original_height': original_height,
+        'load_time_ms': (time.time() - start_time) * 1000,
+        'content_hash': content_hash
+    }
+
+
+def _reuse_cached_image(cached: Dict[str, Any], image_path: str, image_path_out: str,
+                        detector: ObjectDetector, start_time: float) -> Dict[str, Any]:
+    """
+    Produce the output of an image from its cached result, without inference.
+
+    The output is always drawn again from the cached detections, as the
+    annotated file of an earlier run may have been overwritten since (camera
+    file names repeat across folders). An image the cascade screened out is
+    copied, as when it was first processed.
+    """
+    raw_detections = filter_detections(
+        cached['detections'], detector.inference_threshold)
+    detections = filter_detections(raw_detections, detector.threshold)
+
+    if cached.get('stage') == "screen":
+        if os.path.abspath(image_path) != os.path.abspath(image_path_out):
+            shutil.copyfile(image_path, image_path_out)
+    else:
+        img = cv2.imread(image_path)
+        if img is None:
+            print(f"Error reading image file: {image_path}")
+            return {
+                'success': False,
+                'message': f'Error reading image file: {image_path}',
+                'detections': [],
+                'processing_time_ms': 0
             }
-            detections.append(detection)
+        if not cv2.imwrite(image_path_out, detector.draw_detections(img, detections)):
+            return _write_failure(image_path_out)
+
+    return {
+        'success': True,
+        'cached': True,
+        'detections': detections,
+        'raw_detections': raw_detections,
+        'image_path': image_path,
+        'image_path_out': image_path_out,
+        'original_width': cached['width'],
+        'original_height': cached['height'],
+        'stage': cached.get('stage', ""),
+        'load_time_ms': (time.time() - start_time) * 1000
+    }
 
-    # Process and draw results
-    img = detector.process_results(img, results)
 
-    # Save processed image
-    cv2.imwrite(image_path_out, img)
+def _write_image_file(path: str, img, on_written=None,
+                      source: Optional[str] = None) -> bool:
+    """
+    Write an image file, then call on_written if it succeeded. With a
+    source, the image is unchanged and that file is copied instead.
+    """
+    if source:
+        shutil.copyfile(source, path)
+        written = True
+    else:
+        written = cv2.imwrite(path, img)
+    if written and on_written:
+        on_written()
+    return written
+
+
+def _write_failure(path: str) -> Dict[str, Any]:
+    """Failure result of an image whose output file could not be written."""
+    print(f"Error writing image file: {path}")
+    return {
+        'success': False,
+        'message': f'Error writing image file: {path}',
+        'detections': [],
+        'processing_time_ms': 0
+    }
 
-    processing_time_ms = (time.time() - start_time) * 1000
+
+def _log_image(loaded: Dict[str, Any],
+               detections: List[Dict[str, Any]],
+               detector: ObjectDetector,
+               csv_logger: Optional[DetectionCSVLogger],
+               processing_time_ms: float,
+               raw_detections: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """
+    Log the detections of a finished image to CSV, and its raw predictions
+    (down to the inference floor) to the logger's sidecar. The image is not
+    marked completed here, see _mark_completed().
+
+    Returns:
+        Dict with processing results including detection data for CSV logging
+    """
+    image_path = loaded['image_path']
+    image_dimensions = (loaded['original_width'], loaded['original_height'])
+    stage = loaded.get('stage', "")
 
     # Log to CSV if logger is provided
     if csv_logger:
         csv_logger.log_detections(
             file_path=image_path,
             detections=detections,
-            image_dimensions=(original_width, original_height),
+            image_dimensions=image_dimensions,
             processing_time_ms=processing_time_ms,
             model_version=getattr(detector.model, 'version', '1.0'),
-            detection_threshold=detector.threshold
+            detection_threshold=detector.threshold,
+            stage=stage
         )
-
-    cv2.destroyAllWindows()
+        if raw_detections is not None:
+            csv_logger.log_raw_detections(
+                image_path, loaded['image_path_out'], raw_detections,
+                image_dimensions=image_dimensions, status=stage)
 
     return {
         'success': True,
-        'message': f'Image saved on {image_path_out}',
+        'message': f"Image saved on {loaded['image_path_out']}",
         'detections': detections,
+        'raw_detections': raw_detections,
         'processing_time_ms': processing_time_ms,
-        'output_path': image_path_out
+        'output_path': loaded['image_path_out'],
+        'file_path': image_path,
+        'image_dimensions': image_dimensions,
+        'stage': stage,
+        'cached': loaded.get('cached', False)
     }
 
 
+def _mark_completed(result: Dict[str, Any],
+                    csv_logger: Optional[DetectionCSVLogger]) -> Dict[str, Any]:
+    """
+    Checkpoint a logged image in the run manifest. Only call this once its
+    output file is written, a resumed run never processes it again.
+    """
+    if csv_logger:
+        csv_logger.mark_completed(result['file_path'])
+    return result
+
+
+def _finish_cached_image(loaded: Dict[str, Any],
+                         detector: ObjectDetector,
+                         csv_logger: Optional[DetectionCSVLogger] = None
+                         ) -> Dict[str, Any]:
+    """
+    Log an image that was answered from the result cache. Its output was
+    already written while it was loaded.
+    """
+    return _mark_completed(
+        _log_image(loaded, loaded['detections'], detector, csv_logger,
+                   loaded['load_time_ms'], loaded['raw_detections']),
+        csv_logger)
+
+
+def _finish_image(loaded: Dict[str, Any],
+                  results,
+                  detector: ObjectDetector,
+                  csv_logger: Optional[DetectionCSVLogger] = None,
+                  inference_time_ms: float = 0,
+                  write_image=None,
+                  result_cache: Optional[ResultCache] = None
+                  ) -> Dict[str, Any]:
+    """
+    Draw the detections of a loaded image, save it and log it to CSV.
+
+    The image is only logged once its output file is written; an image whose
+    write fails is returned as a failure and is not logged or cached.
+
+    If write_image is given, it is called with the output path, the
+    annotated image, a callback to run once the file is written, the file
+    to copy instead when the image is unchanged and a finish callback,
+    instead of writing the file synchronously. The caller passes whether
+    the write succeeded to finish, which logs the image and returns its
+    result; _finish_image itself returns None then. With a result_cache,
+    the detections are stored under the image's content hash once the
+    output is written.
+
+    results is None for an image the cascade screened out as empty: it is
+    logged without detections and its output is a copy of the input.
+
+    Returns:
+        Dict with processing results including detection data for CSV
+        logging, None with write_image
+    """
+    start_time = time.time()
+    image_path_out = loaded['image_path_out']
+    original_width = loaded['original_width']
+    original_height = loaded['original_height']
+
+    if results is None:
+        loaded['stage'] = "screen"
+        raw_detections = []
+        img = loaded['image']
+        source = loaded['image_path']
+    else:
+        if detector.cascade_enabled:
+            loaded['stage'] = "detect"
+        # Extract detection data for CSV logging
+        # Note: YOLO already filtered by the inference threshold in detector.detect(),
+        # which is below the threshold when low-confidence predictions are kept
+        raw_detections = detector.extract_detections(
+            results, original_width, original_height)
+        # Tiled pass at full resolution for small objects, when enabled
+        raw_detections = detector.detect_tiles(loaded['image'], raw_detections)
+        source = None
+    detections = filter_detections(raw_detections, detector.threshold)
+
+    # Draw the results on the original image
+    if source is None:
+        img = detector.draw_detections(loaded['image'], detections)
+
+    # Cache the detections once the annotated image is written, so a copy
+    # of this image can reuse them
+    on_written = None
+    if result_cache is not None and loaded.get('content_hash'):
+        on_written = functools.partial(
+            result_cache.store, loaded['content_hash'], detector.model_path,
+            detector.inference_threshold, 'image', {
+                'width': original_width,
+                'height': original_height,
+                'detections': raw_detections,
+                'stage': loaded.get('stage', "")
+            }, options=detector.cache_options)
+
+    processing_time_ms = loaded['load_time_ms'] + inference_time_ms + \
+        (time.time() - start_time) * 1000
+
+    def finish(written):
+        if not written:
+            return _write_failure(image_path_out)
+        return _mark_completed(
+            _log_image(loaded, detections, detector, csv_logger,
+                       processing_time_ms, raw_detections),
+            csv_logger)
+
+    # Save processed image
+    if write_image:
+        write_image(image_path_out, img, on_written, source, finish)
+        return None
+    return finish(_write_image_file(image_path_out, img, on_written, source))
+
+
+def _detect_screened(detector: ObjectDetector, images: list) -> list:
+    """
+    Run full detection on the images the cascade's screening pass keeps.
+
+    Returns:
+        List of results in input order, None for images screened out as empty
+    """
+    keep = detector.screen_batch(images)
+    detected = iter(detector.detect_batch(
+        [image for image, kept in zip(images, keep) if kept]))
+    return [next(detected) if kept else None for kept in keep]
+
+
+def label_image(name: str,
+                folder_path,
+                folder_path_output="/output",
+                detector: Optional[ObjectDetector] = None,
+                csv_logger: Optional[DetectionCSVLogger] = None,
+                result_cache: Optional[ResultCache] = None
+                ) -> Dict[str, Any]:
+    """
+    Process a single image and optionally log detections to CSV.
+
+    With a result_cache, an image whose contents were processed before with
+    the same model is answered from the cache without running the model.
+
+    Returns:
+        Dict with processing results including detection data for CSV logging
+    """
+    if detector is None:
+        detector = ObjectDetector()
+
+    loaded = _load_image(name, folder_path, folder_path_output,
+                         detector, result_cache)
+    if not loaded['success']:
+        return loaded
+    if loaded.get('cached'):
+        return _finish_cached_image(loaded, detector, csv_logger)
+
+    # Detect objects
+    start_time = time.time()
+    results = _detect_screened(detector, [loaded['image']])[0]
+    inference_time_ms = (time.time() - start_time) * 1000
+
+    result = _finish_image(loaded, results, detector,
+                           csv_logger, inference_time_ms,
+                           result_cache=result_cache)
+
+    cv2.destroyAllWindows()
+
+    return result
+
+
 def label_multiple_images(names: list[str],
                           folder_path,
                           folder_path_output="/output",
-                          detector: ObjectDetector = ObjectDetector()) -> None:
+                          detector: Optional[ObjectDetector] = None) -> None:
+    if detector is None:
+        detector = ObjectDetector()
+
     for name in names:
         label_image(name=name, detector=detector, folder_path=folder_path,
                     folder_path_output=folder_path_output)
@@ -117,17 +372,40 @@ def label_multiple_images(names: list[str],
 
 def label_all_images(folder_path: str,
                      folder_path_output: str = "/output",
-                     detector: ObjectDetector = ObjectDetector(),
+                     detector: Optional[ObjectDetector] = None,
                      csv_logger: Optional[DetectionCSVLogger] = None,
                      progress_callback=None,
-                     file_list: Optional[List[str]] = None
+                     file_list: Optional[List[str]] = None,
+                     decode_workers: int = 4,
+                     write_workers: int = 2,
+                     result_cache: Optional[ResultCache] = None,
+                     result_callback=None,
+                     log_summary: bool = True
                      ) -> Dict[str, Any]:
     """
     Process all images in a folder and optionally log detections to CSV.
 
+    Files go through a bounded pipeline: a pool of decoder threads reads
+    upcoming images, a single inference stage letterboxes them into the
+    model input and runs them through the model in batches, and a pool of writer threads encodes and saves the
+    annotated images. With a result_cache, the decoder threads answer images
+    processed before from the cache and those skip the inference stage. With
+    the detector's cascade enabled, each batch is screened at low resolution
+    first and only the images that may contain an object are run through
+    full detection; the others are logged as NO_DETECTION with stage "screen".
+    Files are logged in order once their output is written, a file whose
+    output cannot be written, or that raised in any stage, counts as failed.
+
+    result_callback, if given, is called with the name and result dict of
+    each file once it is logged, or with a failure result. With log_summary disabled, the caller logs
+    the session summary.
+
     Returns:
         Dict with summary of processing results
     """
+    if detector is None:
+        detector = ObjectDetector()
+
     start_session_time = time.time()
     session_start_timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
 
@@ -144,39 +422,419 @@ def label_all_images(folder_path: str,
     total_processing_time = 0
     successful_files = 0
     failed_files = 0
+    cached_files = 0
+    screened_files = 0
+
+    def record(name, result):
+        nonlocal successful_files, failed_files, total_detections, total_processing_time, cached_files, screened_files
+        if result['success']:
+            successful_files += 1
+            cached_files += result.get('cached', False)
+            screened_files += result.get('stage') == "screen"
+            total_detections += len(result['detections'])
+            total_processing_time += result['processing_time_ms']
+        else:
+            failed_files += 1
+            print(f"Failed to process {name}: {result['message']}")
+        if result_callback:
+            result_callback(name, result)
+
+    batch_size = detector.batch_size
+    decode_workers = max(1, decode_workers)
+    write_workers = max(1, write_workers)
+    max_decode_backlog = max(2 * batch_size, 2 * decode_workers)
+    max_write_backlog = max(batch_size, 2 * write_workers)
+
+    backlog = StageBacklog(('decode', 'infer', 'write'))
+    write_errors = 0
+    pending_decodes = deque()
+    pending_writes = deque()
+    queued_names = iter(enumerate(image_names))
+
+    decode_pool = ThreadPoolExecutor(
+        max_workers=decode_workers, thread_name_prefix='image-decode')
+    write_pool = ThreadPoolExecutor(
+        max_workers=write_workers, thread_name_prefix='image-write')
+
+    def fill_decode_queue():
+        # Keep the decoders busy on upcoming files, up to the backlog limit
+        while len(pending_decodes) < max_decode_backlog:
+            queued = next(queued_names, None)
+            if queued is None:
+                return
+            index, name = queued
+            pending_decodes.append((index, name, decode_pool.submit(
+                _load_image, name, folder_path, folder_path_output,
+                detector, result_cache)))
+
+    def wait_for_write(name, path, future, finish):
+        # Files are logged in queue order, once their output is written
+        nonlocal write_errors
+        written = True
+        if future is not None:
+            try:
+                written = future.result()
+            except Exception as e:
+                written = False
+                print(f"Error writing image file {path}: {e}")
+            write_errors += not written
+        try:
+            result = finish(written)
+        except Exception as e:
+            result = {'success': False,
+                      'message': f'Error processing {name}: {e}'}
+        record(name, result)
+
+    def queue_failure(name, message):
+        # Failed files are reported in queue order too
+        result = {'success': False, 'message': message}
+        queue_result(name, lambda written: result)
+
+    def queue_result(name, finish, path=None, future=None):
+        # Block the inference stage only when the writers fall behind
+        while len(pending_writes) >= max_write_backlog:
+            wait_for_write(*pending_writes.popleft())
+        pending_writes.append((name, path, future, finish))
+
+    def write_image(name, path, img, on_written=None, source=None, finish=None):
+        queue_result(name, finish, path, write_pool.submit(
+            _write_image_file, path, img, on_written, source))
+
+    try:
+        fill_decode_queue()
+
+        batch_number = 0
+        while pending_decodes:
+            batch = []
+            while pending_decodes and len(batch) < batch_size:
+                index, name, future = pending_decodes.popleft()
+                fill_decode_queue()
+                try:
+                    # Update progress if callback provided
+                    if progress_callback:
+                        # Pass the file index and filename to the callback
+                        progress_callback(index, name)
+
+                    loaded = future.result()
+                    if loaded['success'] and loaded.get('cached'):
+                        # The decoder already drew the output from the cache
+                        queue_result(name, lambda written, loaded=loaded:
+                                     _finish_cached_image(loaded, detector, csv_logger))
+                    elif loaded['success']:
+                        batch.append((name, loaded))
+                    else:
+                        queue_result(name, lambda written, loaded=loaded: loaded)
+
+                except Exception as e:
+                    queue_failure(name, f'Error processing {name}: {e}')
+
+            backlog.sample(
+                decode=sum(not future.done()
+                           for _, _, future in pending_decodes),
+                infer=sum(future.done() for _, _, future in pending_decodes),
+                write=len(pending_writes))
+
+            if not batch:
+                continue
+
+            try:
+                start_time = time.time()
+                batch_results = _detect_screened(
+                    detector, [loaded['image'] for _, loaded in batch])
+                inference_time_ms = (time.time() - start_time) * \
+                    1000 / len(batch)
+            except Exception as e:
+                for name, _ in batch:
+                    queue_failure(name, f'Error running detection on batch: {e}')
+                continue
+
+            for (name, loaded), results in zip(batch, batch_results):
+                try:
+                    _finish_image(loaded, results, detector,
+                                  csv_logger, inference_time_ms,
+                                  write_image=functools.partial(write_image, name),
+                                  result_cache=result_cache)
+                except Exception as e:
+                    queue_failure(name, f'Error processing {name}: {e}')
+
+            batch_number += 1
+            if batch_number % 20 == 0:
+                print(f"Pipeline backlog - {backlog}")
+
+        while pending_writes:
+            wait_for_write(*pending_writes.popleft())
+
+    finally:
+        decode_pool.shutdown(wait=True, cancel_futures=True)
+        write_pool.shutdown(wait=True)
+
+    pipeline_backlog = backlog.as_dict()
+
+    session_end_timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
+    total_session_time = (time.time() - start_session_time) * 1000
+
+    # Log session summary to CSV
+    if csv_logger and log_summary:
+        csv_logger.log_session_summary(
+            total_files_processed=len(image_names),
+            total_detections=total_detections,
+            total_processing_time_ms=total_session_time,
+            start_time=session_start_timestamp,
+            end_time=session_end_timestamp,
+            settings_used={
+                'input_folder': folder_path,
+                'media_output_path': folder_path_output,
+                'report_output_path': csv_logger.output_directory if csv_logger else '',
+                'model_threshold': detector.threshold,
+                'successful_files': successful_files,
+                'failed_files': failed_files,
+                'write_errors': write_errors,
+                'cached_files': cached_files,
+                'tiling_mode': detector.tiling_mode,
+                'screened_files': screened_files,
+                'pipeline_backlog': pipeline_backlog['average']
+            }
+        )
+
+    return {
+        'total_files': len(image_names),
+        'successful_files': successful_files,
+        'failed_files': failed_files,
+        'cached_files': cached_files,
+        'screened_files': screened_files,
+        'total_detections': total_detections,
+        'total_processing_time_ms': total_session_time,
+        'pipeline_backlog': pipeline_backlog,
+        'csv_paths': csv_logger.get_csv_paths() if csv_logger else None
+    }
+
+
+# Detector and result cache owned by each worker process of
+# label_all_images_multiprocess
+_worker_detector: Optional[ObjectDetector] = None
+_worker_result_cache: Optional[ResultCache] = None
+
+
+def _init_image_worker(model_path: str, threshold: float, batch_size: int,
+                       torch_threads: int, result_cache_path: Optional[str] = None,
+                       raw_threshold: Optional[float] = None,
+                       tiling: Optional[tuple] = None,
+                       cascade: Optional[tuple] = None) -> None:
+    """Load the YOLO model once per worker process, with capped CPU threads."""
+    global _worker_detector, _worker_result_cache
+
+    # Keep each worker to its share of the cores so they do not oversubscribe
+    torch.set_num_threads(torch_threads)
+    cv2.setNumThreads(1)
 
-    for index, name in enumerate(image_names):
+    _worker_detector = ObjectDetector(model_path=model_path)
+    _worker_detector.set_threshold(threshold)
+    _worker_detector.set_batch_size(batch_size)
+    _worker_detector.set_raw_threshold(raw_threshold)
+    if tiling:
+        _worker_detector.set_tiling(*tiling)
+    if cascade:
+        _worker_detector.set_cascade(*cascade)
+
+    if result_cache_path:
         try:
-            # Update progress if callback provided
-            if progress_callback:
-                # Pass the file index and filename to the callback
-                progress_callback(index, name)
-
-            result = label_image(
-                name,
-                detector=detector,
-                folder_path=folder_path,
-                folder_path_output=folder_path_output,
-                csv_logger=csv_logger
-            )
-
-            if result['success']:
+            _worker_result_cache = ResultCache(result_cache_path)
+        except Exception as e:
+            print(f"Error opening result cache: {e}")
+
+
+def _label_image_shard(shard: tuple) -> List[tuple]:
+    """
+    Process one shard of files inside a worker process.
+
+    Returns:
+        List of (name, result) tuples in shard order. CSV logging is left to
+        the parent process so that rows come out in file order.
+    """
+    names, folder_path, folder_path_output = shard
+    detector = _worker_detector
+    shard_results = []
+
+    for batch_start in range(0, len(names), detector.batch_size):
+        batch = []
+        for name in names[batch_start:batch_start + detector.batch_size]:
+            try:
+                loaded = _load_image(name, folder_path, folder_path_output,
+                                     detector, _worker_result_cache)
+            except Exception as e:
+                loaded = {'success': False,
+                          'message': f'Error processing {name}: {e}'}
+            if loaded['success'] and loaded.get('cached'):
+                result = _finish_cached_image(loaded, detector)
+                result['model_version'] = getattr(
+                    detector.model, 'version', '1.0')
+                shard_results.append((name, result))
+            elif loaded['success']:
+                batch.append((name, loaded))
+            else:
+                shard_results.append((name, loaded))
+
+        if not batch:
+            continue
+
+        try:
+            start_time = time.time()
+            batch_results = _detect_screened(
+                detector, [loaded['image'] for _, loaded in batch])
+            inference_time_ms = (time.time() - start_time) * \
+                1000 / len(batch)
+        except Exception as e:
+            shard_results.extend(
+                (name, {'success': False,
+                        'message': f'Error running detection on batch: {e}'})
+                for name, _ in batch)
+            continue
+
+        for (name, loaded), results in zip(batch, batch_results):
+            try:
+                result = _finish_image(loaded, results, detector,
+                                       inference_time_ms=inference_time_ms,
+                                       result_cache=_worker_result_cache)
+                result['model_version'] = getattr(
+                    detector.model, 'version', '1.0')
+            except Exception as e:
+                result = {'success': False,
+                          'message': f'Error processing {name}: {e}'}
+            shard_results.append((name, result))
+
+    # Keep the original file order within the shard
+    order = {name: i for i, name in enumerate(names)}
+    shard_results.sort(key=lambda item: order[item[0]])
+    return shard_results
+
+
+def label_all_images_multiprocess(folder_path: str,
+                                  folder_path_output: str = "/output",
+                                  detector: Optional[ObjectDetector] = None,
+                                  csv_logger: Optional[DetectionCSVLogger] = None,
+                                  progress_callback=None,
+                                  file_list: Optional[List[str]] = None,
+                                  num_workers: int = 0,
+                                  shard_size: Optional[int] = None,
+                                  result_cache: Optional[ResultCache] = None,
+                                  result_callback=None,
+                                  log_summary: bool = True
+                                  ) -> Dict[str, Any]:
+    """
+    Process all images in a folder on a pool of worker processes.
+
+    Each worker loads its own copy of the model once and handles shards of
+    the file list. Results are merged in file order, so the returned dict
+    and the CSV match what label_all_images produces.
+
+    Args:
+        detector (ObjectDetector, optional): Detector whose model path,
+            threshold and batch size are used by the workers
+        num_workers (int): Number of worker processes, 0 uses all CPU cores
+        shard_size (int, optional): Files per shard, defaults to four batches
+        result_cache (ResultCache, optional): Cache whose database the
+            workers open to skip images processed before
+        result_callback (callable, optional): Called with the name and
+            result dict of each file once it is logged
+        log_summary (bool): Log the session summary, disable when the
+            caller logs its own
+
+    Returns:
+        Dict with summary of processing results
+    """
+    if detector is None:
+        detector = ObjectDetector()
+
+    start_session_time = time.time()
+    session_start_timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
+
+    # Use provided file list or scan folder
+    if file_list is not None:
+        image_names = file_list
+        print(f'Processing {len(image_names)} images from provided list')
+    else:
+        image_names = [f for f in os.listdir(folder_path) if f.lower().endswith(
+            ('.png', '.jpg', '.jpeg', '.gif', ".JPG"))]
+        print(f'Found {len(image_names)} images to process')
+
+    cpu_count = os.cpu_count() or 1
+    if num_workers <= 0:
+        num_workers = cpu_count
+    num_workers = max(1, min(num_workers, len(image_names)))
+    torch_threads = max(1, cpu_count // num_workers)
+    shard_size = shard_size or detector.batch_size * 4
+
+    shards = [(image_names[start:start + shard_size], folder_path, folder_path_output)
+              for start in range(0, len(image_names), shard_size)]
+    print(f'Running {len(shards)} shards on {num_workers} worker processes '
+          f'({torch_threads} threads each)')
+
+    total_detections = 0
+    total_processing_time = 0
+    successful_files = 0
+    failed_files = 0
+    cached_files = 0
+    screened_files = 0
+    index = 0
+
+    # Spawn fresh interpreters: forking a process that holds torch and Qt
+    # state is not safe
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(processes=num_workers,
+                      initializer=_init_image_worker,
+                      initargs=(detector.model_path, detector.threshold,
+                                detector.batch_size, torch_threads,
+                                result_cache.db_path if result_cache else None,
+                                detector.raw_threshold,
+                                (detector.tiling_mode, detector.tile_size,
+                                 detector.tile_overlap, detector.tile_merge,
+                                 detector.tile_fallback_threshold),
+                                (detector.screen_size, detector.screen_threshold))) as pool:
+        # imap keeps shard order, so rows are logged in file order
+        for shard_results in pool.imap(_label_image_shard, shards):
+            for name, result in shard_results:
+                if progress_callback:
+                    progress_callback(index, name)
+                index += 1
+
+                if not result['success']:
+                    failed_files += 1
+                    print(f"Failed to process {name}: {result['message']}")
+                    if result_callback:
+                        result_callback(name, result)
+                    continue
+
                 successful_files += 1
+                cached_files += result.get('cached', False)
+                screened_files += result.get('stage') == "screen"
                 total_detections += len(result['detections'])
                 total_processing_time += result['processing_time_ms']
-            else:
-                failed_files += 1
-                print(f"Failed to process {name}: {result['message']}")
 
-        except Exception as e:
-            failed_files += 1
-            print(f"Error processing {name}: {e}")
+                if csv_logger:
+                    csv_logger.log_detections(
+                        file_path=result['file_path'],
+                        detections=result['detections'],
+                        image_dimensions=result['image_dimensions'],
+                        processing_time_ms=result['processing_time_ms'],
+                        model_version=result['model_version'],
+                        detection_threshold=detector.threshold,
+                        stage=result.get('stage', "")
+                    )
+                    if result.get('raw_detections') is not None:
+                        csv_logger.log_raw_detections(
+                            result['file_path'], result['output_path'],
+                            result['raw_detections'],
+                            image_dimensions=result['image_dimensions'],
+                            status=result.get('stage', ""))
+                    csv_logger.mark_completed(result['file_path'])
+                if result_callback:
+                    result_callback(name, result)
 
     session_end_timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
     total_session_time = (time.time() - start_session_time) * 1000
 
     # Log session summary to CSV
-    if csv_logger:
+    if csv_logger and log_summary:
         csv_logger.log_session_summary(
             total_files_processed=len(image_names),
             total_detections=total_detections,
@@ -189,7 +847,12 @@ def label_all_images(folder_path: str,
                 'report_output_path': csv_logger.output_directory if csv_logger else '',
                 'model_threshold': detector.threshold,
                 'successful_files': successful_files,
-                'failed_files': failed_files
+                'failed_files': failed_files,
+                'execution_mode': 'multiprocess',
+                'num_workers': num_workers,
+                'cached_files': cached_files,
+                'tiling_mode': detector.tiling_mode,
+                'screened_files': screened_files
             }
         )
 
@@ -197,6 +860,8 @@ def label_all_images(folder_path: str,
         'total_files': len(image_names),
         'successful_files': successful_files,
         'failed_files': failed_files,
+        'cached_files': cached_files,
+        'screened_files': screened_files,
         'total_detections': total_detections,
         'total_processing_time_ms': total_session_time,
         'csv_paths': csv_logger.get_csv_paths() if csv_logger else None
@@ -0,0 +1,316 @@
+import os
+import shutil
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from object_detector import ObjectDetector
+from predict_image import label_all_images
+from utils.csv_logger import DetectionCSVLogger
+from utils.sequences import Sequence, group_sequences
+
+
+def classify_representative(result: Optional[Dict[str, Any]],
+                            ambiguity_floor: float) -> str:
+    """
+    Decide from the representative image whether the rest of a burst needs
+    to be processed.
+
+    Returns:
+        'occupied' if it has detections at the detection threshold (those in
+        result['detections']), 'empty' if the model saw nothing down to
+        ambiguity_floor, 'ambiguous' otherwise (including when the
+        representative could not be processed)
+    """
+    if not result or not result.get('success'):
+        return 'ambiguous'
+    if result['detections']:
+        return 'occupied'
+    raw_detections = result.get('raw_detections')
+    if raw_detections is None:
+        return 'ambiguous'
+    if any(detection['confidence'] >= ambiguity_floor for detection in raw_detections):
+        return 'ambiguous'
+    return 'empty'
+
+
+def _skip_image(name: str, sequence: Sequence, folder_path: str,
+                folder_path_output: str, image_dimensions: Optional[tuple],
+                detector: ObjectDetector,
+                csv_logger: Optional[DetectionCSVLogger]) -> bool:
+    """
+    Log an image of an empty burst without running the model. Its output is
+    a copy of the input, as for any image without detections.
+    """
+    image_path = folder_path.replace("\\", "/") + "/" + name
+    image_path_out = folder_path_output.replace("\\", "/") + "/" + name
+    try:
+        os.makedirs(os.path.dirname(image_path_out), exist_ok=True)
+        shutil.copyfile(image_path, image_path_out)
+    except OSError as e:
+        print(f"Error copying image file {image_path}: {e}")
+        return False
+
+    if csv_logger:
+        csv_logger.log_detections(
+            file_path=image_path,
+            detections=[],
+            image_dimensions=image_dimensions,
+            processing_time_ms=0,
+            model_version=getattr(detector.model, 'version', '1.0'),
+            detection_threshold=detector.threshold,
+            additional_metadata=sequence.sequence_id,
+            stage="sequence"
+        )
+        csv_logger.log_raw_detections(
+            image_path, image_path_out, [],
+            image_dimensions=image_dimensions, status="sequence")
+        csv_logger.mark_completed(image_path)
+    return True
+
+
+def _sequence_rows(sequence: Sequence, results: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Summarize the detections of a burst, one row per class.
+
+    max_count is the largest number of individuals of a class in any single
+    image of the burst (MaxN), the usual event-level count.
+    """
+    processed = [results[name] for name in sequence.names
+                 if results.get(name, {}).get('success')]
+    max_counts = Counter()
+    max_confidences = {}
+    detection_counts = Counter()
+    for result in processed:
+        image_counts = Counter(detection['class'] for detection in result['detections'])
+        for class_name, count in image_counts.items():
+            max_counts[class_name] = max(max_counts[class_name], count)
+            detection_counts[class_name] += count
+        for detection in result['detections']:
+            max_confidences[detection['class']] = max(
+                max_confidences.get(detection['class'], 0.0), detection['confidence'])
+
+    base_row = {
+        'sequence_id': sequence.sequence_id,
+        'camera_folder': sequence.camera_folder,
+        'start_time': sequence.start_time.isoformat() if sequence.start_time else "",
+        'end_time': sequence.end_time.isoformat() if sequence.end_time else "",
+        'image_count': len(sequence.names),
+        'processed_images': sum(not result.get('skipped') for result in processed),
+        'representative_file': sequence.representative,
+        'sequence_status': 'occupied' if max_counts else 'empty'
+    }
+    if not max_counts:
+        return [dict(base_row, detection_class="NO_DETECTION", max_count=0,
+                     max_confidence=0.0, detection_count=0)]
+    return [dict(base_row, detection_class=class_name, max_count=max_count,
+                 max_confidence=round(max_confidences[class_name], 4),
+                 detection_count=detection_counts[class_name])
+            for class_name, max_count in sorted(max_counts.items())]
+
+
+def label_image_sequences(folder_path: str,
+                          folder_path_output: str = "/output",
+                          detector: Optional[ObjectDetector] = None,
+                          csv_logger: Optional[DetectionCSVLogger] = None,
+                          progress_callback=None,
+                          file_list: Optional[List[str]] = None,
+                          label_images=label_all_images,
+                          max_gap_seconds: float = 10.0,
+                          ambiguity_floor: float = 0.25,
+                          **label_options) -> Dict[str, Any]:
+    """
+    Process camera-trap bursts, running the model on one image per burst first.
+
+    Images are grouped into sequences by camera folder and EXIF capture time
+    (see group_sequences). The representative image of every sequence is
+    processed first. The rest of a burst is only processed when its
+    representative has detections, or has predictions between
+    ambiguity_floor and the threshold. Bursts whose representative is empty
+    are logged as NO_DETECTION with stage "sequence" without inference. A
+    row per sequence and class, with event-level counts, goes to the
+    logger's sequences CSV as soon as all images of the burst are done.
+
+    A resumed run groups all images again and skips the ones it completed,
+    and the bursts it logged. The results of completed images of the other
+    bursts are read back from the detection CSV; a completed representative
+    without detections counts as ambiguous, since its predictions below the
+    threshold are not known.
+
+    The detector must run at or below ambiguity_floor (see
+    ObjectDetector.set_raw_threshold) for ambiguous representatives to be
+    recognized; otherwise every representative without detections counts
+    as empty.
+
+    Args:
+        label_images (callable): label_all_images or
+            label_all_images_multiprocess, runs each stage
+        max_gap_seconds (float): Largest capture time gap within a burst
+        ambiguity_floor (float): Lowest confidence that makes an empty
+            representative ambiguous
+        **label_options: Passed on to label_images
+
+    Returns:
+        Dict with summary of processing results
+    """
+    if detector is None:
+        detector = ObjectDetector()
+
+    start_session_time = time.time()
+    session_start_timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
+
+    # Use provided file list or scan folder
+    if file_list is not None:
+        image_names = file_list
+    else:
+        image_names = [f for f in os.listdir(folder_path) if f.lower().endswith(
+            ('.png', '.jpg', '.jpeg', '.gif', ".JPG"))]
+
+    sequences = group_sequences(folder_path, image_names, max_gap_seconds)
+    print(f'Grouped {len(image_names)} images into {len(sequences)} sequences')
+
+    base = folder_path.replace("\\", "/")
+    completed = set()
+    if csv_logger and csv_logger.resumed:
+        completed = {name for name in image_names
+                     if csv_logger.is_completed(base + "/" + name)}
+        logged = csv_logger.keep_sequences(
+            sequence.sequence_id for sequence in sequences
+            if all(name in completed for name in sequence.names))
+        sequences = [sequence for sequence in sequences
+                     if sequence.sequence_id not in logged]
+        print(f"Resuming previous run: skipping {len(logged)} logged sequences")
+
+    results = {}
+    if completed:
+        logged_results = csv_logger.read_results(
+            base + "/" + name for sequence in sequences
+            for name in sequence.names if name in completed)
+        for sequence in sequences:
+            for name in sequence.names:
+                if base + "/" + name in logged_results:
+                    results[name] = logged_results[base + "/" + name]
+    totals = Counter()
+
+    # Each burst is logged once none of its images are left
+    sequence_of = {name: sequence for sequence in sequences for name in sequence.names}
+    pending = {sequence.sequence_id: {name for name in sequence.names if name not in completed}
+               for sequence in sequences}
+
+    def finish_sequence(sequence):
+        if csv_logger:
+            csv_logger.log_sequences(_sequence_rows(sequence, results))
+
+    def collect(name, result):
+        results[name] = result
+        sequence = sequence_of[name]
+        pending[sequence.sequence_id].discard(name)
+        if not pending[sequence.sequence_id]:
+            finish_sequence(sequence)
+
+    def run(names, offset):
+        if not names:
+            return
+
+        def offset_progress(index, name):
+            progress_callback(offset + index, name)
+
+        stage_results = label_images(
+            folder_path=folder_path,
+            folder_path_output=folder_path_output,
+            detector=detector,
+            csv_logger=csv_logger,
+            progress_callback=offset_progress if progress_callback else None,
+            file_list=names,
+            result_callback=collect,
+            log_summary=False,
+            **label_options
+        )
+        for key in ('successful_files', 'failed_files', 'cached_files',
+                    'screened_files', 'total_detections'):
+            totals[key] += stage_results.get(key, 0)
+
+    # Bursts completed before the interruption that were not logged yet
+    for sequence in sequences:
+        if not pending[sequence.sequence_id]:
+            finish_sequence(sequence)
+
+    # Representatives first, then the rest of the bursts that need it
+    representatives = [sequence.representative for sequence in sequences
+                       if sequence.representative not in completed]
+    run(representatives, 0)
+
+    statuses = {sequence.sequence_id: classify_representative(
+        results.get(sequence.representative), ambiguity_floor)
+        for sequence in sequences}
+    remaining = [name for sequence in sequences
+                 if statuses[sequence.sequence_id] != 'empty'
+                 for name in sequence.names
+                 if name != sequence.representative and name not in completed]
+    run(remaining, len(representatives))
+
+    index = len(representatives) + len(remaining)
+    skipped_files = 0
+    for sequence in sequences:
+        if statuses[sequence.sequence_id] != 'empty':
+            continue
+        image_dimensions = results[sequence.representative].get('image_dimensions')
+        for name in sequence.names:
+            if name == sequence.representative or name in completed:
+                continue
+            if progress_callback:
+                progress_callback(index, name)
+            index += 1
+            if _skip_image(name, sequence, folder_path, folder_path_output,
+                           image_dimensions, detector, csv_logger):
+                skipped_files += 1
+                totals['successful_files'] += 1
+                collect(name, {'success': True, 'detections': [], 'skipped': True})
+            else:
+                totals['failed_files'] += 1
+                collect(name, {'success': False, 'message': "Error copying image file"})
+
+    status_counts = Counter(statuses.values())
+    print(f"Sequences: {status_counts['occupied']} occupied, "
+          f"{status_counts['ambiguous']} ambiguous and {status_counts['empty']} empty "
+          f"representatives, {skipped_files} images skipped")
+
+    session_end_timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
+    total_session_time = (time.time() - start_session_time) * 1000
+
+    if csv_logger:
+        csv_logger.log_session_summary(
+            total_files_processed=len(image_names) - len(completed),
+            total_detections=totals['total_detections'],
+            total_processing_time_ms=total_session_time,
+            start_time=session_start_timestamp,
+            end_time=session_end_timestamp,
+            settings_used={
+                'input_folder': folder_path,
+                'media_output_path': folder_path_output,
+                'report_output_path': csv_logger.output_directory,
+                'model_threshold': detector.threshold,
+                'successful_files': totals['successful_files'],
+                'failed_files': totals['failed_files'],
+                'cached_files': totals['cached_files'],
+                'screened_files': totals['screened_files'],
+                'sequences': len(sequences),
+                'sequence_gap_seconds': max_gap_seconds,
+                'sequence_ambiguity_floor': ambiguity_floor,
+                'skipped_files': skipped_files
+            }
+        )
+
+    return {
+        'total_files': len(image_names) - len(completed),
+        'successful_files': totals['successful_files'],
+        'failed_files': totals['failed_files'],
+        'cached_files': totals['cached_files'],
+        'screened_files': totals['screened_files'],
+        'skipped_files': skipped_files,
+        'total_sequences': len(sequences),
+        'sequence_statuses': dict(status_counts),
+        'total_detections': totals['total_detections'],
+        'total_processing_time_ms': total_session_time,
+        'csv_paths': csv_logger.get_csv_paths() if csv_logger else None
+    }
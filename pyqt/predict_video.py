@@ -1,3 +1,5 @@
+import bisect
+import json
 import os
 import time
 from typing import Any, Dict, Optional, List
@@ -6,20 +8,95 @@ import cv2
 
 from object_detector import ObjectDetector
 from utils.csv_logger import DetectionCSVLogger
+from utils.frame_selection import (FrameSampler, MotionGate, find_keyframes,
+                                   interpolate_detections)
+from utils.render import render_video
+from utils.result_cache import VIDEO_SAMPLE_BYTES, ResultCache, filter_detections
+
+
+def _detect_sampled_frames(cap, detector: ObjectDetector, sampler: FrameSampler,
+                           motion_gate: Optional[MotionGate], width: int, height: int):
+    """
+    Run detection on the sampled frames of a video, without rendering.
+
+    Frames that are not sampled are only grabbed, never converted, unless the
+    motion gate needs to see them.
+
+    Returns:
+        Tuple of (dict of frame number -> detections for inferred frames,
+        set of frame numbers that were sampled but gated for lack of motion)
+    """
+    anchors = {}
+    gated = set()
+    pending_frames = []
+
+    def flush_pending_frames():
+        batch_results = detector.detect_batch(
+            [frame for _, frame in pending_frames])
+        for (pending_number, _), results in zip(pending_frames, batch_results):
+            anchors[pending_number] = detector.extract_detections(
+                results, width, height)
+        pending_frames.clear()
+
+    frame_number = 0
+    while cap.grab():
+        sampled = sampler.should_sample(frame_number)
+        if sampled or motion_gate:
+            ret, frame = cap.retrieve()
+            if not ret:
+                break
+
+            moving = motion_gate.has_motion(frame) if motion_gate else True
+            if sampled and moving:
+                pending_frames.append((frame_number, frame))
+                if len(pending_frames) >= detector.batch_size:
+                    flush_pending_frames()
+            elif sampled:
+                gated.add(frame_number)
+
+        frame_number += 1
+
+    if pending_frames:
+        flush_pending_frames()
+
+    return anchors, gated
 
 
 def label_video(name: str,
                 folder_path: str,
                 folder_path_output: str,
-                detector: ObjectDetector = ObjectDetector(),
+                detector: Optional[ObjectDetector] = None,
                 csv_logger: Optional[DetectionCSVLogger] = None,
-                progress_callback=None) -> Dict[str, Any]:
+                progress_callback=None,
+                motion_gating: bool = False,
+                motion_threshold: float = 0.002,
+                sampling_mode: str = 'all',
+                frame_stride: int = 1,
+                target_fps: Optional[float] = None,
+                fill_mode: str = 'hold',
+                result_cache: Optional[ResultCache] = None) -> Dict[str, Any]:
     """
     Process a single video and optionally log detections to CSV.
 
+    With motion_gating enabled, frames without motion against the background
+    model skip inference and carry forward the last detections. sampling_mode
+    ('all', 'stride', 'fps' or 'keyframes', see FrameSampler) limits which
+    frames are sent to the model at all; detections for the other frames are
+    held or, with fill_mode 'interpolate', interpolated between inferred
+    frames, so the output video and the per-frame CSV stay complete. When
+    frames can be skipped, the CSV records each frame as "inferred", "gated",
+    "held" or "interpolated" in additional_metadata.
+
+    With a result_cache, a video whose contents were processed before with
+    the same model and frame selection is answered from the per-frame
+    detections in the cache, without running the model.
+
     Returns:
         Dict with processing results including detection data for CSV logging
     """
+    if detector is None:
+        detector = ObjectDetector()
+
     video_path = folder_path.replace("\\", "/") + "/" + name
     video_path_out = folder_path_output.replace("\\", "/") + "/" + name
 
@@ -28,6 +105,25 @@ def label_video(name: str,
     os.makedirs(output_dir, exist_ok=True)
 
     start_time = time.time()
+
+    # Frame selection changes the detections, so it is part of the cache key
+    content_hash = None
+    cache_options = json.dumps({
+        'motion_gating': motion_gating,
+        'motion_threshold': motion_threshold if motion_gating else None,
+        'sampling_mode': sampling_mode,
+        'frame_stride': frame_stride if sampling_mode == 'stride' else None,
+        'target_fps': target_fps if sampling_mode == 'fps' else None,
+        'fill_mode': fill_mode
+    }, sort_keys=True)
+    if result_cache is not None:
+        content_hash, cached = result_cache.lookup(
+            video_path, detector.model_path, detector.inference_threshold,
+            options=cache_options, sample_bytes=VIDEO_SAMPLE_BYTES)
+        if cached is not None:
+            return _reuse_cached_video(cached, video_path, video_path_out,
+                                       detector, csv_logger, start_time)
+
     cap = cv2.VideoCapture(video_path)
 
     if not cap.isOpened():
@@ -49,52 +145,32 @@ def label_video(name: str,
     fourcc = cv2.VideoWriter_fourcc(*'mp4v')
     out = cv2.VideoWriter(video_path_out, fourcc, fps, (width, height))
 
-    total_detections = 0
-    frame_number = 0
-
-    ret, frame = cap.read()
-
-    while ret:
-        frame_timestamp = frame_number / fps if fps > 0 else 0
-
-        # Resize frame for detection (YOLO input size)
-        original_frame = frame.copy()
-        detection_frame = cv2.resize(frame, (640, 640))
-
-        # Detect objects
-        results = detector.detect(detection_frame)
-
-        # Extract detection data for CSV logging
-        frame_detections = []
-        if results.boxes is not None and len(results.boxes) > 0:
-            for box_data in results.boxes.data.tolist():
-                x1, y1, x2, y2, confidence, class_id = box_data
-
-                # Convert to original video coordinates
-                x1_orig = (x1 / 640) * width
-                y1_orig = (y1 / 640) * height
-                x2_orig = (x2 / 640) * width
-                y2_orig = (y2 / 640) * height
-
-                # Calculate center and dimensions
-                x_center = (x1_orig + x2_orig) / 2
-                y_center = (y1_orig + y2_orig) / 2
-                bbox_width = x2_orig - x1_orig
-                bbox_height = y2_orig - y1_orig
-
-                detection = {
-                    'class': detector.model.names[int(class_id)],
-                    'confidence': confidence,
-                    'bbox': {
-                        'x_center': x_center,
-                        'y_center': y_center,
-                        'width': bbox_width,
-                        'height': bbox_height
-                    }
-                }
-                frame_detections.append(detection)
+    # Background model is per video, so every clip gets a fresh gate
+    motion_gate = MotionGate(motion_threshold) if motion_gating else None
+    sampler = FrameSampler(
+        sampling_mode,
+        frame_stride=frame_stride,
+        target_fps=target_fps,
+        source_fps=fps,
+        keyframes=find_keyframes(
+            video_path) if sampling_mode == 'keyframes' else None
+    )
+    # Only record per-frame inference status when some frames can be skipped
+    track_status = motion_gate is not None or sampler.mode != 'all'
 
+    total_detections = 0
+    inferred_frames = 0
+    cached_frames = [] if content_hash else None
+
+    def write_frame(frame_number, frame, raw_detections, status):
+        """Log one frame to CSV and write it to the output video"""
+        nonlocal total_detections
+        # Detections are raw predictions down to the inference threshold
+        frame_detections = filter_detections(raw_detections, detector.threshold)
         total_detections += len(frame_detections)
+        if cached_frames is not None:
+            cached_frames.append(
+                [frame_number, status if track_status else "", raw_detections])
 
         # Log to CSV if logger is provided
         if csv_logger:
@@ -102,53 +178,131 @@ def label_video(name: str,
                 file_path=video_path,
                 detections=frame_detections,
                 frame_number=frame_number,
-                frame_timestamp=frame_timestamp,
+                frame_timestamp=frame_number / fps if fps > 0 else 0,
                 image_dimensions=(width, height),
                 processing_time_ms=0,  # Will be calculated per frame if needed
                 model_version=getattr(detector.model, 'version', '1.0'),
-                detection_threshold=detector.threshold
+                detection_threshold=detector.threshold,
+                additional_metadata=status if track_status else ""
             )
+            csv_logger.log_raw_detections(
+                video_path, video_path_out, raw_detections,
+                frame_number=frame_number,
+                frame_timestamp=frame_number / fps if fps > 0 else 0,
+                image_dimensions=(width, height),
+                status=status if track_status else "")
 
-        # We need to manually draw the bounding boxes on the original frame
-        # because the detection results are from the 640x640 resized frame
-        processed_frame = original_frame.copy()
-
-        if results.boxes is not None and len(results.boxes) > 0:
-            for box_data in results.boxes.data.tolist():
-                x1, y1, x2, y2, confidence, class_id = box_data
-
-                # Convert coordinates from 640x640 detection frame to original frame
-                x1_orig = int((x1 / 640) * width)
-                y1_orig = int((y1 / 640) * height)
-                x2_orig = int((x2 / 640) * width)
-                y2_orig = int((y2 / 640) * height)
-
-                # Draw bounding box
-                cv2.rectangle(processed_frame, (x1_orig, y1_orig),
-                              (x2_orig, y2_orig), (0, 255, 0), 4)
-
-                # Draw class label
-                class_name = detector.model.names[int(class_id)].upper()
-                cv2.putText(
-                    processed_frame,
-                    class_name,
-                    (x1_orig, y1_orig - 10),
-                    cv2.FONT_HERSHEY_SIMPLEX,
-                    1.3,
-                    (0, 255, 0),
-                    3,
-                    cv2.LINE_AA
-                )
-
-        out.write(processed_frame)
+        # Draw the bounding boxes on the original frame, detections are
+        # already mapped back from the letterboxed model input
+        out.write(detector.draw_detections(frame, frame_detections))
+
+    if fill_mode == 'interpolate' and sampler.mode != 'all':
+        # Interpolation needs the next inferred frame, so detection runs as a
+        # first pass over the sampled frames and a second pass renders them
+        anchors, gated = _detect_sampled_frames(
+            cap, detector, sampler, motion_gate, width, height)
+        inferred_frames = len(anchors)
+        anchor_numbers = sorted(anchors)
+
+        cap.release()
+        cap = cv2.VideoCapture(video_path)
+
+        frame_number = 0
+        ret, frame = cap.read()
+
+        while ret:
+            position = bisect.bisect_right(anchor_numbers, frame_number)
+            previous_anchor = anchor_numbers[position - 1] if position else None
+            next_anchor = anchor_numbers[position] if position < len(
+                anchor_numbers) else None
+
+            if previous_anchor == frame_number:
+                write_frame(frame_number, frame,
+                            anchors[frame_number], "inferred")
+            elif previous_anchor is None:
+                write_frame(frame_number, frame, [],
+                            "gated" if frame_number in gated else "held")
+            elif frame_number in gated or next_anchor is None:
+                write_frame(frame_number, frame, anchors[previous_anchor],
+                            "gated" if frame_number in gated else "held")
+            else:
+                t = (frame_number - previous_anchor) / \
+                    (next_anchor - previous_anchor)
+                write_frame(frame_number, frame, interpolate_detections(
+                    anchors[previous_anchor], anchors[next_anchor], t),
+                    "interpolated")
+
+            frame_number += 1
+            ret, frame = cap.read()
+
+    else:
+        frame_number = 0
+        pending_frames = []
+        last_detections = []
+
+        def flush_pending_frames():
+            """Run one batched forward pass over the pending frames and write them out"""
+            nonlocal inferred_frames, last_detections
+
+            # The detector letterboxes the frames into its input buffer
+            detection_frames = [frame for _, frame, status in pending_frames
+                                if status == "inferred"]
+
+            # Detect objects
+            batch_results = iter(detector.detect_batch(detection_frames))
+
+            for pending_number, original_frame, status in pending_frames:
+                if status == "inferred":
+                    last_detections = detector.extract_detections(
+                        next(batch_results), width, height)
+                    inferred_frames += 1
+
+                # Skipped frames hold the detections of the last inferred frame
+                write_frame(pending_number, original_frame,
+                            last_detections, status)
+
+            pending_frames.clear()
 
-        frame_number += 1
         ret, frame = cap.read()
 
+        while ret:
+            # The motion gate sees every frame to keep its background current
+            moving = motion_gate.has_motion(frame) if motion_gate else True
+            if not sampler.should_sample(frame_number):
+                status = "held"
+            else:
+                status = "inferred" if moving else "gated"
+
+            # Frames are collected until a full batch can go through the model.
+            # Skipped frames only wait in the buffer, which is capped so a long
+            # static stretch does not hold too many decoded frames in memory
+            pending_frames.append((frame_number, frame, status))
+            pending_inferred = sum(1 for _, _, pending_status in pending_frames
+                                   if pending_status == "inferred")
+            if pending_inferred >= detector.batch_size or \
+                    len(pending_frames) >= 4 * detector.batch_size:
+                flush_pending_frames()
+
+            frame_number += 1
+            ret, frame = cap.read()
+
+        if pending_frames:
+            flush_pending_frames()
+
     cap.release()
     out.release()
     cv2.destroyAllWindows()
 
+    if cached_frames is not None:
+        result_cache.store(content_hash, detector.model_path, detector.inference_threshold, 'video', {
+            'width': width,
+            'height': height,
+            'fps': fps,
+            'frame_count': frame_count,
+            'inferred_frames': inferred_frames,
+            'frames': cached_frames
+        }, options=cache_options)
+
     processing_time_ms = (time.time() - start_time) * 1000
 
     return {
@@ -158,6 +312,73 @@ def label_video(name: str,
         'processing_time_ms': processing_time_ms,
         'output_path': video_path_out,
         'frame_count': frame_count,
+        'inferred_frames': inferred_frames,
+        'fps': fps
+    }
+
+
+def _reuse_cached_video(cached: Dict[str, Any], video_path: str, video_path_out: str,
+                        detector: ObjectDetector,
+                        csv_logger: Optional[DetectionCSVLogger],
+                        start_time: float) -> Dict[str, Any]:
+    """
+    Produce the output and CSV rows of a video from its cached per-frame
+    detections, without inference.
+
+    The video is always decoded again and the cached detections are drawn
+    onto its frames, as the annotated file of an earlier run may have been
+    overwritten since (camera file names repeat across folders). Drawing
+    costs far less than inference.
+    """
+    threshold = detector.threshold
+    width, height, fps = cached['width'], cached['height'], cached['fps']
+    frames = [(frame_number, status,
+               filter_detections(detections, detector.inference_threshold))
+              for frame_number, status, detections in cached['frames']]
+
+    if not render_video(video_path, video_path_out, {
+            frame_number: filter_detections(raw_detections, threshold)
+            for frame_number, _, raw_detections in frames}):
+        return {
+            'success': False,
+            'message': f'Error reading video file: {video_path}',
+            'detections': [],
+            'processing_time_ms': 0
+        }
+
+    total_detections = 0
+    for frame_number, status, raw_detections in frames:
+        detections = filter_detections(raw_detections, threshold)
+        total_detections += len(detections)
+        if csv_logger:
+            frame_timestamp = frame_number / fps if fps > 0 else 0
+            csv_logger.log_detections(
+                file_path=video_path,
+                detections=detections,
+                frame_number=frame_number,
+                frame_timestamp=frame_timestamp,
+                image_dimensions=(width, height),
+                processing_time_ms=0,
+                model_version=getattr(detector.model, 'version', '1.0'),
+                detection_threshold=threshold,
+                additional_metadata=status
+            )
+            csv_logger.log_raw_detections(
+                video_path, video_path_out, raw_detections,
+                frame_number=frame_number,
+                frame_timestamp=frame_timestamp,
+                image_dimensions=(width, height),
+                status=status)
+
+    return {
+        'success': True,
+        'cached': True,
+        'message': f'Video saved on {video_path_out}',
+        'detections': total_detections,
+        'processing_time_ms': (time.time() - start_time) * 1000,
+        'output_path': video_path_out,
+        'frame_count': cached['frame_count'],
+        'inferred_frames': 0,
         'fps': fps
     }
 
@@ -165,8 +386,11 @@ def label_video(name: str,
 def label_multiple_videos(names: list[str],
                           folder_path: str,
                           folder_path_output: str,
-                          detector: ObjectDetector = ObjectDetector(),
+                          detector: Optional[ObjectDetector] = None,
                           csv_logger: Optional[DetectionCSVLogger] = None) -> None:
+    if detector is None:
+        detector = ObjectDetector()
+
     for name in names:
         label_video(name=name,
                     folder_path=folder_path,
@@ -177,16 +401,26 @@ def label_multiple_videos(names: list[str],
 
 def label_all_videos(folder_path: str,
                      folder_path_output: str,
-                     detector: ObjectDetector = ObjectDetector(),
+                     detector: Optional[ObjectDetector] = None,
                      csv_logger: Optional[DetectionCSVLogger] = None,
                      progress_callback=None,
-                     file_list: Optional[List[str]] = None) -> Dict[str, Any]:
+                     file_list: Optional[List[str]] = None,
+                     motion_gating: bool = False,
+                     motion_threshold: float = 0.002,
+                     sampling_mode: str = 'all',
+                     frame_stride: int = 1,
+                     target_fps: Optional[float] = None,
+                     fill_mode: str = 'hold',
+                     result_cache: Optional[ResultCache] = None) -> Dict[str, Any]:
     """
     Process all videos in a folder and optionally log detections to CSV.
 
     Returns:
         Dict with summary of processing results
     """
+    if detector is None:
+        detector = ObjectDetector()
+
     start_session_time = time.time()
     session_start_timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
 
@@ -203,8 +437,10 @@ def label_all_videos(folder_path: str,
     total_detections = 0
     total_processing_time = 0
     total_frames = 0
+    total_inferred_frames = 0
     successful_files = 0
     failed_files = 0
+    cached_files = 0
 
     for index, name in enumerate(video_names):
         try:
@@ -219,14 +455,26 @@ def label_all_videos(folder_path: str,
                 folder_path_output=folder_path_output,
                 detector=detector,
                 csv_logger=csv_logger,
-                progress_callback=None  # Remove frame-level progress to show only file completion
+                progress_callback=None,  # Remove frame-level progress to show only file completion
+                motion_gating=motion_gating,
+                motion_threshold=motion_threshold,
+                sampling_mode=sampling_mode,
+                frame_stride=frame_stride,
+                target_fps=target_fps,
+                fill_mode=fill_mode,
+                result_cache=result_cache
             )
 
             if result['success']:
                 successful_files += 1
+                cached_files += result.get('cached', False)
                 total_detections += result['detections']
                 total_processing_time += result['processing_time_ms']
                 total_frames += result.get('frame_count', 0)
+                total_inferred_frames += result.get('inferred_frames', 0)
+                if csv_logger:
+                    csv_logger.mark_completed(
+                        folder_path.replace("\\", "/") + "/" + name)
             else:
                 failed_files += 1
                 print(f"Failed to process {name}: {result['message']}")
@@ -253,7 +501,9 @@ def label_all_videos(folder_path: str,
                 'model_threshold': detector.threshold,
                 'successful_files': successful_files,
                 'failed_files': failed_files,
-                'total_frames_processed': total_frames
+                'total_frames_processed': total_frames,
+                'total_frames_inferred': total_inferred_frames,
+                'cached_files': cached_files
             }
         )
 
@@ -261,8 +511,10 @@ def label_all_videos(folder_path: str,
         'total_files': len(video_names),
         'successful_files': successful_files,
         'failed_files': failed_files,
+        'cached_files': cached_files,
         'total_detections': total_detections,
         'total_frames': total_frames,
+        'total_inferred_frames': total_inferred_frames,
         'total_processing_time_ms': total_session_time,
         'csv_paths': csv_logger.get_csv_paths() if csv_logger else None
     }
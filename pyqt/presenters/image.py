@@ -1,7 +1,8 @@
 from PyQt5.QtGui import QPixmap, QImage
-import os
 import cv2
 
+from utils.media_index import scan_media_files
+
 
 class ImagePresenter:
     def __init__(self, model, view):
@@ -18,36 +19,28 @@ class ImagePresenter:
 
         folder_contents = []
 
-        # Get all files (with optional recursion)
-        all_files = []
-        if self.model.settings_model.recursive_folder_search:
-            # Recursive search through all subdirectories
-            for root, _, files in os.walk(folder_path):
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    # Store both the full path and relative path for display
-                    relative_path = os.path.relpath(file_path, folder_path)
-                    all_files.append((file_path, relative_path))
-        else:
-            # Only scan the immediate folder
-            directories = os.listdir(folder_path)
-            for file_name in directories:
-                file_path = os.path.join(folder_path, file_name)
-                if os.path.isfile(file_path):  # Only include files, not directories
-                    all_files.append((file_path, file_name))
-
-        for file_index, (file_path, display_name) in enumerate(all_files):
-            if len(all_files) > 1:  # Avoid division by zero
+        # Get all supported files (with optional recursion), storing both the
+        # full path and relative path for display
+        media_files = scan_media_files(
+            folder_path,
+            recursive=self.model.settings_model.recursive_folder_search,
+            image_extensions=('.png', '.jpg', '.jpeg', '.gif', '.bmp'),
+            video_extensions=('.mp4', '.avi', '.mkv'),
+            include_hidden=True)
+
+        for file_index, media_file in enumerate(media_files):
+            if len(media_files) > 1:  # Avoid division by zero
                 self.view.image_view.update_progress_bar(
-                    file_index/(len(all_files)-1))
+                    file_index/(len(media_files)-1))
+
+            file_path = media_file.path
+            display_name = media_file.relative_path
 
             # Check if the file is an image or video
-            if display_name.lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.bmp')):
+            if media_file.media_type == 'image':
                 pixmap = QPixmap(file_path)
-            elif display_name.lower().endswith(('.mp4', '.avi', '.mkv')):
-                pixmap = self.get_video_frame(file_path)
             else:
-                continue  # Skip non-supported file types
+                pixmap = self.get_video_frame(file_path)
 
             folder_contents.append(
                 {"pixmap": pixmap, "name": display_name, "path": file_path})
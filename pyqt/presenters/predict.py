@@ -1,9 +1,17 @@
 import os
+import time
 from object_detector import ObjectDetector
 
-from predict_image import label_all_images
+from predict_image import label_all_images, label_all_images_multiprocess
+from predict_sequences import label_image_sequences
 from predict_video import label_all_videos
 from utils.csv_logger import DetectionCSVLogger
+from utils.media_index import scan_media_files
+from utils.raw_predictions import RawPredictions
+from utils.render import (load_csv_render_jobs, load_raw_render_jobs,
+                          render_jobs)
+from utils.result_cache import get_result_cache
+from utils.run_manifest import RunManifest
 
 
 class PredictPresenter:
@@ -25,13 +33,46 @@ class PredictPresenter:
         """
         detector = ObjectDetector(model_path=model.path)
         detector.set_threshold(self.model.settings_model.threshold)
+        detector.set_batch_size(self.model.settings_model.batch_size)
+        raw_threshold = None
+        if self.model.settings_model.keep_raw_predictions:
+            raw_threshold = self.model.settings_model.raw_threshold_floor
+        inference_floor = raw_threshold
+        if self.model.settings_model.sequence_grouping:
+            # Burst representatives need the predictions down to the
+            # ambiguity floor to tell empty from ambiguous
+            inference_floor = min(
+                raw_threshold if raw_threshold is not None else 1.0,
+                self.model.settings_model.sequence_ambiguity_floor)
+        detector.set_raw_threshold(inference_floor)
+        detector.set_tiling(
+            self.model.settings_model.tiled_inference,
+            tile_size=self.model.settings_model.tile_size,
+            overlap=self.model.settings_model.tile_overlap,
+            merge=self.model.settings_model.tile_merge,
+            fallback_threshold=self.model.settings_model.tile_fallback_threshold)
+        if self.model.settings_model.cascade_filter:
+            detector.set_cascade(
+                self.model.settings_model.cascade_screen_size,
+                self.model.settings_model.cascade_screen_threshold)
+        result_cache = get_result_cache() if self.model.settings_model.use_result_cache else None
 
         # Initialize CSV logger
         csv_output_path = getattr(
             self.model.settings_model, 'report_output_path', 'pyqt/reports')
+        # One detection database per report folder, shared by all sessions
+        sqlite_path = None
+        if self.model.settings_model.sqlite_output:
+            sqlite_path = os.path.join(csv_output_path, "detections.sqlite")
         csv_logger = DetectionCSVLogger(
             output_directory=csv_output_path,
-            model_name=model.name
+            model_name=model.name,
+            parquet_output=self.model.settings_model.parquet_output,
+            sqlite_path=sqlite_path,
+            run_key=RunManifest.run_key(
+                folder_path, model.path, self.model.settings_model.threshold),
+            resume=self.model.settings_model.resume_predictions,
+            raw_threshold=raw_threshold
         )
 
         # Define supported extensions
@@ -41,31 +82,33 @@ class PredictPresenter:
                             '.wmv', '.flv', '.webm', '.m4v', '.MP4')
 
         # Check what files are in the folder (with optional recursion)
-        image_files = []
-        video_files = []
-
-        if self.model.settings_model.recursive_folder_search:
-            # Recursive search through all subdirectories
-            for root, _, files in os.walk(folder_path):
-                for file in files:
-                    file_path = os.path.relpath(
-                        os.path.join(root, file), folder_path)
-                    if file.lower().endswith(image_extensions):
-                        image_files.append(file_path)
-                    elif file.lower().endswith(video_extensions):
-                        video_files.append(file_path)
-        else:
-            # Only scan the immediate folder
-            all_files = os.listdir(folder_path)
-            image_files = [
-                f for f in all_files if f.lower().endswith(image_extensions)]
-            video_files = [
-                f for f in all_files if f.lower().endswith(video_extensions)]
+        media_files = scan_media_files(
+            folder_path,
+            recursive=self.model.settings_model.recursive_folder_search,
+            image_extensions=image_extensions,
+            video_extensions=video_extensions,
+            include_hidden=True)
+        image_files = [media_file.relative_path for media_file in media_files
+                       if media_file.media_type == 'image']
+        video_files = [media_file.relative_path for media_file in media_files
+                       if media_file.media_type == 'video']
 
         search_mode = "recursively" if self.model.settings_model.recursive_folder_search else "in current folder"
         print(
             f"Found {len(image_files)} images and {len(video_files)} videos to process {search_mode}")
 
+        # Skip the files an interrupted run already completed
+        all_image_files = image_files
+        if csv_logger.resumed:
+            def remaining(names):
+                return [name for name in names if not csv_logger.is_completed(
+                    folder_path.replace("\\", "/") + "/" + name)]
+            skipped_files = len(image_files) + len(video_files)
+            image_files = remaining(image_files)
+            video_files = remaining(video_files)
+            skipped_files -= len(image_files) + len(video_files)
+            print(f"Resuming previous run: skipping {skipped_files} completed files")
+
         # Calculate total files
         total_files = len(image_files) + len(video_files)
         completed_files = 0
@@ -81,69 +124,107 @@ class PredictPresenter:
             'video_results': None
         }
 
-        # Process images if any exist
-        if image_files:
-            if progress_callback:
-                search_info = " (recursive)" if self.model.settings_model.recursive_folder_search else ""
-                progress_callback(
-                    0, f"Starting image processing ({len(image_files)} of {total_files} files{search_info})...")
-
-            # Create a custom progress callback for images that tracks overall progress
-            def image_progress_wrapper(file_index, message):
-                # file_index is 0-based index within images
-                files_completed_so_far = completed_files + file_index + 1
-                overall_progress = (files_completed_so_far / total_files) * 100
-                file_num = file_index + 1
-                progress_callback(
-                    overall_progress, f"Image {file_num}/{len(image_files)} (File {files_completed_so_far}/{total_files}): {message}")
-
-            image_results = label_all_images(
-                folder_path=folder_path,
-                folder_path_output=self.model.settings_model.media_output_path,
-                detector=detector,
-                csv_logger=csv_logger,
-                progress_callback=image_progress_wrapper if progress_callback else None,
-                file_list=image_files
-            )
-            combined_results['image_results'] = image_results
-            combined_results['total_files'] += image_results['total_files']
-            combined_results['successful_files'] += image_results['successful_files']
-            combined_results['failed_files'] += image_results['failed_files']
-            combined_results['total_detections'] += image_results['total_detections']
-            combined_results['total_processing_time_ms'] += image_results['total_processing_time_ms']
-            completed_files += len(image_files)
-
-        # Process videos if any exist
-        if video_files:
-            if progress_callback:
-                overall_progress = (completed_files / total_files) * 100
-                search_info = " (recursive)" if self.model.settings_model.recursive_folder_search else ""
-                progress_callback(overall_progress,
-                                  f"Starting video processing ({len(video_files)} of {total_files} files{search_info})...")
-
-            # Create a custom progress callback for videos that tracks overall progress
-            def video_progress_wrapper(file_index, message):
-                # file_index is 0-based index within videos
-                files_completed_so_far = completed_files + file_index + 1
-                overall_progress = (files_completed_so_far / total_files) * 100
-                file_num = file_index + 1
-                progress_callback(
-                    overall_progress, f"Video {file_num}/{len(video_files)} (File {files_completed_so_far}/{total_files}): {message}")
-
-            video_results = label_all_videos(
-                folder_path=folder_path,
-                folder_path_output=self.model.settings_model.media_output_path,
-                detector=detector,
-                csv_logger=csv_logger,
-                progress_callback=video_progress_wrapper if progress_callback else None,
-                file_list=video_files
-            )
-            combined_results['video_results'] = video_results
-            combined_results['total_files'] += video_results['total_files']
-            combined_results['successful_files'] += video_results['successful_files']
-            combined_results['failed_files'] += video_results['failed_files']
-            combined_results['total_detections'] += video_results['total_detections']
-            combined_results['total_processing_time_ms'] += video_results['total_processing_time_ms']
+        try:
+            # Process images if any exist
+            if image_files:
+                if progress_callback:
+                    search_info = " (recursive)" if self.model.settings_model.recursive_folder_search else ""
+                    progress_callback(
+                        0, f"Starting image processing ({len(image_files)} of {total_files} files{search_info})...")
+
+                # Create a custom progress callback for images that tracks overall progress
+                def image_progress_wrapper(file_index, message):
+                    # file_index is 0-based index within images
+                    files_completed_so_far = completed_files + file_index + 1
+                    overall_progress = (files_completed_so_far / total_files) * 100
+                    file_num = file_index + 1
+                    progress_callback(
+                        overall_progress, f"Image {file_num}/{len(image_files)} (File {files_completed_so_far}/{total_files}): {message}")
+
+                # Pick the execution mode for images from settings
+                if self.model.settings_model.execution_mode == "multiprocess":
+                    label_images = label_all_images_multiprocess
+                    execution_options = {
+                        'num_workers': self.model.settings_model.num_workers
+                    }
+                else:
+                    label_images = label_all_images
+                    execution_options = {
+                        'decode_workers': self.model.settings_model.decode_workers,
+                        'write_workers': self.model.settings_model.write_workers
+                    }
+
+                image_list = image_files
+                if self.model.settings_model.sequence_grouping:
+                    execution_options.update(
+                        label_images=label_images,
+                        max_gap_seconds=self.model.settings_model.sequence_gap_seconds,
+                        ambiguity_floor=self.model.settings_model.sequence_ambiguity_floor)
+                    label_images = label_image_sequences
+                    # Bursts are grouped over all images, the completed
+                    # ones are skipped by label_image_sequences
+                    image_list = all_image_files
+
+                image_results = label_images(
+                    folder_path=folder_path,
+                    folder_path_output=self.model.settings_model.media_output_path,
+                    detector=detector,
+                    csv_logger=csv_logger,
+                    progress_callback=image_progress_wrapper if progress_callback else None,
+                    file_list=image_list,
+                    result_cache=result_cache,
+                    **execution_options
+                )
+                combined_results['image_results'] = image_results
+                combined_results['total_files'] += image_results['total_files']
+                combined_results['successful_files'] += image_results['successful_files']
+                combined_results['failed_files'] += image_results['failed_files']
+                combined_results['total_detections'] += image_results['total_detections']
+                combined_results['total_processing_time_ms'] += image_results['total_processing_time_ms']
+                completed_files += len(image_files)
+
+            # Process videos if any exist
+            if video_files:
+                if progress_callback:
+                    overall_progress = (completed_files / total_files) * 100
+                    search_info = " (recursive)" if self.model.settings_model.recursive_folder_search else ""
+                    progress_callback(overall_progress,
+                                      f"Starting video processing ({len(video_files)} of {total_files} files{search_info})...")
+
+                # Create a custom progress callback for videos that tracks overall progress
+                def video_progress_wrapper(file_index, message):
+                    # file_index is 0-based index within videos
+                    files_completed_so_far = completed_files + file_index + 1
+                    overall_progress = (files_completed_so_far / total_files) * 100
+                    file_num = file_index + 1
+                    progress_callback(
+                        overall_progress, f"Video {file_num}/{len(video_files)} (File {files_completed_so_far}/{total_files}): {message}")
+
+                video_results = label_all_videos(
+                    folder_path=folder_path,
+                    folder_path_output=self.model.settings_model.media_output_path,
+                    detector=detector,
+                    csv_logger=csv_logger,
+                    progress_callback=video_progress_wrapper if progress_callback else None,
+                    file_list=video_files,
+                    motion_gating=self.model.settings_model.motion_gating,
+                    motion_threshold=self.model.settings_model.motion_threshold,
+                    sampling_mode=self.model.settings_model.sampling_mode,
+                    frame_stride=self.model.settings_model.frame_stride,
+                    target_fps=self.model.settings_model.target_fps,
+                    fill_mode=self.model.settings_model.fill_mode,
+                    result_cache=result_cache
+                )
+                combined_results['video_results'] = video_results
+                combined_results['total_files'] += video_results['total_files']
+                combined_results['successful_files'] += video_results['successful_files']
+                combined_results['failed_files'] += video_results['failed_files']
+                combined_results['total_detections'] += video_results['total_detections']
+                combined_results['total_processing_time_ms'] += video_results['total_processing_time_ms']
+
+        finally:
+            # Write out any buffered rows, also when processing was interrupted
+            csv_logger.close()
 
         # Get CSV paths from the logger
         combined_results['csv_paths'] = csv_logger.get_csv_paths(
@@ -159,3 +240,148 @@ class PredictPresenter:
             'csv_paths': combined_results['csv_paths'],
             'summary': combined_results
         }
+
+    def regenerate_outputs(self, raw_path, threshold=None, progress_callback=None):
+        """
+        Regenerate the reports and annotated media of a run for a new
+        threshold from its raw prediction sidecar, without running the model.
+
+        Args:
+            raw_path (str): .raw sidecar written by a run that kept
+                low-confidence predictions
+            threshold (float, optional): New threshold, defaults to the
+                threshold in the settings
+            progress_callback (callable, optional): Called with a percentage
+                and a message
+
+        Returns:
+            Dict with the new CSV paths and a summary
+        """
+        raw_predictions = RawPredictions(raw_path)
+        if threshold is None:
+            threshold = self.model.settings_model.threshold
+        floor = raw_predictions.threshold_floor
+        if floor is not None and threshold < floor:
+            raise ValueError(
+                f"Threshold {threshold} is below the {floor} floor the predictions were stored at")
+
+        start_time = time.time()
+        session_start_timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
+        csv_logger = DetectionCSVLogger(
+            output_directory=getattr(
+                self.model.settings_model, 'report_output_path', 'pyqt/reports'),
+            model_name=raw_predictions.metadata.get('model_name', 'Unknown'))
+
+        total_files = len(set(raw_predictions.file_paths))
+        total_detections = 0
+        try:
+            for _, record, detections in raw_predictions.records(threshold):
+                total_detections += len(detections)
+                # Video frames store their frame status, images their cascade stage
+                is_frame = record['frame_number'] is not None
+                csv_logger.log_detections(
+                    file_path=record['file_path'],
+                    detections=detections,
+                    frame_number=record['frame_number'],
+                    frame_timestamp=record['frame_timestamp'],
+                    image_dimensions=record['image_dimensions'],
+                    detection_threshold=threshold,
+                    additional_metadata=record['status'] if is_frame else "",
+                    stage="" if is_frame else record['status'])
+
+            render_results = self._render(
+                load_raw_render_jobs(raw_predictions, threshold), progress_callback)
+            successful_files = render_results['successful_files']
+            failed_files = render_results['failed_files']
+
+            csv_logger.log_session_summary(
+                total_files_processed=total_files,
+                total_detections=total_detections,
+                total_processing_time_ms=(time.time() - start_time) * 1000,
+                start_time=session_start_timestamp,
+                end_time=time.strftime("%Y-%m-%d %H:%M:%S"),
+                settings_used={
+                    'report_output_path': csv_logger.output_directory,
+                    'model_threshold': threshold,
+                    'successful_files': successful_files,
+                    'failed_files': failed_files,
+                    'regenerated_from': raw_path,
+                    'threshold_floor': floor
+                })
+        finally:
+            csv_logger.close()
+
+        if progress_callback:
+            progress_callback(100, f"Regenerated {total_files} files at threshold {threshold}")
+
+        return {
+            'csv_paths': csv_logger.get_csv_paths(),
+            'summary': {
+                'total_files': total_files,
+                'successful_files': successful_files,
+                'failed_files': failed_files,
+                'total_detections': total_detections,
+                'threshold': threshold
+            }
+        }
+
+    def render_outputs(self, store_path, output_folder=None, threshold=None,
+                       progress_callback=None):
+        """
+        Re-render the annotated media of a run from its stored detections,
+        without running the model or writing new reports.
+
+        Args:
+            store_path (str): Detections CSV or .raw sidecar of the run
+            output_folder (str, optional): Folder to write to. Sidecars default
+                to the outputs of the original run, CSVs to the media output
+                path in the settings
+            threshold (float, optional): Only draw detections at or above it.
+                Sidecars default to the threshold in the settings, CSVs draw
+                every logged detection
+            progress_callback (callable, optional): Called with a percentage
+                and a message
+
+        Returns:
+            Dict with a summary of the rendered files
+        """
+        start_time = time.time()
+        if store_path.endswith(".raw"):
+            raw_predictions = RawPredictions(store_path)
+            if threshold is None:
+                threshold = self.model.settings_model.threshold
+            floor = raw_predictions.threshold_floor
+            if floor is not None and threshold < floor:
+                raise ValueError(
+                    f"Threshold {threshold} is below the {floor} floor the predictions were stored at")
+            jobs = load_raw_render_jobs(raw_predictions, threshold, output_folder)
+        else:
+            jobs = load_csv_render_jobs(
+                store_path,
+                output_folder or self.model.settings_model.media_output_path,
+                threshold)
+
+        render_results = self._render(jobs, progress_callback)
+        if progress_callback:
+            progress_callback(100, f"Rendered {render_results['successful_files']} files")
+
+        return {
+            'summary': {
+                'total_files': render_results['total_files'],
+                'successful_files': render_results['successful_files'],
+                'failed_files': render_results['failed_files'],
+                'threshold': threshold,
+                'total_processing_time_ms': (time.time() - start_time) * 1000
+            }
+        }
+
+    def _render(self, jobs, progress_callback=None):
+        """Render jobs on the configured number of workers, with progress."""
+        def render_progress(finished, message):
+            progress_callback(finished / len(jobs) * 100,
+                              f"File {finished}/{len(jobs)}: {message}")
+
+        return render_jobs(
+            jobs,
+            workers=self.model.settings_model.num_workers,
+            progress_callback=render_progress if progress_callback else None)
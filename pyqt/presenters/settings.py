@@ -78,7 +78,15 @@ class SettingsPresenter:
             "media_output_path": "/output",
             "report": "/reports",
             "recursive_folder_search": False,
-            "threshold": 0.7
+            "threshold": 0.7,
+            "batch_size": 8,
+            "execution_mode": "threaded",
+            "motion_gating": False,
+            "resume_predictions": False,
+            "use_result_cache": True,
+            "keep_raw_predictions": False,
+            "cascade_filter": False,
+            "sequence_grouping": False
         }
         self.model.save_settings(default_settings)
         self.load_settings_to_ui()
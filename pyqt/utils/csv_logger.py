@@ -1,34 +1,110 @@
+import atexit
 import csv
 import os
 import datetime
+import threading
 from typing import List, Dict, Any, Optional
 
+from utils.detection_store import DetectionStore
+from utils.parquet_sink import ParquetDetectionSink, pa
+from utils.raw_predictions import RawPredictionSink
+from utils.run_manifest import Checkpoint, RunManifest
+
 
 class DetectionCSVLogger:
     """
     CSV logger for YOLO detection results.
     Handles logging detection data for both images and videos with comprehensive metadata.
+
+    Detection rows are buffered in memory and written through one open file
+    handle by a background writer thread, in batches of flush_rows rows or
+    every flush_interval seconds. Call close() (or use the logger as a
+    context manager) to write any remaining rows.
+
+    With parquet_output enabled, the same rows are also written to a typed,
+    columnar Parquet file next to the CSV (requires pyarrow). With a
+    sqlite_path, they are also inserted into a DetectionStore database that
+    is shared by all sessions.
+
+    With a run_key, completed input files (see mark_completed()) are recorded
+    in a RunManifest once their rows are written. With resume enabled, the
+    logger continues the latest run with the same key: it appends to that
+    run's detection and summary CSVs instead of creating new ones, and
+    is_completed() tells which input files can be skipped. The rows logged
+    after the last checkpoint are dropped from the CSV and the SQLite store.
+
+    With a raw_threshold, the predictions passed to log_raw_detections()
+    (everything down to that confidence floor) are saved in a .raw sidecar
+    next to the CSV, written in chunks as the run goes, see
+    RawPredictionSink. A resumed run continues the sidecar of the
+    interrupted one, so it covers the whole run.
+
+    Burst-level results passed to log_sequences() go to a sequences CSV next
+    to the detection CSV, created on first use.
     """
 
-    def __init__(self, output_directory: str, model_name: str = "Unknown"):
+    def __init__(self, output_directory: str, model_name: str = "Unknown",
+                 flush_rows: int = 500, flush_interval: float = 1.0,
+                 parquet_output: bool = False, sqlite_path: Optional[str] = None,
+                 run_key: Optional[Dict[str, Any]] = None, resume: bool = False,
+                 raw_threshold: Optional[float] = None):
         """
         Initialize the CSV logger.
 
         Args:
             output_directory (str): Directory where CSV file will be saved
             model_name (str): Name of the AI model used for detection
+            flush_rows (int): Number of buffered rows that triggers a write
+            flush_interval (float): Maximum seconds a row waits in the buffer
+            parquet_output (bool): Also write detections to a Parquet file
+            sqlite_path (str, optional): SQLite database to also store detections in
+            run_key (dict, optional): Run identity from RunManifest.run_key(),
+                enables the checkpoint manifest
+            resume (bool): Continue the latest interrupted run with the same run_key
+            raw_threshold (float, optional): Confidence floor of the raw
+                predictions, enables the .raw sidecar
         """
         self.output_directory = output_directory
         self.model_name = model_name
-
-        # Generate filenames for both detection and summary files
-        self.csv_filename = self._generate_csv_filename("detections")
-        self.csv_path = output_directory.replace(
-            "\\", "/") + "/" + self.csv_filename
-
-        self.summary_filename = self._generate_csv_filename("summary")
-        self.summary_path = output_directory.replace(
-            "\\", "/") + "/" + self.summary_filename
+        self.flush_rows = max(1, flush_rows)
+        self.flush_interval = flush_interval
+
+        self._csv_file = None
+        self._csv_writer = None
+        self._buffer = []
+        self._closed = False
+        self._lock = threading.Lock()
+        self._buffer_ready = threading.Condition(self._lock)
+        self._write_lock = threading.Lock()
+        self._parquet_sink = None
+        self.parquet_path = None
+        self._detection_store = None
+        self.sqlite_path = None
+        self._run_key = run_key
+        self._manifest = None
+        self.manifest_path = None
+        self.resumed = False
+        self._raw_sink = None
+        self.raw_path = None
+        self.sequences_path = None
+
+        if run_key and resume:
+            self._manifest = RunManifest.find_resumable(output_directory, run_key)
+            self.resumed = self._manifest is not None
+
+        if self.resumed:
+            # Continue the reports of the interrupted run
+            self.csv_path = self._manifest.detections_csv
+            self.summary_path = self._manifest.summary_csv
+            self.manifest_path = self._manifest.path
+        else:
+            # Generate filenames for both detection and summary files
+            self.csv_path = output_directory.replace(
+                "\\", "/") + "/" + self._generate_csv_filename("detections")
+            self.summary_path = output_directory.replace(
+                "\\", "/") + "/" + self._generate_csv_filename("summary")
+        self.csv_filename = os.path.basename(self.csv_path)
+        self.summary_filename = os.path.basename(self.summary_path)
 
         self.headers = [
             'detection_id',
@@ -55,13 +131,32 @@ class DetectionCSVLogger:
             'model_version',
             'detection_threshold',
             'processing_time_ms',
-            'additional_metadata'
+            'additional_metadata',
+            'stage'
         ]
-        self.session_id = self._generate_session_id()
-        self.detection_counter = 0
+        if self.resumed:
+            self.session_id = self._manifest.session_id
+            self.detection_counter = self._manifest.detection_id
+        else:
+            self.session_id = self._generate_session_id()
+            self.detection_counter = 0
         self._ensure_directory_exists()
         self._initialize_csv()
         self._initialize_summary_csv()
+        if run_key and not self.resumed:
+            self._initialize_manifest()
+        if parquet_output:
+            self._initialize_parquet()
+        if sqlite_path:
+            self._initialize_sqlite(sqlite_path)
+        if raw_threshold is not None:
+            self._initialize_raw(raw_threshold)
+
+        self._writer_thread = threading.Thread(
+            target=self._writer_loop, name="csv-logger-writer", daemon=True)
+        self._writer_thread.start()
+        # Last resort so buffered rows are not lost if close() is never called
+        atexit.register(self.close)
 
     def _generate_csv_filename(self, file_type: str = "detections") -> str:
         """Generate a unique CSV filename with timestamp."""
@@ -81,15 +176,273 @@ class DetectionCSVLogger:
             os.makedirs(self.output_directory, exist_ok=True)
 
     def _initialize_csv(self):
-        """Initialize the CSV file with headers."""
+        """Initialize the CSV file with headers and keep it open for writing."""
         try:
-            with open(self.csv_path, 'w', newline='', encoding='utf-8') as csvfile:
-                writer = csv.writer(csvfile)
-                writer.writerow(self.headers)
+            if self.resumed:
+                # Drop the rows written after the last checkpoint, they belong
+                # to a file that is processed again
+                with open(self.csv_path, 'r+b') as csv_file:
+                    csv_file.truncate(self._manifest.csv_offset)
+                self._csv_file = open(self.csv_path, 'a',
+                                      newline='', encoding='utf-8')
+                self._csv_writer = csv.writer(self._csv_file)
+                print(f"Detection CSV logger resumed: {self.csv_path} "
+                      f"({len(self._manifest.completed)} files completed)")
+                return
+
+            self._csv_file = open(self.csv_path, 'w',
+                                  newline='', encoding='utf-8')
+            self._csv_writer = csv.writer(self._csv_file)
+            self._csv_writer.writerow(self.headers)
+            self._csv_file.flush()
             print(f"Detection CSV logger initialized: {self.csv_path}")
         except Exception as e:
             print(f"Error initializing detection CSV file: {e}")
 
+    def _initialize_manifest(self):
+        """Start the checkpoint manifest of this run next to its CSV files."""
+        if self._csv_file is None:
+            return
+        try:
+            self.manifest_path = os.path.join(
+                self.output_directory,
+                "manifest_" + os.path.splitext(self.csv_filename)[0][len("detections_"):] + ".jsonl")
+            self._manifest = RunManifest.create(
+                self.manifest_path, self._run_key, self.session_id,
+                self.csv_path, self.summary_path, self._csv_file.tell())
+            print(f"Run manifest initialized: {self.manifest_path}")
+        except Exception as e:
+            self._manifest = None
+            self.manifest_path = None
+            print(f"Error initializing run manifest: {e}")
+
+    def _initialize_parquet(self):
+        """Initialize the Parquet file that mirrors the detection CSV."""
+        if pa is None:
+            print("pyarrow is not installed, skipping Parquet detection output")
+            return
+        try:
+            self.parquet_path = os.path.splitext(self.csv_path)[0] + ".parquet"
+            if self.resumed:
+                # Parquet files cannot be appended to, the resumed rows get
+                # their own file
+                self.parquet_path = os.path.splitext(self.csv_path)[0] + \
+                    datetime.datetime.now().strftime("_resumed_%Y%m%d_%H%M%S") + ".parquet"
+            self._parquet_sink = ParquetDetectionSink(
+                self.parquet_path, self.headers)
+            print(f"Detection Parquet logger initialized: {self.parquet_path}")
+        except Exception as e:
+            self.parquet_path = None
+            print(f"Error initializing detection Parquet file: {e}")
+
+    def _initialize_raw(self, raw_threshold: float):
+        """Start the raw prediction sidecar next to the CSV."""
+        try:
+            self.raw_path = os.path.splitext(self.csv_path)[0] + ".raw"
+            # A resumed run keeps the records of the files it completed
+            keep_records = self._manifest.raw_records if self.resumed else None
+            self._raw_sink = RawPredictionSink(self.raw_path, {
+                'threshold_floor': raw_threshold,
+                'model_name': self.model_name,
+                'session_id': self.session_id,
+                'detections_csv': self.csv_path
+            }, keep_records=keep_records)
+            print(f"Raw prediction sidecar initialized: {self.raw_path}")
+        except Exception as e:
+            self._raw_sink = None
+            self.raw_path = None
+            print(f"Error initializing raw prediction sidecar: {e}")
+
+    def _initialize_sqlite(self, sqlite_path: str):
+        """Open the detection database and register this session in it."""
+        try:
+            self._detection_store = DetectionStore(sqlite_path)
+            self._detection_store.start_session(self.session_id, self.model_name)
+            if self.resumed:
+                # Like the CSV, drop the rows after the last checkpoint
+                self._detection_store.remove_detections_after(
+                    self.session_id, self._manifest.detection_id)
+            self.sqlite_path = sqlite_path
+            print(f"Detection SQLite store initialized: {sqlite_path}")
+        except Exception as e:
+            self._detection_store = None
+            print(f"Error initializing detection SQLite store: {e}")
+
+    def _writer_loop(self):
+        """Background thread writing buffered rows in batches."""
+        while True:
+            with self._buffer_ready:
+                if not self._closed and len(self._buffer) < self.flush_rows:
+                    self._buffer_ready.wait(self.flush_interval)
+                if self._closed:
+                    return
+            self._drain()
+
+    def _drain(self):
+        """Write all buffered rows to the CSV file, keeping their order."""
+        with self._write_lock:
+            with self._lock:
+                items, self._buffer = self._buffer, []
+            if not items or self._csv_writer is None:
+                return
+
+            rows = []
+            checkpoints = []
+            try:
+                written = 0
+                for item in items:
+                    if isinstance(item, Checkpoint):
+                        # Everything before the checkpoint belongs to files
+                        # that are complete, note where their rows end
+                        self._csv_writer.writerows(rows[written:])
+                        written = len(rows)
+                        item.csv_offset = self._csv_file.tell()
+                        checkpoints.append(item)
+                    else:
+                        rows.append(item)
+                self._csv_writer.writerows(rows[written:])
+                self._csv_file.flush()
+            except Exception as e:
+                checkpoints = []
+                print(f"Error logging detections to CSV: {e}")
+            if self._parquet_sink:
+                try:
+                    self._parquet_sink.write_rows(rows)
+                except Exception as e:
+                    print(f"Error logging detections to Parquet: {e}")
+            if self._detection_store:
+                try:
+                    self._detection_store.add_detection_rows(rows, self.headers)
+                except Exception as e:
+                    print(f"Error logging detections to SQLite: {e}")
+            if self._manifest and checkpoints and self._raw_sink:
+                # The raw records of the checkpointed files must be on disk too
+                try:
+                    self._raw_sink.flush()
+                except Exception as e:
+                    checkpoints = []
+                    print(f"Error writing raw prediction sidecar: {e}")
+            if self._manifest and checkpoints:
+                try:
+                    self._manifest.record(checkpoints)
+                except Exception as e:
+                    print(f"Error writing run manifest: {e}")
+
+    def log_raw_detections(self,
+                           file_path: str,
+                           output_path: str,
+                           detections: List[Dict[str, Any]],
+                           frame_number: Optional[int] = None,
+                           frame_timestamp: Optional[float] = None,
+                           image_dimensions: Optional[tuple] = None,
+                           status: str = ""):
+        """
+        Keep the raw predictions of an image or video frame for the sidecar.
+
+        Args:
+            file_path (str): Path to the processed file
+            output_path (str): Path of the annotated output
+            detections (List[Dict]): All predictions down to the raw threshold
+            frame_number (int, optional): Frame number for video files
+            frame_timestamp (float, optional): Timestamp within video
+            image_dimensions (tuple, optional): (width, height) of the image/frame
+            status (str): Frame status, as in additional_metadata
+        """
+        if self._raw_sink is None:
+            return
+        try:
+            self._raw_sink.add(file_path, output_path, detections, frame_number,
+                               frame_timestamp, image_dimensions, status)
+        except Exception as e:
+            print(f"Error logging raw predictions: {e}")
+
+    def mark_completed(self, file_path: str):
+        """
+        Record that all detections of an input file were logged.
+
+        The file is added to the run manifest once its rows are written, so a
+        resumed run can skip it.
+
+        Args:
+            file_path (str): Path of the processed file
+        """
+        if self._manifest is None:
+            return
+        with self._lock:
+            if self._closed:
+                return
+            try:
+                self._buffer.append(Checkpoint(
+                    file_path, self.detection_counter,
+                    self._raw_sink.record_count if self._raw_sink else None))
+            except OSError as e:
+                print(f"Error recording completed file {file_path}: {e}")
+
+    def is_completed(self, file_path: str) -> bool:
+        """
+        Check if an input file was completed by the resumed run and has not
+        changed since.
+        """
+        return self.resumed and self._manifest.is_completed(file_path)
+
+    def flush(self):
+        """Write all buffered rows to disk now."""
+        self._drain()
+        with self._write_lock:
+            if self._parquet_sink:
+                try:
+                    self._parquet_sink.flush()
+                except Exception as e:
+                    print(f"Error logging detections to Parquet: {e}")
+            if self._raw_sink:
+                try:
+                    self._raw_sink.flush()
+                except Exception as e:
+                    print(f"Error writing raw prediction sidecar: {e}")
+
+    def close(self):
+        """Stop the writer thread, write any remaining rows and close the file."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._buffer_ready.notify_all()
+
+        if self._writer_thread is not threading.current_thread():
+            self._writer_thread.join()
+        self._drain()
+
+        with self._write_lock:
+            if self._csv_file:
+                self._csv_file.close()
+                self._csv_file = None
+                self._csv_writer = None
+            if self._parquet_sink:
+                try:
+                    self._parquet_sink.close()
+                except Exception as e:
+                    print(f"Error closing detection Parquet file: {e}")
+                self._parquet_sink = None
+            if self._detection_store:
+                self._detection_store.close()
+                self._detection_store = None
+            if self._manifest:
+                self._manifest.close()
+                self._manifest = None
+            if self._raw_sink:
+                try:
+                    self._raw_sink.close()
+                except Exception as e:
+                    print(f"Error writing raw prediction sidecar: {e}")
+                self._raw_sink = None
+        atexit.unregister(self.close)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
     def _initialize_summary_csv(self):
         """Initialize the summary CSV file with headers."""
         summary_headers = [
@@ -109,6 +462,10 @@ class DetectionCSVLogger:
             'detection_threshold',
             'settings_used'
         ]
+        if self.resumed and os.path.exists(self.summary_path):
+            # Each resumed part adds its own summary row
+            print(f"Summary CSV logger resumed: {self.summary_path}")
+            return
         try:
             with open(self.summary_path, 'w', newline='', encoding='utf-8') as csvfile:
                 writer = csv.writer(csvfile)
@@ -126,7 +483,8 @@ class DetectionCSVLogger:
                        processing_time_ms: Optional[float] = None,
                        model_version: str = "1.0",
                        detection_threshold: float = 0.5,
-                       additional_metadata: str = ""):
+                       additional_metadata: str = "",
+                       stage: str = ""):
         """
         Log detection results to CSV.
 
@@ -140,76 +498,23 @@ class DetectionCSVLogger:
             model_version (str): Version of the model used
             detection_threshold (float): Detection confidence threshold used
             additional_metadata (str): Any additional metadata
+            stage (str): Cascade stage that decided the result, "screen" for
+                frames the screening pass found empty, "detect" for frames
+                that went through full detection, "" without a cascade
         """
         try:
-            current_timestamp = datetime.datetime.now().isoformat()
-            file_name = os.path.basename(file_path)
-            file_type = self._get_file_type(file_path)
-            img_width, img_height = image_dimensions if image_dimensions else (
-                0, 0)
-
-            rows_to_write = []
-
-            # If no detections, log one row indicating no detections
-            if not detections:
-                self.detection_counter += 1
-                row = [
-                    self.detection_counter,
-                    self.session_id,
-                    current_timestamp,
-                    file_name,
-                    file_path,
-                    file_type,
-                    frame_number if frame_number is not None else "",
-                    frame_timestamp if frame_timestamp is not None else "",
-                    "NO_DETECTION",
-                    0.0,
-                    "", "", "", "",  # bbox coordinates
-                    "", "", "", "",  # bbox coordinates
-                    img_width,
-                    img_height,
-                    self.model_name,
-                    model_version,
-                    detection_threshold,
-                    processing_time_ms if processing_time_ms is not None else "",
-                    additional_metadata
-                ]
-                rows_to_write.append(row)
-            else:
-                # Log each detection
-                for detection in detections:
-                    self.detection_counter += 1
+            with self._lock:
+                current_timestamp = datetime.datetime.now().isoformat()
+                file_name = os.path.basename(file_path)
+                file_type = self._get_file_type(file_path)
+                img_width, img_height = image_dimensions if image_dimensions else (
+                    0, 0)
 
-                    # Extract detection data
-                    class_name = detection.get('class', 'Unknown')
-                    confidence = detection.get('confidence', 0.0)
-                    bbox = detection.get('bbox', {})
-
-                    # Handle different bbox formats
-                    if isinstance(bbox, dict):
-                        x_center = bbox.get('x_center', 0)
-                        y_center = bbox.get('y_center', 0)
-                        width = bbox.get('width', 0)
-                        height = bbox.get('height', 0)
-                    elif isinstance(bbox, (list, tuple)) and len(bbox) >= 4:
-                        # Assume format: [x_min, y_min, x_max, y_max] or [x_center, y_center, width, height]
-                        if 'x_min' in str(detection).lower() or len(bbox) == 4:
-                            x_min, y_min, x_max, y_max = bbox[:4]
-                            x_center = (x_min + x_max) / 2
-                            y_center = (y_min + y_max) / 2
-                            width = x_max - x_min
-                            height = y_max - y_min
-                        else:
-                            x_center, y_center, width, height = bbox[:4]
-                    else:
-                        x_center = y_center = width = height = 0
-
-                    # Calculate bounding box coordinates
-                    x_min = x_center - width / 2
-                    y_min = y_center - height / 2
-                    x_max = x_center + width / 2
-                    y_max = y_center + height / 2
+                rows_to_write = []
 
+                # If no detections, log one row indicating no detections
+                if not detections:
+                    self.detection_counter += 1
                     row = [
                         self.detection_counter,
                         self.session_id,
@@ -219,32 +524,92 @@ class DetectionCSVLogger:
                         file_type,
                         frame_number if frame_number is not None else "",
                         frame_timestamp if frame_timestamp is not None else "",
-                        class_name,
-                        round(confidence, 4),
-                        round(x_center, 2),
-                        round(y_center, 2),
-                        round(width, 2),
-                        round(height, 2),
-                        round(x_min, 2),
-                        round(y_min, 2),
-                        round(x_max, 2),
-                        round(y_max, 2),
+                        "NO_DETECTION",
+                        0.0,
+                        "", "", "", "",  # bbox coordinates
+                        "", "", "", "",  # bbox coordinates
                         img_width,
                         img_height,
                         self.model_name,
                         model_version,
                         detection_threshold,
                         processing_time_ms if processing_time_ms is not None else "",
-                        additional_metadata
+                        additional_metadata,
+                        stage
                     ]
                     rows_to_write.append(row)
-
-            # Write all rows to CSV
-            with open(self.csv_path, 'a', newline='', encoding='utf-8') as csvfile:
-                writer = csv.writer(csvfile)
-                for row in rows_to_write:
-                    writer.writerow(row)
-
+                else:
+                    # Log each detection
+                    for detection in detections:
+                        self.detection_counter += 1
+
+                        # Extract detection data
+                        class_name = detection.get('class', 'Unknown')
+                        confidence = detection.get('confidence', 0.0)
+                        bbox = detection.get('bbox', {})
+
+                        # Handle different bbox formats
+                        if isinstance(bbox, dict):
+                            x_center = bbox.get('x_center', 0)
+                            y_center = bbox.get('y_center', 0)
+                            width = bbox.get('width', 0)
+                            height = bbox.get('height', 0)
+                        elif isinstance(bbox, (list, tuple)) and len(bbox) >= 4:
+                            # Assume format: [x_min, y_min, x_max, y_max] or [x_center, y_center, width, height]
+                            if 'x_min' in str(detection).lower() or len(bbox) == 4:
+                                x_min, y_min, x_max, y_max = bbox[:4]
+                                x_center = (x_min + x_max) / 2
+                                y_center = (y_min + y_max) / 2
+                                width = x_max - x_min
+                                height = y_max - y_min
+                            else:
+                                x_center, y_center, width, height = bbox[:4]
+                        else:
+                            x_center = y_center = width = height = 0
+
+                        # Calculate bounding box coordinates
+                        x_min = x_center - width / 2
+                        y_min = y_center - height / 2
+                        x_max = x_center + width / 2
+                        y_max = y_center + height / 2
+
+                        row = [
+                            self.detection_counter,
+                            self.session_id,
+                            current_timestamp,
+                            file_name,
+                            file_path,
+                            file_type,
+                            frame_number if frame_number is not None else "",
+                            frame_timestamp if frame_timestamp is not None else "",
+                            class_name,
+                            round(confidence, 4),
+                            round(x_center, 2),
+                            round(y_center, 2),
+                            round(width, 2),
+                            round(height, 2),
+                            round(x_min, 2),
+                            round(y_min, 2),
+                            round(x_max, 2),
+                            round(y_max, 2),
+                            img_width,
+                            img_height,
+                            self.model_name,
+                            model_version,
+                            detection_threshold,
+                            processing_time_ms if processing_time_ms is not None else "",
+                            additional_metadata,
+                            stage
+                        ]
+                        rows_to_write.append(row)
+
+                # Hand the rows to the writer thread
+                if self._closed:
+                    print("Error logging detections to CSV: logger is closed")
+                    return
+                self._buffer.extend(rows_to_write)
+                if len(self._buffer) >= self.flush_rows:
+                    self._buffer_ready.notify()
         except Exception as e:
             print(f"Error logging detections to CSV: {e}")
 
@@ -282,6 +647,9 @@ class DetectionCSVLogger:
             end_time (str): Session end time
             settings_used (dict, optional): Settings used for this session
         """
+        # Make sure the detections of the session are on disk first
+        self.flush()
+
         try:
             # Extract specific settings for structured logging
             input_folder = settings_used.get(
@@ -321,9 +689,153 @@ class DetectionCSVLogger:
 
             print(f"Session summary logged to: {self.summary_path}")
 
+            if self._detection_store:
+                self._detection_store.end_session(self.session_id, {
+                    'model_version': "1.0",
+                    'started_at': start_time,
+                    'ended_at': end_time,
+                    'input_folder': input_folder,
+                    'media_output_path': media_output_path,
+                    'detection_threshold': detection_threshold,
+                    'total_files': total_files_processed,
+                    'total_detections': total_detections,
+                    'total_processing_time_ms': round(total_processing_time_ms, 2),
+                    'settings': str(settings_used) if settings_used else 'Default'
+                })
+
         except Exception as e:
             print(f"Error logging session summary: {e}")
 
+    def _get_sequences_path(self) -> str:
+        """Sequences CSV path, next to the detection CSV."""
+        return os.path.join(os.path.dirname(self.csv_path),
+                            "sequences_" + self.csv_filename[len("detections_"):])
+
+    def keep_sequences(self, sequence_ids) -> set:
+        """
+        Drop the rows of all sequences but sequence_ids from the sequences CSV
+        of the resumed run, so that the sequences it did not finish can be
+        logged again.
+
+        Args:
+            sequence_ids: Ids of the sequences whose images are all completed
+
+        Returns:
+            The ids of sequence_ids that have rows, the sequences not to
+            process again
+        """
+        sequence_ids = set(sequence_ids)
+        sequences_path = self._get_sequences_path()
+        if not os.path.exists(sequences_path):
+            return set()
+        try:
+            with open(sequences_path, newline='', encoding='utf-8') as csvfile:
+                rows = list(csv.reader(csvfile))
+            if not rows:
+                return set()
+            header = rows[0]
+            id_column = header.index('sequence_id')
+            # A row cut short by the interruption has fewer columns
+            kept = [row for row in rows[1:]
+                    if len(row) == len(header) and row[id_column] in sequence_ids]
+            temp_path = sequences_path + ".tmp"
+            with open(temp_path, 'w', newline='', encoding='utf-8') as csvfile:
+                writer = csv.writer(csvfile)
+                writer.writerow(header)
+                writer.writerows(kept)
+            os.replace(temp_path, sequences_path)
+            self.sequences_path = sequences_path
+        except (OSError, ValueError) as e:
+            print(f"Error resuming sequence results: {e}")
+            return set()
+        logged = {row[id_column] for row in kept}
+        print(f"Sequence CSV logger resumed: {sequences_path} "
+              f"({len(logged)} sequences logged)")
+        return logged
+
+    def read_results(self, file_paths) -> Dict[str, Dict[str, Any]]:
+        """
+        Read back the results of images the resumed run completed, as far as
+        the detection CSV records them.
+
+        Args:
+            file_paths: Paths of the images, as logged
+
+        Returns:
+            Dict of file path -> result dict with the class and confidence of
+            each detection, 'skipped' when the image was logged with stage
+            "sequence" without inference
+        """
+        file_paths = set(file_paths)
+        results = {}
+        if not file_paths:
+            return results
+        self.flush()
+        try:
+            with open(self.csv_path, newline='', encoding='utf-8') as csvfile:
+                for row in csv.DictReader(csvfile):
+                    if row['file_path'] not in file_paths:
+                        continue
+                    result = results.setdefault(row['file_path'], {
+                        'success': True,
+                        'detections': [],
+                        'skipped': row['stage'] == "sequence"
+                    })
+                    if row['detection_class'] != "NO_DETECTION":
+                        result['detections'].append({
+                            'class': row['detection_class'],
+                            'confidence': float(row['confidence'])
+                        })
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Error reading logged detections: {e}")
+        return results
+
+    def log_sequences(self, sequence_rows: List[Dict[str, Any]]):
+        """
+        Log the results of image sequences (camera bursts) to the sequences CSV.
+
+        The buffered detection rows are written first, so that a sequence
+        only has rows once its images are completed in the run manifest.
+
+        Args:
+            sequence_rows (List[Dict]): One dict per sequence and class, keyed
+                by the sequences CSV column names except session_id
+        """
+        if not sequence_rows:
+            return
+        self._drain()
+        sequence_headers = [
+            'session_id',
+            'sequence_id',
+            'camera_folder',
+            'start_time',
+            'end_time',
+            'image_count',
+            'processed_images',
+            'representative_file',
+            'sequence_status',
+            'detection_class',
+            'max_count',
+            'max_confidence',
+            'detection_count'
+        ]
+        try:
+            sequences_path = self._get_sequences_path()
+            # A resumed run appends to the sequences CSV of the interrupted one
+            write_header = not os.path.exists(sequences_path)
+            with open(sequences_path, 'a', newline='', encoding='utf-8') as csvfile:
+                writer = csv.writer(csvfile)
+                if write_header:
+                    writer.writerow(sequence_headers)
+                for sequence_row in sequence_rows:
+                    writer.writerow([self.session_id] + [
+                        sequence_row.get(header, "") for header in sequence_headers[1:]])
+            self.sequences_path = sequences_path
+            if write_header:
+                print(f"Sequence results logged to: {sequences_path}")
+        except Exception as e:
+            print(f"Error logging sequence results: {e}")
+
     def get_csv_path(self) -> str:
         """Get the full path to the detection CSV file."""
         return self.csv_path
@@ -333,11 +845,22 @@ class DetectionCSVLogger:
         return self.summary_path
 
     def get_csv_paths(self) -> Dict[str, str]:
-        """Get both CSV file paths."""
-        return {
+        """Get both CSV file paths, plus the Parquet, SQLite, manifest, raw sidecar and sequence paths when enabled."""
+        paths = {
             'detections': self.csv_path,
             'summary': self.summary_path
         }
+        if self.parquet_path:
+            paths['parquet'] = self.parquet_path
+        if self.sqlite_path:
+            paths['sqlite'] = self.sqlite_path
+        if self.manifest_path:
+            paths['manifest'] = self.manifest_path
+        if self.raw_path:
+            paths['raw'] = self.raw_path
+        if self.sequences_path:
+            paths['sequences'] = self.sequences_path
+        return paths
 
     def get_detection_count(self) -> int:
         """Get the current detection counter."""
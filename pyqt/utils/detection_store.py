@@ -0,0 +1,307 @@
+import datetime
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional
+
+
+class DetectionStore:
+    """
+    SQLite store for detection results shared by all prediction sessions.
+
+    Sessions, files and detections live in separate tables indexed on file
+    path, class, session and frame number, so per-file and per-class
+    questions can be answered without re-reading the CSV reports. The
+    database runs in WAL mode and rows are inserted in batched transactions.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS sessions (
+            session_id TEXT PRIMARY KEY,
+            model_name TEXT,
+            model_version TEXT,
+            started_at TEXT,
+            ended_at TEXT,
+            input_folder TEXT,
+            media_output_path TEXT,
+            detection_threshold REAL,
+            total_files INTEGER,
+            total_detections INTEGER,
+            total_processing_time_ms REAL,
+            settings TEXT
+        );
+
+        CREATE TABLE IF NOT EXISTS files (
+            file_id INTEGER PRIMARY KEY,
+            file_path TEXT NOT NULL UNIQUE,
+            file_name TEXT,
+            folder TEXT,
+            file_type TEXT,
+            capture_day TEXT,
+            image_width INTEGER,
+            image_height INTEGER
+        );
+
+        CREATE TABLE IF NOT EXISTS detections (
+            detection_id INTEGER PRIMARY KEY,
+            session_id TEXT NOT NULL REFERENCES sessions(session_id),
+            file_id INTEGER NOT NULL REFERENCES files(file_id),
+            frame_number INTEGER,
+            frame_timestamp REAL,
+            detected_at TEXT,
+            detection_class TEXT,
+            confidence REAL,
+            bbox_x_min REAL,
+            bbox_y_min REAL,
+            bbox_x_max REAL,
+            bbox_y_max REAL,
+            processing_time_ms REAL,
+            additional_metadata TEXT,
+            stage TEXT,
+            session_detection_id INTEGER
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_files_folder ON files(folder);
+        CREATE INDEX IF NOT EXISTS idx_files_capture_day ON files(capture_day);
+        CREATE INDEX IF NOT EXISTS idx_detections_class
+            ON detections(detection_class, file_id);
+        CREATE INDEX IF NOT EXISTS idx_detections_session
+            ON detections(session_id);
+        CREATE INDEX IF NOT EXISTS idx_detections_file_frame
+            ON detections(file_id, frame_number);
+    """
+
+    # Session columns that add up over the summaries of a session
+    SUMMARY_TOTALS = ('total_files', 'total_detections', 'total_processing_time_ms')
+
+    def __init__(self, db_path: str):
+        """
+        Open (and create if needed) the detection database.
+
+        Args:
+            db_path (str): Path to the SQLite database file
+        """
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # The logger writes from its background thread, access is serialized
+        # through self._lock
+        self._lock = threading.Lock()
+        self._file_ids = {}
+        self.connection = sqlite3.connect(db_path, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(self.SCHEMA)
+        self._add_missing_columns()
+        self.connection.commit()
+
+    def _add_missing_columns(self):
+        """Add the columns introduced after a database was created."""
+        columns = {row['name'] for row in
+                   self.connection.execute("PRAGMA table_info(detections)")}
+        if 'stage' not in columns:
+            self.connection.execute("ALTER TABLE detections ADD COLUMN stage TEXT")
+        if 'session_detection_id' not in columns:
+            self.connection.execute(
+                "ALTER TABLE detections ADD COLUMN session_detection_id INTEGER")
+
+    def start_session(self, session_id: str, model_name: str, started_at: Optional[str] = None):
+        """Register a new prediction session."""
+        with self._lock, self.connection:
+            self.connection.execute(
+                "INSERT OR IGNORE INTO sessions (session_id, model_name, started_at) "
+                "VALUES (?, ?, ?)",
+                (session_id, model_name,
+                 started_at or datetime.datetime.now().isoformat()))
+
+    def end_session(self, session_id: str, summary: Dict[str, Any]):
+        """
+        Store the summary of a finished session.
+
+        A session can log several summaries, one for its images and one for
+        its videos, and another one per resumed part. Their file, detection
+        and time totals are added up and the first start time is kept.
+
+        Args:
+            session_id (str): Session to update
+            summary (dict): Summary values, using the column names of the
+                sessions table
+        """
+        columns = ['model_version', 'started_at', 'ended_at', 'input_folder',
+                   'media_output_path', 'detection_threshold', 'total_files',
+                   'total_detections', 'total_processing_time_ms', 'settings']
+        values = {column: summary[column]
+                  for column in columns if summary.get(column) not in (None, '')}
+        if not values:
+            return
+
+        def assignment(column):
+            if column in self.SUMMARY_TOTALS:
+                return f"{column} = COALESCE({column}, 0) + ?"
+            if column == 'started_at':
+                return f"{column} = COALESCE({column}, ?)"
+            return f"{column} = ?"
+
+        assignments = ", ".join(assignment(column) for column in values)
+        with self._lock, self.connection:
+            self.connection.execute(
+                f"UPDATE sessions SET {assignments} WHERE session_id = ?",
+                (*values.values(), session_id))
+
+    def add_detection_rows(self, rows: List[List[Any]], headers: List[str]):
+        """
+        Insert detection rows, as produced by DetectionCSVLogger, in one transaction.
+
+        Args:
+            rows (List[List]): Rows in the order of headers
+            headers (List[str]): Column names of the rows
+        """
+        if not rows:
+            return
+
+        records = [dict(zip(headers, row)) for row in rows]
+        with self._lock, self.connection:
+            detections = []
+            for record in records:
+                file_id = self._get_file_id(record)
+                detections.append((
+                    record['session_id'],
+                    file_id,
+                    self._value(record.get('frame_number')),
+                    self._value(record.get('frame_timestamp')),
+                    record.get('timestamp'),
+                    record.get('detection_class'),
+                    self._value(record.get('confidence')),
+                    self._value(record.get('bbox_x_min')),
+                    self._value(record.get('bbox_y_min')),
+                    self._value(record.get('bbox_x_max')),
+                    self._value(record.get('bbox_y_max')),
+                    self._value(record.get('processing_time_ms')),
+                    record.get('additional_metadata') or None,
+                    record.get('stage') or None,
+                    self._value(record.get('detection_id'))
+                ))
+
+            self.connection.executemany(
+                "INSERT INTO detections (session_id, file_id, frame_number, "
+                "frame_timestamp, detected_at, detection_class, confidence, "
+                "bbox_x_min, bbox_y_min, bbox_x_max, bbox_y_max, "
+                "processing_time_ms, additional_metadata, stage, "
+                "session_detection_id) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                detections)
+
+    def remove_detections_after(self, session_id: str, detection_id: int):
+        """
+        Remove the detections a session logged after one of its rows.
+
+        Used when an interrupted session is resumed, for the rows of the file
+        it was working on, which are logged again.
+
+        Args:
+            session_id (str): Session to trim
+            detection_id (int): detection_id (in the session's reports) of
+                the last row to keep
+        """
+        with self._lock, self.connection:
+            self.connection.execute(
+                "DELETE FROM detections WHERE session_id = ? AND session_detection_id > ?",
+                (session_id, detection_id))
+
+    def _get_file_id(self, record: Dict[str, Any]) -> int:
+        """Get the id of a file, inserting it on first use."""
+        file_path = record['file_path']
+        file_id = self._file_ids.get(file_path)
+        if file_id is not None:
+            return file_id
+
+        self.connection.execute(
+            "INSERT OR IGNORE INTO files (file_path, file_name, folder, file_type, "
+            "capture_day, image_width, image_height) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (file_path,
+             record.get('file_name') or os.path.basename(file_path),
+             os.path.dirname(file_path),
+             record.get('file_type'),
+             self._capture_day(file_path, record.get('timestamp')),
+             self._value(record.get('image_width')),
+             self._value(record.get('image_height'))))
+        file_id = self.connection.execute(
+            "SELECT file_id FROM files WHERE file_path = ?", (file_path,)).fetchone()[0]
+        self._file_ids[file_path] = file_id
+        return file_id
+
+    @staticmethod
+    def _capture_day(file_path: str, fallback_timestamp: Optional[str]) -> Optional[str]:
+        """Day a file was recorded, taken from its modification time."""
+        try:
+            return datetime.date.fromtimestamp(os.path.getmtime(file_path)).isoformat()
+        except OSError:
+            return fallback_timestamp[:10] if fallback_timestamp else None
+
+    @staticmethod
+    def _value(value: Any) -> Any:
+        """Store empty CSV fields as NULL."""
+        return None if value == "" else value
+
+    def class_counts(self, group_by: str = 'folder',
+                     session_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Count detections per class per folder or per day.
+
+        Args:
+            group_by (str): 'folder' or 'day'
+            session_id (str, optional): Only count detections of this session
+
+        Returns:
+            List of dicts with the group, detection_class, detections and files
+        """
+        group_column = {'folder': 'f.folder', 'day': 'f.capture_day'}.get(group_by)
+        if group_column is None:
+            raise ValueError(f"Unknown grouping: {group_by}")
+
+        query = (
+            f"SELECT {group_column} AS {group_by}, d.detection_class, "
+            "COUNT(*) AS detections, COUNT(DISTINCT d.file_id) AS files "
+            "FROM detections d JOIN files f ON f.file_id = d.file_id "
+            "WHERE d.detection_class != 'NO_DETECTION'")
+        parameters = []
+        if session_id:
+            query += " AND d.session_id = ?"
+            parameters.append(session_id)
+        query += f" GROUP BY {group_column}, d.detection_class ORDER BY 1, 2"
+
+        with self._lock:
+            return [dict(row) for row in self.connection.execute(query, parameters)]
+
+    def frames_with_class(self, detection_class: str, video_path: str,
+                          session_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Get all frames of a video in which a class was detected.
+
+        Returns:
+            List of dicts with frame_number, frame_timestamp, detections and
+            max_confidence, ordered by frame number
+        """
+        query = (
+            "SELECT d.frame_number, d.frame_timestamp, COUNT(*) AS detections, "
+            "MAX(d.confidence) AS max_confidence "
+            "FROM detections d JOIN files f ON f.file_id = d.file_id "
+            "WHERE f.file_path = ? AND d.detection_class = ?")
+        parameters = [video_path, detection_class]
+        if session_id:
+            query += " AND d.session_id = ?"
+            parameters.append(session_id)
+        query += " GROUP BY d.frame_number ORDER BY d.frame_number"
+
+        with self._lock:
+            return [dict(row) for row in self.connection.execute(query, parameters)]
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            if self.connection:
+                self.connection.close()
+                self.connection = None
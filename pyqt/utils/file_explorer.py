@@ -1,127 +1,15 @@
-import glob
 import os
 from datetime import datetime
 from pathlib import Path
 
-import cv2
-from PIL import Image, ImageQt
-from PyQt5.QtCore import QSize, Qt, QThread, pyqtSignal
+from PyQt5.QtCore import QSize, Qt, QTimer
 from PyQt5.QtGui import QIcon, QPixmap
 from PyQt5.QtWidgets import (QComboBox, QDialog, QFileDialog, QGroupBox,
                              QHBoxLayout, QLabel, QListWidget, QListWidgetItem,
                              QProgressBar, QPushButton, QVBoxLayout)
 
-
-class ThumbnailGenerator(QThread):
-    """Background thread for generating thumbnails"""
-
-    thumbnail_ready = pyqtSignal(str, QPixmap)  # file_path, thumbnail
-    progress_updated = pyqtSignal(int, int)  # current, total
-
-    def __init__(self, file_paths, thumbnail_size=(120, 120)):
-        super().__init__()
-        self.file_paths = file_paths
-        self.thumbnail_size = thumbnail_size
-        self.is_running = True
-
-    def run(self):
-        """Generate thumbnails for all files"""
-        total_files = len(self.file_paths)
-
-        for i, file_path in enumerate(self.file_paths):
-            if not self.is_running:
-                break
-
-            thumbnail = self.generate_thumbnail(file_path)
-            if thumbnail:
-                self.thumbnail_ready.emit(file_path, thumbnail)
-
-            self.progress_updated.emit(i + 1, total_files)
-
-    def generate_thumbnail(self, file_path):
-        """Generate thumbnail for a single file"""
-        try:
-            file_ext = Path(file_path).suffix.lower()
-
-            # Image files
-            if file_ext in ['.jpg', '.jpeg', '.png', '.bmp', '.gif', '.tiff', '.webp']:
-                return self.generate_image_thumbnail(file_path)
-
-            # Video files
-            elif file_ext in ['.mp4', '.avi', '.mov', '.mkv', '.wmv', '.flv', '.webm']:
-                return self.generate_video_thumbnail(file_path)
-
-            return None
-
-        except Exception as e:
-            print(f"Error generating thumbnail for {file_path}: {e}")
-            return None
-
-    def generate_image_thumbnail(self, image_path):
-        """Generate thumbnail for image file"""
-        try:
-            # Use PIL for better format support
-            with Image.open(image_path) as img:
-                # Convert RGBA to RGB if necessary
-                if img.mode in ('RGBA', 'LA', 'P'):
-                    rgb_img = Image.new('RGB', img.size, (255, 255, 255))
-                    if img.mode == 'P':
-                        img = img.convert('RGBA')
-                    rgb_img.paste(img, mask=img.split()
-                                  [-1] if img.mode in ('RGBA', 'LA') else None)
-                    img = rgb_img
-
-                # Create thumbnail
-                img.thumbnail(self.thumbnail_size, Image.Resampling.LANCZOS)
-
-                # Convert to QPixmap
-                qt_img = ImageQt.ImageQt(img)
-                pixmap = QPixmap.fromImage(qt_img)
-
-                return pixmap
-
-        except Exception as e:
-            print(f"Error creating image thumbnail: {e}")
-            return None
-
-    def generate_video_thumbnail(self, video_path):
-        """Generate thumbnail for video file"""
-        try:
-            # Use OpenCV to extract first frame
-            cap = cv2.VideoCapture(video_path)
-
-            if not cap.isOpened():
-                return None
-
-            # Read first frame
-            ret, frame = cap.read()
-            cap.release()
-
-            if not ret:
-                return None
-
-            # Convert BGR to RGB
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-
-            # Convert to PIL Image
-            pil_img = Image.fromarray(frame_rgb)
-
-            # Create thumbnail
-            pil_img.thumbnail(self.thumbnail_size, Image.Resampling.LANCZOS)
-
-            # Convert to QPixmap
-            qt_img = ImageQt.ImageQt(pil_img)
-            pixmap = QPixmap.fromImage(qt_img)
-
-            return pixmap
-
-        except Exception as e:
-            print(f"Error creating video thumbnail: {e}")
-            return None
-
-    def stop(self):
-        """Stop thumbnail generation"""
-        self.is_running = False
+from utils.media_index import scan_media_files
+from utils.thumbnails import BoundedThumbnailDict, ThumbnailGenerator
 
 
 class FileExplorerModal(QDialog):
@@ -130,9 +18,17 @@ class FileExplorerModal(QDialog):
     def __init__(self, initial_path="", parent=None):
         super().__init__(parent)
         self.selected_folder = initial_path
-        self.thumbnails = {}  # Cache for thumbnails
+        self.thumbnails = BoundedThumbnailDict()  # Cache for thumbnails
+        self.media_files = {}  # file_path -> MediaFile of the current folder
+        self.file_items = {}  # file_path -> QListWidgetItem
         self.thumbnail_generator = None
 
+        # Report the visible files to the thumbnail generator once scrolling settles
+        self.visible_files_timer = QTimer(self)
+        self.visible_files_timer.setSingleShot(True)
+        self.visible_files_timer.setInterval(100)
+        self.visible_files_timer.timeout.connect(self.update_visible_thumbnails)
+
         self.setup_ui()
         self.apply_styling()
 
@@ -228,6 +124,9 @@ class FileExplorerModal(QDialog):
         self.file_list.setSpacing(10)
         self.file_list.setUniformItemSizes(True)
         self.file_list.setWordWrap(True)
+        # start() without arguments, the scroll position is not an interval
+        self.file_list.verticalScrollBar().valueChanged.connect(
+            lambda: self.visible_files_timer.start())
 
         # Hide the file list initially
         self.file_list.setVisible(False)
@@ -275,24 +174,10 @@ class FileExplorerModal(QDialog):
             self.folder_label.setText(f"📁 {folder_path}")
             self.confirm_btn.setEnabled(True)
 
-            # Get supported file types
-            image_extensions = ['.jpg', '.jpeg', '.png',
-                                '.bmp', '.gif', '.tiff', '.webp']
-            video_extensions = ['.mp4', '.avi', '.mov',
-                                '.mkv', '.wmv', '.flv', '.webm']
-            all_extensions = image_extensions + video_extensions
-
-            # Find all supported files
-            self.all_files = []
-            for ext in all_extensions:
-                pattern = os.path.join(folder_path, f"*{ext}")
-                self.all_files.extend(glob.glob(pattern))
-                # Also check uppercase
-                pattern = os.path.join(folder_path, f"*{ext.upper()}")
-                self.all_files.extend(glob.glob(pattern))
-
-            # Sort files
-            self.all_files.sort()
+            # Find all supported files, sorted by path
+            self.media_files = {media_file.path: media_file
+                                for media_file in scan_media_files(folder_path)}
+            self.all_files = list(self.media_files)
 
             if self.all_files:
                 # Show file list and hide info label
@@ -350,6 +235,7 @@ class FileExplorerModal(QDialog):
     def populate_file_list(self, files):
         """Populate the file list widget with files"""
         self.file_list.clear()
+        self.file_items = {}
 
         if not files:
             return
@@ -363,11 +249,11 @@ class FileExplorerModal(QDialog):
             item.setText(file_name)
             item.setData(Qt.UserRole, file_path)
 
-            # Calculate file info for tooltip
+            # Calculate file info for tooltip, from the folder scan
             try:
-                file_size = os.path.getsize(file_path)
-                size_mb = file_size / (1024 * 1024)
-                mod_time = datetime.fromtimestamp(os.path.getmtime(file_path))
+                media_file = self.media_files[file_path]
+                size_mb = media_file.size / (1024 * 1024)
+                mod_time = datetime.fromtimestamp(media_file.mtime)
 
                 tooltip = f"{file_name}\nSize: {size_mb:.2f} MB\nModified: {mod_time.strftime('%Y-%m-%d %H:%M')}\nPath: {file_path}"
             except:
@@ -387,6 +273,7 @@ class FileExplorerModal(QDialog):
             item.setTextAlignment(Qt.AlignCenter)
 
             self.file_list.addItem(item)
+            self.file_items[file_path] = item
 
     def start_thumbnail_generation(self):
         """Start generating thumbnails in background"""
@@ -408,7 +295,8 @@ class FileExplorerModal(QDialog):
                 current_files.append(file_path)
 
         if current_files:
-            self.thumbnail_generator = ThumbnailGenerator(current_files)
+            self.thumbnail_generator = ThumbnailGenerator(
+                current_files, thumbnail_size=(120, 120))
             self.thumbnail_generator.thumbnail_ready.connect(
                 self.on_thumbnail_ready)
             self.thumbnail_generator.progress_updated.connect(
@@ -416,24 +304,52 @@ class FileExplorerModal(QDialog):
             self.thumbnail_generator.finished.connect(
                 self.on_thumbnail_generation_finished)
             self.thumbnail_generator.start()
+            self.visible_files_timer.start()
+
+    def get_visible_files(self):
+        """Get the files of the items shown in the list viewport, plus one screen below"""
+        viewport_height = self.file_list.viewport().height()
+
+        # Items flow row by row, so their rectangles are ordered by position
+        def first_item_below(y):
+            low, high = 0, self.file_list.count()
+            while low < high:
+                middle = (low + high) // 2
+                rect = self.file_list.visualItemRect(self.file_list.item(middle))
+                if rect.bottom() < y:
+                    low = middle + 1
+                else:
+                    high = middle
+            return low
+
+        first = first_item_below(0)
+        last = first_item_below(2 * viewport_height)
+        return [self.file_list.item(i).data(Qt.UserRole)
+                for i in range(first, min(last + 1, self.file_list.count()))]
+
+    def update_visible_thumbnails(self):
+        """Move the visible files to the front of the thumbnail queue"""
+        if self.thumbnail_generator and self.thumbnail_generator.isRunning():
+            self.thumbnail_generator.set_visible_files(
+                [path for path in self.get_visible_files()
+                 if path and self.thumbnails.get(path) is None])
 
-    def on_thumbnail_ready(self, file_path, thumbnail):
+    def on_thumbnail_ready(self, file_path, image):
         """Handle thumbnail ready signal"""
+        thumbnail = QPixmap.fromImage(image)
         self.thumbnails[file_path] = thumbnail
 
         # Update the list item with thumbnail
-        for i in range(self.file_list.count()):
-            item = self.file_list.item(i)
-            if item.data(Qt.UserRole) == file_path:
-                # Create scaled icon
-                icon_size = self.file_list.iconSize()
-                scaled_pixmap = thumbnail.scaled(
-                    icon_size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-
-                # Set the icon and update text
-                item.setIcon(QIcon(scaled_pixmap))
-                item.setText(os.path.basename(file_path))
-                break
+        item = self.file_items.get(file_path)
+        if item is not None:
+            # Create scaled icon
+            icon_size = self.file_list.iconSize()
+            scaled_pixmap = thumbnail.scaled(
+                icon_size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+
+            # Set the icon and update text
+            item.setIcon(QIcon(scaled_pixmap))
+            item.setText(os.path.basename(file_path))
 
     def on_progress_updated(self, current, total):
         """Handle progress update"""
@@ -0,0 +1,203 @@
+from typing import Any, Dict, List, Optional, Set
+
+import cv2
+
+try:
+    import av
+except ImportError:
+    # PyAV is optional, keyframe sampling falls back to one frame per second
+    av = None
+
+
+class MotionGate:
+    """
+    Cheap motion check that decides whether a video frame is worth running
+    through the detector. Frames are downscaled to grayscale and fed to an
+    OpenCV MOG2 background subtractor; a frame passes the gate when the share
+    of foreground pixels reaches the motion threshold.
+    """
+
+    def __init__(self, motion_threshold: float = 0.002, downscale_width: int = 160,
+                 history: int = 500):
+        """
+        Initialize the motion gate.
+
+        Args:
+            motion_threshold (float): Minimum fraction of foreground pixels
+                for a frame to be considered moving
+            downscale_width (int): Width the frame is reduced to before the check
+            history (int): Number of frames used to model the background
+        """
+        self.motion_threshold = motion_threshold
+        self.downscale_width = downscale_width
+        self.subtractor = cv2.createBackgroundSubtractorMOG2(
+            history=history, varThreshold=16, detectShadows=False)
+
+    def has_motion(self, frame) -> bool:
+        """Update the background model with a frame and report whether it moved."""
+        height, width = frame.shape[:2]
+        scale = self.downscale_width / width if width > self.downscale_width else 1.0
+        small = cv2.resize(frame, (max(1, int(width * scale)), max(1, int(height * scale))),
+                           interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        gray = cv2.GaussianBlur(gray, (5, 5), 0)
+
+        mask = self.subtractor.apply(gray)
+        # Remove isolated noise pixels (sensor noise, compression artifacts)
+        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN,
+                                cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3)))
+
+        return cv2.countNonZero(mask) / mask.size >= self.motion_threshold
+
+
+class FrameSampler:
+    """
+    Decides which video frames are sent to the detector.
+
+    Modes:
+        all: every frame
+        stride: every Nth frame
+        fps: a target detection rate independent of the source frame rate
+        keyframes: only the keyframes of the video stream
+    """
+
+    MODES = ('all', 'stride', 'fps', 'keyframes')
+
+    def __init__(self, mode: str = 'all', frame_stride: int = 1,
+                 target_fps: Optional[float] = None, source_fps: float = 0,
+                 keyframes: Optional[Set[int]] = None):
+        """
+        Initialize the frame sampler.
+
+        Args:
+            mode (str): One of FrameSampler.MODES
+            frame_stride (int): Distance between sampled frames in stride mode
+            target_fps (float, optional): Detection rate in fps mode
+            source_fps (float): Frame rate of the video
+            keyframes (set, optional): Frame numbers of the keyframes. When
+                unknown, keyframes mode samples one frame per second
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown frame sampling mode: {mode}")
+
+        self.mode = mode
+        self.frame_stride = max(1, int(frame_stride))
+        self.target_fps = target_fps
+        self.source_fps = source_fps
+        self.keyframes = keyframes
+
+        if mode == 'keyframes' and keyframes is None:
+            self.mode = 'stride'
+            self.frame_stride = max(1, int(round(source_fps)))
+        elif mode == 'fps' and (not target_fps or not source_fps
+                                or target_fps >= source_fps):
+            self.mode = 'all'
+
+    def should_sample(self, frame_number: int) -> bool:
+        """Check whether a frame should go through the detector."""
+        if self.mode == 'stride':
+            return frame_number % self.frame_stride == 0
+        if self.mode == 'fps':
+            # Sample the first frame of every target-rate time slot
+            ratio = self.target_fps / self.source_fps
+            return frame_number == 0 or \
+                int(frame_number * ratio) != int((frame_number - 1) * ratio)
+        if self.mode == 'keyframes':
+            return frame_number in self.keyframes
+        return True
+
+
+def find_keyframes(video_path: str) -> Optional[Set[int]]:
+    """
+    Find the frame numbers of the keyframes of a video by demuxing its
+    packets, without decoding them.
+
+    Returns:
+        Set of frame numbers in display order, or None if PyAV is not
+        installed or the container could not be read
+    """
+    if av is None:
+        return None
+
+    try:
+        with av.open(video_path) as container:
+            stream = container.streams.video[0]
+            packet_pts = []
+            keyframe_pts = set()
+            for packet in container.demux(stream):
+                if packet.pts is None:
+                    continue
+                packet_pts.append(packet.pts)
+                if packet.is_keyframe:
+                    keyframe_pts.add(packet.pts)
+    except (av.error.FFmpegError, IndexError) as e:
+        print(f"Error reading keyframes of {video_path}: {e}")
+        return None
+
+    # Packets come in decode order, frame numbers follow presentation order
+    packet_pts.sort()
+    return {index for index, pts in enumerate(packet_pts) if pts in keyframe_pts}
+
+
+def _box_iou(a: Dict[str, float], b: Dict[str, float]) -> float:
+    """Intersection over union of two center-format bbox dicts."""
+    ax1, ay1 = a['x_center'] - a['width'] / 2, a['y_center'] - a['height'] / 2
+    ax2, ay2 = ax1 + a['width'], ay1 + a['height']
+    bx1, by1 = b['x_center'] - b['width'] / 2, b['y_center'] - b['height'] / 2
+    bx2, by2 = bx1 + b['width'], by1 + b['height']
+
+    inter_w = max(0.0, min(ax2, bx2) - max(ax1, bx1))
+    inter_h = max(0.0, min(ay2, by2) - max(ay1, by1))
+    intersection = inter_w * inter_h
+    union = a['width'] * a['height'] + b['width'] * b['height'] - intersection
+    return intersection / union if union > 0 else 0.0
+
+
+def interpolate_detections(previous: List[Dict[str, Any]], following: List[Dict[str, Any]],
+                           t: float, min_iou: float = 0.1) -> List[Dict[str, Any]]:
+    """
+    Interpolate detections between two inferred frames.
+
+    Detections of the same class are paired greedily by IoU and their boxes
+    and confidences are blended linearly. Unpaired detections are held from
+    the nearer of the two frames.
+
+    Args:
+        previous (list): Detections of the inferred frame before
+        following (list): Detections of the inferred frame after
+        t (float): Position between the two frames, from 0.0 to 1.0
+        min_iou (float): Minimum overlap for two detections to be paired
+    """
+    candidates = sorted(
+        ((_box_iou(p['bbox'], f['bbox']), i, j)
+         for i, p in enumerate(previous)
+         for j, f in enumerate(following)
+         if p['class'] == f['class']),
+        reverse=True)
+
+    paired_previous = set()
+    paired_following = set()
+    interpolated = []
+    for iou, i, j in candidates:
+        if iou < min_iou:
+            break
+        if i in paired_previous or j in paired_following:
+            continue
+        paired_previous.add(i)
+        paired_following.add(j)
+
+        p, f = previous[i], following[j]
+        interpolated.append({
+            'class': p['class'],
+            'confidence': p['confidence'] + (f['confidence'] - p['confidence']) * t,
+            'bbox': {key: p['bbox'][key] + (f['bbox'][key] - p['bbox'][key]) * t
+                     for key in ('x_center', 'y_center', 'width', 'height')}
+        })
+
+    if t < 0.5:
+        interpolated.extend(p for i, p in enumerate(previous)
+                            if i not in paired_previous)
+    else:
+        interpolated.extend(f for j, f in enumerate(following)
+                            if j not in paired_following)
+    return interpolated
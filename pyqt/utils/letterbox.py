@@ -0,0 +1,123 @@
+from typing import List, NamedTuple, Tuple
+
+import cv2
+import numpy as np
+
+# Padding value of the letterbox borders, as used by YOLO training
+PAD_VALUE = 114
+
+
+class LetterboxGeometry(NamedTuple):
+    """Where an image lands inside the square model input"""
+    scale_x: float
+    scale_y: float
+    pad_x: int
+    pad_y: int
+    resized_width: int
+    resized_height: int
+
+
+def letterbox_geometry(width: int, height: int, size: int = 640) -> LetterboxGeometry:
+    """
+    Compute the aspect-preserving fit of a width x height image in a
+    size x size input, centered with padding on the short side.
+    """
+    scale = min(size / width, size / height)
+    resized_width = max(1, min(size, round(width * scale)))
+    resized_height = max(1, min(size, round(height * scale)))
+    return LetterboxGeometry(
+        scale_x=resized_width / width,
+        scale_y=resized_height / height,
+        pad_x=(size - resized_width) // 2,
+        pad_y=(size - resized_height) // 2,
+        resized_width=resized_width,
+        resized_height=resized_height)
+
+
+def letterbox(image, out) -> LetterboxGeometry:
+    """
+    Resize an image into a square buffer, keeping its aspect ratio.
+
+    The image is resized once, straight into its region of the buffer, and
+    only the borders around it are padded.
+
+    Args:
+        image: BGR image of any size
+        out: size x size x 3 uint8 buffer to write into
+
+    Returns:
+        The geometry needed to map boxes back with unletterbox_boxes()
+    """
+    size = out.shape[0]
+    height, width = image.shape[:2]
+    geometry = letterbox_geometry(width, height, size)
+    top, left = geometry.pad_y, geometry.pad_x
+    bottom = top + geometry.resized_height
+    right = left + geometry.resized_width
+
+    out[:top] = PAD_VALUE
+    out[bottom:] = PAD_VALUE
+    out[top:bottom, :left] = PAD_VALUE
+    out[top:bottom, right:] = PAD_VALUE
+
+    region = out[top:bottom, left:right]
+    if (width, height) == (geometry.resized_width, geometry.resized_height):
+        region[...] = image
+    else:
+        resized = cv2.resize(image, (geometry.resized_width, geometry.resized_height),
+                             dst=region, interpolation=cv2.INTER_LINEAR)
+        # OpenCV writes into the region in place when it can use it as is
+        if not np.shares_memory(resized, region):
+            region[...] = resized
+    return geometry
+
+
+def unletterbox_boxes(boxes, geometry: LetterboxGeometry,
+                      width: int, height: int):
+    """
+    Map corner boxes from the letterboxed input back to the original image.
+
+    Args:
+        boxes: N x 4 array of x1, y1, x2, y2 in model input coordinates
+        geometry (LetterboxGeometry): Geometry returned by letterbox()
+        width (int): Original image width
+        height (int): Original image height
+
+    Returns:
+        N x 4 float array in original image coordinates, clipped to the image
+    """
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    offset = np.array([geometry.pad_x, geometry.pad_y, geometry.pad_x, geometry.pad_y])
+    scale = np.array([geometry.scale_x, geometry.scale_y, geometry.scale_x, geometry.scale_y])
+    boxes = (boxes - offset) / scale
+    np.clip(boxes, 0, [width, height, width, height], out=boxes)
+    return boxes
+
+
+class LetterboxBuffer:
+    """
+    Reusable batch buffer for model input.
+
+    Batches are letterboxed into the same preallocated memory on every call,
+    so preparing a batch costs one resize per image and no allocation once
+    the buffer has grown to the batch size.
+    """
+
+    def __init__(self, size: int = 640):
+        self.size = size
+        self._buffer = np.empty((0, size, size, 3), dtype=np.uint8)
+
+    def fill(self, images) -> Tuple[np.ndarray, List[LetterboxGeometry]]:
+        """
+        Letterbox a batch of images into the buffer.
+
+        Returns:
+            Tuple of (batch x size x size x 3 view of the buffer, geometry of
+            each image). The view is overwritten by the next call.
+        """
+        if len(images) > len(self._buffer):
+            self._buffer = np.empty((len(images), self.size, self.size, 3),
+                                    dtype=np.uint8)
+        geometries = [letterbox(image, self._buffer[i])
+                      for i, image in enumerate(images)]
+        return self._buffer[:len(images)], geometries
@@ -0,0 +1,397 @@
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from utils.paths import get_cache_path
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.gif', '.tiff', '.webp')
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.mkv', '.wmv', '.flv', '.webm')
+
+# Files the persistent index keeps track of, callers filter these further
+INDEXED_EXTENSIONS = {ext: 'image' for ext in IMAGE_EXTENSIONS + ('.tif',)}
+INDEXED_EXTENSIONS.update({ext: 'video' for ext in VIDEO_EXTENSIONS + ('.m4v',)})
+
+
+class MediaFile(NamedTuple):
+    """A media file found by scan_media_files"""
+    path: str
+    relative_path: str
+    media_type: str  # 'image' or 'video'
+    size: int
+    mtime: float
+
+
+class MediaIndex:
+    """
+    Persistent index of the media files below the scanned folders.
+
+    Every indexed directory is stored with its modification time. Adding,
+    removing or renaming a file changes the mtime of its directory, so a
+    directory whose mtime is unchanged is not listed again. Rewriting a file
+    in place does not change its directory's mtime, so the files of an
+    unchanged directory are stat()ed and rows whose size or mtime changed
+    are updated.
+
+    Hidden files and folders are indexed too, scan() leaves them out unless
+    asked for them.
+    """
+
+    # Bumped when the index needs a full relisting, stored as user_version.
+    # 1: hidden files and folders are indexed
+    # 2: files no longer store probed dimensions and durations
+    SCHEMA_VERSION = 2
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS directories (
+            path TEXT PRIMARY KEY,
+            parent TEXT,
+            mtime_ns INTEGER NOT NULL
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_directories_parent
+            ON directories(parent);
+
+        CREATE TABLE IF NOT EXISTS files (
+            path TEXT PRIMARY KEY,
+            directory TEXT NOT NULL,
+            media_type TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            mtime REAL NOT NULL
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_files_directory
+            ON files(directory);
+    """
+
+    FILE_COLUMNS = "path, media_type, size, mtime"
+
+    def __init__(self, db_path: str):
+        """
+        Open (and create if needed) the media index.
+
+        Args:
+            db_path (str): Path to the SQLite database file
+        """
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # The views and the prediction worker share the connection, access is
+        # serialized through self._lock
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(db_path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(self.SCHEMA)
+        if self.connection.execute("PRAGMA user_version").fetchone()[0] < self.SCHEMA_VERSION:
+            # Rebuild the files table and list every directory again on its
+            # next scan
+            self.connection.execute("DROP TABLE files")
+            self.connection.executescript(self.SCHEMA)
+            self.connection.execute("UPDATE directories SET mtime_ns = 0")
+            self.connection.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+        self.connection.commit()
+
+    def scan(self, folder_path: str, recursive: bool = False,
+             include_hidden: bool = False) -> List[MediaFile]:
+        """
+        Get the indexed media files of a folder, refreshing changed directories.
+
+        Args:
+            folder_path (str): Folder to scan
+            recursive (bool): Also scan all subfolders
+            include_hidden (bool): Also return hidden files and the contents
+                of hidden folders (names starting with '.')
+
+        Returns:
+            List of MediaFile with paths below folder_path, in no particular order
+        """
+        root = os.path.abspath(folder_path)
+        media_files = []
+
+        with self._lock:
+            if self.connection is None:
+                raise sqlite3.ProgrammingError("Media index is closed")
+
+            with self.connection:
+                directories = [root]
+                while directories:
+                    directory = directories.pop()
+                    try:
+                        mtime_ns = os.stat(directory).st_mtime_ns
+                    except OSError as e:
+                        if directory == root:
+                            raise
+                        print(f"Error scanning folder {directory}: {e}")
+                        self._remove_directory(directory)
+                        continue
+
+                    row = self.connection.execute(
+                        "SELECT mtime_ns FROM directories WHERE path = ?",
+                        (directory,)).fetchone()
+                    refreshed = row is None or row[0] != mtime_ns
+                    if refreshed:
+                        try:
+                            self._refresh_directory(directory, mtime_ns)
+                        except OSError as e:
+                            if directory == root:
+                                raise
+                            print(f"Error scanning folder {directory}: {e}")
+                            continue
+
+                    rows = self.connection.execute(
+                        f"SELECT {self.FILE_COLUMNS} FROM files WHERE directory = ?",
+                        (directory,)).fetchall()
+                    if not include_hidden:
+                        rows = [row for row in rows if not _is_hidden(row[0])]
+                    if not refreshed:
+                        rows = self._restat_files(rows)
+
+                    for path, *values in rows:
+                        relative_path = os.path.relpath(path, root)
+                        media_files.append(MediaFile(
+                            os.path.join(folder_path, relative_path),
+                            relative_path, *values))
+
+                    if recursive:
+                        directories.extend(path for path, in self.connection.execute(
+                            "SELECT path FROM directories WHERE parent = ?",
+                            (directory,)) if include_hidden or not _is_hidden(path))
+
+        return media_files
+
+    def _refresh_directory(self, directory: str, mtime_ns: int):
+        """List a changed directory and update its files and subdirectories."""
+        files = {}
+        subdirectories = set()
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirectories.add(entry.path)
+                        continue
+
+                    media_type = INDEXED_EXTENSIONS.get(
+                        os.path.splitext(entry.name)[1].lower())
+                    if media_type is None or not entry.is_file():
+                        continue
+
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                files[entry.path] = (media_type, stat.st_size, stat.st_mtime)
+
+        # Only write the rows of new and changed files
+        indexed = {row[0]: row[1:] for row in self.connection.execute(
+            "SELECT path, media_type, size, mtime FROM files WHERE directory = ?",
+            (directory,))}
+        removed = [(path,) for path in indexed if path not in files]
+        changed = [(path, directory, *values) for path, values in files.items()
+                   if indexed.get(path) != values]
+        self.connection.executemany("DELETE FROM files WHERE path = ?", removed)
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO files (path, directory, media_type, size, mtime) "
+            "VALUES (?, ?, ?, ?, ?)", changed)
+
+        # Subdirectories are stored without an mtime so they are listed when
+        # first visited
+        for path, in self.connection.execute(
+                "SELECT path FROM directories WHERE parent = ?", (directory,)).fetchall():
+            if path not in subdirectories:
+                self._remove_directory(path)
+        self.connection.executemany(
+            "INSERT OR IGNORE INTO directories (path, parent, mtime_ns) VALUES (?, ?, 0)",
+            [(path, directory) for path in subdirectories])
+
+        self.connection.execute(
+            "INSERT INTO directories (path, parent, mtime_ns) VALUES (?, ?, ?) "
+            "ON CONFLICT(path) DO UPDATE SET mtime_ns = excluded.mtime_ns",
+            (directory, os.path.dirname(directory), mtime_ns))
+
+    def _remove_directory(self, directory: str):
+        """Remove a directory and everything below it from the index."""
+        prefix = os.path.join(directory, '')
+        self.connection.execute(
+            "DELETE FROM files WHERE directory = ? OR substr(directory, 1, ?) = ?",
+            (directory, len(prefix), prefix))
+        self.connection.execute(
+            "DELETE FROM directories WHERE path = ? OR substr(path, 1, ?) = ?",
+            (directory, len(prefix), prefix))
+
+    def _restat_files(self, rows):
+        """
+        Update the rows of an unchanged directory's files that were rewritten
+        in place, or removed without the directory's mtime changing (on
+        file systems with a coarse mtime).
+        """
+        current = []
+        changed = []
+        removed = []
+        for path, media_type, size, mtime in rows:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                removed.append((path,))
+                continue
+            if (stat.st_size, stat.st_mtime) != (size, mtime):
+                changed.append((stat.st_size, stat.st_mtime, path))
+            current.append((path, media_type, stat.st_size, stat.st_mtime))
+        self.connection.executemany("DELETE FROM files WHERE path = ?", removed)
+        self.connection.executemany(
+            "UPDATE files SET size = ?, mtime = ? WHERE path = ?", changed)
+        return current
+
+    def clear(self):
+        """Remove all indexed directories and files."""
+        with self._lock:
+            if self.connection is None:
+                return
+            with self.connection:
+                self.connection.execute("DELETE FROM files")
+                self.connection.execute("DELETE FROM directories")
+
+    def close(self):
+        """Close the database."""
+        with self._lock:
+            if self.connection is None:
+                return
+            self.connection.close()
+            self.connection = None
+
+
+def _is_hidden(path: str) -> bool:
+    """Check if a file or folder is hidden, by its name starting with '.'."""
+    return os.path.basename(path).startswith('.')
+
+
+_media_index = None
+_media_index_lock = threading.Lock()
+
+
+def get_media_index() -> Optional[MediaIndex]:
+    """
+    Get the media index shared by the gallery, the file explorer and prediction.
+
+    Returns:
+        The index, or None if it could not be opened
+    """
+    global _media_index
+    with _media_index_lock:
+        if _media_index is None:
+            try:
+                _media_index = MediaIndex(get_cache_path()["media_index"])
+            except Exception as e:
+                print(f"Error opening media index: {e}")
+                return None
+        return _media_index
+
+
+def scan_media_files(folder_path: str, recursive: bool = False,
+                     image_extensions: Iterable[str] = IMAGE_EXTENSIONS,
+                     video_extensions: Iterable[str] = VIDEO_EXTENSIONS,
+                     use_index: bool = True,
+                     include_hidden: bool = False) -> List[MediaFile]:
+    """
+    Find the images and videos in a folder.
+
+    Files are listed through the persistent media index, so only directories
+    that changed since the last scan are read again. Without the index (or for
+    extensions it does not track) the tree is walked once with os.scandir.
+    Files are classified by their lower-cased extension. Hidden files and
+    folders (starting with '.') are skipped, as glob does, unless
+    include_hidden is set.
+
+    Args:
+        folder_path (str): Folder to scan
+        recursive (bool): Also scan all subfolders
+        image_extensions (Iterable[str]): Extensions of image files
+        video_extensions (Iterable[str]): Extensions of video files
+        use_index (bool): List the files through the persistent media index
+        include_hidden (bool): Also list hidden files and folders
+
+    Returns:
+        List of MediaFile, sorted by relative path
+    """
+    media_types = {ext.lower(): 'video' for ext in video_extensions}
+    media_types.update({ext.lower(): 'image' for ext in image_extensions})
+
+    media_index = None
+    if use_index and all(ext in INDEXED_EXTENSIONS for ext in media_types):
+        media_index = get_media_index()
+
+    media_files = None
+    if media_index is not None:
+        try:
+            media_files = _filter_media_files(
+                media_index.scan(folder_path, recursive, include_hidden),
+                media_types)
+        except sqlite3.Error as e:
+            print(f"Error reading media index, scanning {folder_path} directly: {e}")
+
+    if media_files is None:
+        media_files = _walk_media_files(folder_path, recursive, media_types,
+                                        include_hidden)
+
+    media_files.sort(key=lambda media_file: media_file.relative_path)
+    return media_files
+
+
+def _filter_media_files(media_files: List[MediaFile],
+                        media_types: Dict[str, str]) -> List[MediaFile]:
+    """Keep the indexed files with one of the requested extensions."""
+    filtered = []
+    for media_file in media_files:
+        media_type = media_types.get(os.path.splitext(media_file.path)[1].lower())
+        if media_type is None:
+            continue
+        if media_type != media_file.media_type:
+            media_file = media_file._replace(media_type=media_type)
+        filtered.append(media_file)
+    return filtered
+
+
+def _walk_media_files(folder_path: str, recursive: bool,
+                      media_types: Dict[str, str],
+                      include_hidden: bool = False) -> List[MediaFile]:
+    """Walk a folder with os.scandir, without the index."""
+    media_files = []
+    directories = [folder_path]
+    while directories:
+        directory = directories.pop()
+        try:
+            entries = os.scandir(directory)
+        except OSError as e:
+            if directory == folder_path:
+                raise
+            print(f"Error scanning folder {directory}: {e}")
+            continue
+
+        with entries:
+            for entry in entries:
+                if not include_hidden and entry.name.startswith('.'):
+                    continue
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive:
+                            directories.append(entry.path)
+                        continue
+
+                    media_type = media_types.get(
+                        os.path.splitext(entry.name)[1].lower())
+                    if media_type is None or not entry.is_file():
+                        continue
+
+                    stat = entry.stat()
+                except OSError:
+                    continue
+
+                media_files.append(MediaFile(
+                    path=entry.path,
+                    relative_path=os.path.relpath(entry.path, folder_path),
+                    media_type=media_type,
+                    size=stat.st_size,
+                    mtime=stat.st_mtime))
+
+    return media_files
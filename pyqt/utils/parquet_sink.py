@@ -0,0 +1,122 @@
+import datetime
+from typing import Any, List, Optional
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    # pyarrow is optional, detections are then only written to CSV
+    pa = None
+    pq = None
+
+
+def _column_types():
+    """Arrow type of each detection CSV column."""
+    dictionary_string = pa.dictionary(pa.int32(), pa.string())
+    return {
+        'detection_id': pa.int64(),
+        'session_id': dictionary_string,
+        'timestamp': pa.timestamp('us'),
+        'file_name': dictionary_string,
+        'file_path': dictionary_string,
+        'file_type': dictionary_string,
+        'frame_number': pa.int32(),
+        'frame_timestamp': pa.float32(),
+        'detection_class': dictionary_string,
+        'confidence': pa.float32(),
+        'bbox_x_center': pa.float32(),
+        'bbox_y_center': pa.float32(),
+        'bbox_width': pa.float32(),
+        'bbox_height': pa.float32(),
+        'bbox_x_min': pa.float32(),
+        'bbox_y_min': pa.float32(),
+        'bbox_x_max': pa.float32(),
+        'bbox_y_max': pa.float32(),
+        'image_width': pa.int32(),
+        'image_height': pa.int32(),
+        'model_name': dictionary_string,
+        'model_version': dictionary_string,
+        'detection_threshold': pa.float32(),
+        'processing_time_ms': pa.float32(),
+        'additional_metadata': dictionary_string,
+        'stage': dictionary_string,
+    }
+
+
+class ParquetDetectionSink:
+    """
+    Writes detection rows to a Parquet file with typed columns.
+
+    Bounding boxes and scores are stored as float32 and repeated strings
+    (session, file, class, model) are dictionary encoded. Rows are collected
+    until row_group_size is reached and then written as one row group, so the
+    file grows incrementally during a session.
+    """
+
+    def __init__(self, path: str, headers: List[str], row_group_size: int = 50000):
+        """
+        Initialize the Parquet sink.
+
+        Args:
+            path (str): Path of the Parquet file to create
+            headers (List[str]): Column names, in the order of the logged rows
+            row_group_size (int): Number of rows per Parquet row group
+        """
+        if pa is None:
+            raise ImportError("pyarrow is required for Parquet output")
+
+        self.path = path
+        self.headers = headers
+        self.row_group_size = row_group_size
+
+        types = _column_types()
+        self.schema = pa.schema(
+            [pa.field(name, types.get(name, pa.string())) for name in headers])
+        self._pending_rows = []
+        self._writer = pq.ParquetWriter(path, self.schema, compression='zstd')
+
+    def write_rows(self, rows: List[List[Any]]):
+        """Add rows to the sink, writing a row group once enough are pending."""
+        self._pending_rows.extend(rows)
+        while len(self._pending_rows) >= self.row_group_size:
+            self._write_row_group(self._pending_rows[:self.row_group_size])
+            self._pending_rows = self._pending_rows[self.row_group_size:]
+
+    def flush(self):
+        """Write the pending rows as a (possibly smaller) row group."""
+        if self._pending_rows:
+            self._write_row_group(self._pending_rows)
+            self._pending_rows = []
+
+    def close(self):
+        """Write the pending rows and close the Parquet file."""
+        if self._writer is None:
+            return
+        self.flush()
+        self._writer.close()
+        self._writer = None
+
+    def _write_row_group(self, rows: List[List[Any]]):
+        arrays = []
+        for index, field in enumerate(self.schema):
+            values = [self._convert(row[index], field.type) for row in rows]
+            if pa.types.is_dictionary(field.type):
+                arrays.append(pa.array(values, type=pa.string())
+                              .dictionary_encode())
+            else:
+                arrays.append(pa.array(values, type=field.type))
+        self._writer.write_table(
+            pa.Table.from_arrays(arrays, schema=self.schema))
+
+    @staticmethod
+    def _convert(value: Any, arrow_type) -> Optional[Any]:
+        """Convert a CSV row value to a Python value of the column type."""
+        if value is None or value == "":
+            return None
+        if pa.types.is_timestamp(arrow_type):
+            return datetime.datetime.fromisoformat(value)
+        if pa.types.is_integer(arrow_type):
+            return int(value)
+        if pa.types.is_floating(arrow_type):
+            return float(value)
+        return str(value)
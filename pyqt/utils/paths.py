@@ -34,3 +34,14 @@ def get_image_path():
         "base": base,
         "welcome": base + "welcome.png"
     }
+
+
+def get_cache_path():
+    base = "pyqt/cache/"
+
+    return {
+        "base": base,
+        "thumbnails": base + "thumbnails.sqlite",
+        "media_index": base + "media_index.sqlite",
+        "results": base + "results.sqlite"
+    }
@@ -0,0 +1,49 @@
+from typing import Dict, Iterable
+
+
+class StageBacklog:
+    """
+    Tracks how many items are waiting in front of each stage of a pipeline.
+    A stage with a growing backlog is the bottleneck of the run.
+    """
+
+    def __init__(self, stages: Iterable[str]):
+        """
+        Initialize the backlog tracker.
+
+        Args:
+            stages (Iterable[str]): Names of the pipeline stages, in order
+        """
+        self.stages = list(stages)
+        self.current = {stage: 0 for stage in self.stages}
+        self.peak = {stage: 0 for stage in self.stages}
+        self._total = {stage: 0 for stage in self.stages}
+        self._samples = 0
+
+    def sample(self, **backlogs: int):
+        """Record the current backlog of one or more stages."""
+        for stage, backlog in backlogs.items():
+            self.current[stage] = backlog
+            self.peak[stage] = max(self.peak[stage], backlog)
+        for stage in self.stages:
+            self._total[stage] += self.current[stage]
+        self._samples += 1
+
+    def average(self) -> Dict[str, float]:
+        """Get the average backlog of each stage over all samples."""
+        if not self._samples:
+            return {stage: 0.0 for stage in self.stages}
+        return {stage: round(self._total[stage] / self._samples, 2)
+                for stage in self.stages}
+
+    def as_dict(self) -> Dict[str, Dict[str, float]]:
+        """Get current, peak and average backlog of each stage."""
+        return {
+            'current': dict(self.current),
+            'peak': dict(self.peak),
+            'average': self.average()
+        }
+
+    def __str__(self) -> str:
+        return ", ".join(f"{stage}: {self.current[stage]}"
+                         for stage in self.stages)
@@ -0,0 +1,347 @@
+import datetime
+import json
+import os
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+# One image or video frame
+RECORD_DTYPE = np.dtype([
+    ('file', '<i4'),
+    ('frame', '<i4'),  # -1 for images
+    ('timestamp', '<f8'),  # NaN for images
+    ('width', '<i4'),
+    ('height', '<i4'),
+    ('status', 'u1'),
+    ('detections', '<u4')  # number of boxes of the record
+])
+
+# One prediction, boxes as corner coordinates in original image space
+DETECTION_DTYPE = np.dtype([
+    ('box', '<f4', (4,)),
+    ('confidence', '<f4'),
+    ('class_index', '<u2')
+])
+
+
+def _read_chunks(raw_file) -> Iterator[Tuple[int, int, Dict[str, Any], np.ndarray, np.ndarray]]:
+    """
+    Read the chunks of a sidecar, stopping at a chunk that was only partly
+    written when the run was killed.
+
+    Yields:
+        Tuple of (start offset, end offset, header, records, detections)
+    """
+    while True:
+        offset = raw_file.tell()
+        try:
+            header = json.loads(str(np.load(raw_file, allow_pickle=False)))
+            records = np.load(raw_file, allow_pickle=False)
+            detections = np.load(raw_file, allow_pickle=False)
+        except (EOFError, ValueError):
+            return
+        yield offset, raw_file.tell(), header, records, detections
+
+
+class RawPredictionSink:
+    """
+    Writes every prediction down to the inference floor to a sidecar (.raw)
+    next to the detection CSV.
+
+    Each record is one image or video frame. Boxes are stored as float32
+    corner coordinates in original image space, with float32 confidences and
+    uint16 indexes into a class name table, so the whole run can be filtered
+    to any threshold at or above the floor without running the model again.
+
+    Records are appended to the file in chunks, once chunk_records records
+    are waiting and on flush(), which the CSV logger calls before it
+    checkpoints files in the run manifest. A chunk is three .npy arrays: a
+    JSON header with the chunk's file, status and class tables, the records
+    and their boxes. Memory use stays bounded and a crash only loses the
+    records that were not flushed yet.
+
+    With keep_records, an existing sidecar is continued: it is cut back to
+    its first keep_records records (those of the files a resumed run
+    completed) and new records are appended behind them.
+    """
+
+    def __init__(self, path: str, metadata: Optional[Dict[str, Any]] = None,
+                 keep_records: Optional[int] = None, chunk_records: int = 5000):
+        """
+        Args:
+            path (str): Sidecar file to write
+            metadata (dict, optional): JSON-serializable run information
+                stored with the predictions
+            keep_records (int, optional): Continue the existing sidecar,
+                keeping this many of its records
+            chunk_records (int): Number of waiting records that triggers a write
+        """
+        self.path = path
+        self.metadata = dict(metadata or {})
+        self.metadata.setdefault('created_at', datetime.datetime.now().isoformat())
+        self.chunk_records = max(1, chunk_records)
+        self.record_count = 0
+        self._lock = threading.Lock()
+        self._write_metadata = True
+        self._reset_chunk()
+
+        if keep_records is not None and os.path.exists(path):
+            self._continue(keep_records)
+            self._file = open(path, 'ab')
+        else:
+            self._file = open(path, 'wb')
+
+    def _reset_chunk(self):
+        self._files = {}
+        self._output_paths = []
+        self._statuses = {}
+        self._classes = {}
+        self._records = []
+        self._detections = []
+
+    def _continue(self, keep_records: int):
+        """Cut an existing sidecar back to its first keep_records records."""
+        with open(self.path, 'r+b') as raw_file:
+            end = 0
+            for offset, end, header, records, detections in _read_chunks(raw_file):
+                if self.record_count + len(records) <= keep_records:
+                    self.record_count += len(records)
+                    continue
+
+                # The cut falls inside this chunk: drop it from the file and
+                # queue the records to keep for the next chunk
+                end = offset
+                if 'metadata' in header:
+                    floors = [metadata['threshold_floor'] for metadata in
+                              (header['metadata'], self.metadata)
+                              if metadata.get('threshold_floor') is not None]
+                    self.metadata['threshold_floor'] = max(floors) if floors else None
+                starts = np.concatenate(
+                    ([0], np.cumsum(records['detections'], dtype=np.int64))).astype(np.int64)
+                for index in range(keep_records - self.record_count):
+                    record = records[index]
+                    kept = detections[starts[index]:starts[index + 1]]
+                    self._add(header['file_paths'][record['file']],
+                              header['output_paths'][record['file']],
+                              int(record['frame']), float(record['timestamp']),
+                              int(record['width']), int(record['height']),
+                              header['statuses'][record['status']],
+                              [(tuple(box), float(confidence), header['classes'][class_index])
+                               for box, confidence, class_index in kept.tolist()])
+                break
+            raw_file.truncate(end)
+
+    def add(self, file_path: str, output_path: str,
+            detections: List[Dict[str, Any]],
+            frame_number: Optional[int] = None,
+            frame_timestamp: Optional[float] = None,
+            image_dimensions: Optional[tuple] = None,
+            status: str = ""):
+        """
+        Add the predictions of one image or video frame.
+
+        Args:
+            file_path (str): Path of the processed file
+            output_path (str): Path of its annotated output
+            detections (list): Detection dicts with a center/size 'bbox'
+            frame_number (int, optional): Frame number for video files
+            frame_timestamp (float, optional): Timestamp within video
+            image_dimensions (tuple, optional): (width, height) of the image/frame
+            status (str): Frame status, see label_video
+        """
+        width, height = image_dimensions if image_dimensions else (0, 0)
+        boxes = []
+        for detection in detections:
+            bbox = detection['bbox']
+            half_width = bbox['width'] / 2
+            half_height = bbox['height'] / 2
+            boxes.append(((bbox['x_center'] - half_width,
+                           bbox['y_center'] - half_height,
+                           bbox['x_center'] + half_width,
+                           bbox['y_center'] + half_height),
+                          detection['confidence'], detection['class']))
+
+        with self._lock:
+            self._add(file_path, output_path,
+                      -1 if frame_number is None else frame_number,
+                      np.nan if frame_timestamp is None else frame_timestamp,
+                      width, height, status, boxes)
+            if len(self._records) >= self.chunk_records:
+                self._write_chunk()
+
+    def _add(self, file_path, output_path, frame_number, frame_timestamp,
+             width, height, status, boxes):
+        file_index = self._files.get(file_path)
+        if file_index is None:
+            file_index = self._files[file_path] = len(self._files)
+            self._output_paths.append(output_path or "")
+
+        self._records.append((
+            file_index, frame_number, frame_timestamp, width, height,
+            self._statuses.setdefault(status, len(self._statuses)), len(boxes)))
+        for box, confidence, class_name in boxes:
+            self._detections.append((box, confidence, self._classes.setdefault(
+                class_name, len(self._classes))))
+        self.record_count += 1
+
+    def _write_chunk(self):
+        """Append the waiting records to the file."""
+        if not self._records or self._file is None:
+            return
+        # The tables are dicts in index order
+        header = {
+            'file_paths': list(self._files),
+            'output_paths': self._output_paths,
+            'statuses': list(self._statuses),
+            'classes': list(self._classes)
+        }
+        if self._write_metadata:
+            header['metadata'] = self.metadata
+            self._write_metadata = False
+
+        np.save(self._file, np.array(json.dumps(header)))
+        np.save(self._file, np.array(self._records, dtype=RECORD_DTYPE))
+        np.save(self._file, np.array(self._detections, dtype=DETECTION_DTYPE))
+        self._file.flush()
+        self._reset_chunk()
+
+    def flush(self):
+        """Write the waiting records to disk now."""
+        with self._lock:
+            self._write_chunk()
+
+    def close(self):
+        """Write the waiting records and close the sidecar file."""
+        with self._lock:
+            if self._file is None:
+                return
+            try:
+                self._write_chunk()
+            finally:
+                self._file.close()
+                self._file = None
+
+
+class RawPredictions:
+    """Predictions read from a .raw sidecar written by RawPredictionSink."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.metadata = {}
+        self.file_paths = []
+        self.output_paths = []
+        self.statuses = []
+        self.classes = []
+
+        file_indexes = {}
+        status_indexes = {}
+        class_indexes = {}
+        floors = []
+        chunk_records = []
+        chunk_detections = []
+
+        def remap(names, indexes, table):
+            # Map the indexes of a chunk table to the global table
+            for name in names:
+                if name not in indexes:
+                    indexes[name] = len(table)
+                    table.append(name)
+            return np.array([indexes[name] for name in names], dtype=np.int64)
+
+        with open(path, 'rb') as raw_file:
+            for _, _, header, records, detections in _read_chunks(raw_file):
+                if 'metadata' in header:
+                    if not self.metadata:
+                        self.metadata = dict(header['metadata'])
+                    if header['metadata'].get('threshold_floor') is not None:
+                        floors.append(header['metadata']['threshold_floor'])
+
+                # Chunks have their own tables, move them to the global ones
+                records = records.copy()
+                detections = detections.copy()
+                known_files = len(self.file_paths)
+                file_mapping = remap(header['file_paths'], file_indexes, self.file_paths)
+                self.output_paths.extend(
+                    output_path for output_path, index in
+                    zip(header['output_paths'], file_mapping) if index >= known_files)
+                if len(records):
+                    records['file'] = file_mapping[records['file']]
+                    records['status'] = remap(header['statuses'], status_indexes,
+                                              self.statuses)[records['status']]
+                if len(detections):
+                    detections['class_index'] = remap(header['classes'], class_indexes,
+                                                      self.classes)[detections['class_index']]
+                chunk_records.append(records)
+                chunk_detections.append(detections)
+
+        # A resumed run may have kept fewer predictions than the first part
+        if floors:
+            self.metadata['threshold_floor'] = max(floors)
+
+        records = np.concatenate(chunk_records) if chunk_records else \
+            np.empty(0, dtype=RECORD_DTYPE)
+        detections = np.concatenate(chunk_detections) if chunk_detections else \
+            np.empty(0, dtype=DETECTION_DTYPE)
+        self.record_file = records['file']
+        self.record_frame = records['frame']
+        self.record_timestamp = records['timestamp']
+        self.record_width = records['width']
+        self.record_height = records['height']
+        self.record_status = records['status']
+        self.record_start = np.concatenate(
+            ([0], np.cumsum(records['detections'], dtype=np.int64))).astype(np.int64)
+        self.boxes = detections['box']
+        self.confidence = detections['confidence']
+        self.class_index = detections['class_index']
+
+    @property
+    def threshold_floor(self) -> Optional[float]:
+        """Lowest confidence kept in the sidecar"""
+        return self.metadata.get('threshold_floor')
+
+    def __len__(self):
+        return len(self.record_file)
+
+    def records(self, threshold: float = 0.0) -> Iterator[Tuple[int, Dict[str, Any], List[Dict[str, Any]]]]:
+        """
+        Iterate over the records, with their detections at or above a threshold.
+
+        Yields:
+            Tuple of (file index, record dict with 'file_path', 'output_path',
+            'frame_number', 'frame_timestamp', 'image_dimensions' and 'status',
+            list of detection dicts)
+        """
+        keep = self.confidence >= threshold
+        for record in range(len(self.record_file)):
+            start, end = self.record_start[record], self.record_start[record + 1]
+            detections = []
+            for box, confidence, class_index in zip(
+                    self.boxes[start:end][keep[start:end]].tolist(),
+                    self.confidence[start:end][keep[start:end]].tolist(),
+                    self.class_index[start:end][keep[start:end]].tolist()):
+                x1, y1, x2, y2 = box
+                detections.append({
+                    'class': self.classes[class_index],
+                    'confidence': round(confidence, 6),
+                    'bbox': {
+                        'x_center': (x1 + x2) / 2,
+                        'y_center': (y1 + y2) / 2,
+                        'width': x2 - x1,
+                        'height': y2 - y1
+                    }
+                })
+
+            file_index = int(self.record_file[record])
+            frame_number = int(self.record_frame[record])
+            frame_timestamp = float(self.record_timestamp[record])
+            width = int(self.record_width[record])
+            height = int(self.record_height[record])
+            yield file_index, {
+                'file_path': self.file_paths[file_index],
+                'output_path': self.output_paths[file_index],
+                'frame_number': frame_number if frame_number >= 0 else None,
+                'frame_timestamp': None if np.isnan(frame_timestamp) else frame_timestamp,
+                'image_dimensions': (width, height) if width and height else None,
+                'status': self.statuses[int(self.record_status[record])]
+            }, detections
@@ -0,0 +1,268 @@
+import csv
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Union
+
+import cv2
+
+# Box and label style of the annotated outputs (BGR)
+BOX_COLOR = (0, 255, 0)
+BOX_THICKNESS = 4
+LABEL_FONT_SCALE = 1.3
+LABEL_THICKNESS = 3
+
+
+class RenderJob(NamedTuple):
+    """One annotated output to draw from stored detections"""
+    input_path: str
+    output_path: str
+    # Detections of an image, or frame number -> detections for a video
+    detections: Union[List[Dict[str, Any]], Dict[int, List[Dict[str, Any]]]]
+
+    @property
+    def is_video(self) -> bool:
+        return isinstance(self.detections, dict)
+
+
+def draw_detections(image, detections: List[Dict[str, Any]]):
+    """
+    Draw detection dicts (original image coordinates) onto an image.
+
+    Args:
+        image: BGR image, drawn on in place
+        detections (list): Detections with 'class' and a center/size 'bbox'
+
+    Returns:
+        The image
+    """
+    for detection in detections:
+        bbox = detection['bbox']
+        x1 = int(bbox['x_center'] - bbox['width'] / 2)
+        y1 = int(bbox['y_center'] - bbox['height'] / 2)
+        x2 = int(bbox['x_center'] + bbox['width'] / 2)
+        y2 = int(bbox['y_center'] + bbox['height'] / 2)
+
+        cv2.rectangle(image, (x1, y1), (x2, y2), BOX_COLOR, BOX_THICKNESS)
+        cv2.putText(
+            image,
+            detection['class'].upper(),
+            (x1, y1 - 10),
+            cv2.FONT_HERSHEY_SIMPLEX,
+            LABEL_FONT_SCALE,
+            BOX_COLOR,
+            LABEL_THICKNESS,
+            cv2.LINE_AA
+        )
+    return image
+
+
+def render_image(input_path: str, output_path: str,
+                 detections: List[Dict[str, Any]]) -> bool:
+    """
+    Draw detections onto an image file and save the result.
+
+    Returns:
+        True if the annotated image was written
+    """
+    img = cv2.imread(input_path)
+    if img is None:
+        print(f"Error reading image file: {input_path}")
+        return False
+    return cv2.imwrite(output_path, draw_detections(img, detections))
+
+
+def render_video(input_path: str, output_path: str,
+                 detections_by_frame: Dict[int, List[Dict[str, Any]]]) -> bool:
+    """
+    Draw per-frame detections onto a video file and save the result.
+
+    Args:
+        input_path (str): Source video
+        output_path (str): Annotated video to write
+        detections_by_frame (dict): Frame number -> detections, frames
+            without an entry are written unchanged
+
+    Returns:
+        True if the annotated video was written
+    """
+    cap = cv2.VideoCapture(input_path)
+    if not cap.isOpened():
+        print(f"Error reading video file: {input_path}")
+        return False
+
+    fps = int(cap.get(cv2.CAP_PROP_FPS))
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    out = cv2.VideoWriter(output_path, cv2.VideoWriter_fourcc(*'mp4v'),
+                          fps, (width, height))
+
+    frame_number = 0
+    ret, frame = cap.read()
+    while ret:
+        out.write(draw_detections(frame, detections_by_frame.get(frame_number, [])))
+        frame_number += 1
+        ret, frame = cap.read()
+
+    cap.release()
+    out.release()
+    return True
+
+
+def _input_root(file_paths: List[str]) -> str:
+    """Common folder of all inputs, below which a run mirrors its outputs."""
+    if len(file_paths) == 1:
+        return os.path.dirname(file_paths[0])
+    return os.path.commonpath(file_paths)
+
+
+def load_csv_render_jobs(csv_path: str, output_folder: str,
+                         threshold: Optional[float] = None) -> List[RenderJob]:
+    """
+    Build render jobs from a detections CSV written by DetectionCSVLogger.
+
+    The CSV does not record where outputs went, so each output is placed
+    below output_folder at its path relative to the common folder of all
+    inputs, as a prediction run lays them out.
+
+    Args:
+        csv_path (str): Detections CSV
+        output_folder (str): Folder to write the annotated media to
+        threshold (float, optional): Only draw detections at or above it
+
+    Returns:
+        One job per file in the CSV
+    """
+    files = {}
+    with open(csv_path, newline='', encoding='utf-8') as csv_file:
+        for row in csv.DictReader(csv_file):
+            file_path = row['file_path']
+            if row['frame_number'] != "":
+                detections = files.setdefault(file_path, {}).setdefault(
+                    int(row['frame_number']), [])
+            else:
+                detections = files.setdefault(file_path, [])
+
+            if row['detection_class'] == "NO_DETECTION":
+                continue
+            confidence = float(row['confidence'])
+            if threshold is not None and confidence < threshold:
+                continue
+            detections.append({
+                'class': row['detection_class'],
+                'confidence': confidence,
+                'bbox': {
+                    'x_center': float(row['bbox_x_center']),
+                    'y_center': float(row['bbox_y_center']),
+                    'width': float(row['bbox_width']),
+                    'height': float(row['bbox_height'])
+                }
+            })
+
+    if not files:
+        return []
+    input_root = _input_root(list(files))
+    return [RenderJob(file_path,
+                      os.path.join(output_folder, os.path.relpath(file_path, input_root)),
+                      detections)
+            for file_path, detections in files.items()]
+
+
+def load_raw_render_jobs(raw_predictions, threshold: float,
+                         output_folder: Optional[str] = None) -> List[RenderJob]:
+    """
+    Build render jobs from stored raw predictions.
+
+    Args:
+        raw_predictions (RawPredictions): Predictions read from a sidecar
+        threshold (float): Only draw detections at or above it
+        output_folder (str, optional): Folder to write the annotated media to,
+            defaults to the outputs of the original run. Outputs keep their
+            file name and their folder relative to the common folder of all
+            inputs, as a prediction run lays them out
+
+    Returns:
+        One job per file with an output
+    """
+    files = {}
+    for file_index, record, detections in raw_predictions.records(threshold):
+        if record['frame_number'] is None:
+            files[file_index] = detections
+        else:
+            files.setdefault(file_index, {})[record['frame_number']] = detections
+
+    if not files:
+        return []
+    if output_folder:
+        input_root = _input_root([raw_predictions.file_paths[file_index]
+                                  for file_index in files])
+
+    jobs = []
+    for file_index, detections in files.items():
+        input_path = raw_predictions.file_paths[file_index]
+        output_path = raw_predictions.output_paths[file_index]
+        if output_folder:
+            output_path = os.path.normpath(os.path.join(
+                output_folder,
+                os.path.relpath(os.path.dirname(input_path), input_root),
+                os.path.basename(output_path or input_path)))
+        if output_path:
+            jobs.append(RenderJob(input_path, output_path, detections))
+    return jobs
+
+
+def render_jobs(jobs: List[RenderJob], workers: int = 0,
+                progress_callback: Optional[Callable[[int, str], None]] = None) -> Dict[str, Any]:
+    """
+    Render annotated media in parallel.
+
+    Decoding, drawing and encoding run in OpenCV, which releases the GIL, so
+    a thread pool keeps all cores busy without the start-up cost of worker
+    processes. No model is loaded.
+
+    Args:
+        jobs (list): Outputs to render
+        workers (int): Number of render threads, 0 uses all CPU cores
+        progress_callback (callable, optional): Called with the number of
+            finished jobs and a message
+
+    Returns:
+        Dict with the number of successful and failed files and the output
+        paths that could not be written
+    """
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(jobs)))
+
+    def render(job):
+        output_dir = os.path.dirname(job.output_path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        if job.is_video:
+            return render_video(job.input_path, job.output_path, job.detections)
+        return render_image(job.input_path, job.output_path, job.detections)
+
+    failed_paths = []
+    if jobs:
+        with ThreadPoolExecutor(max_workers=workers,
+                                thread_name_prefix='render') as pool:
+            futures = {pool.submit(render, job): job for job in jobs}
+            for finished, future in enumerate(as_completed(futures), 1):
+                job = futures[future]
+                try:
+                    rendered = future.result()
+                except Exception as e:
+                    print(f"Error rendering {job.input_path}: {e}")
+                    rendered = False
+                if not rendered:
+                    failed_paths.append(job.output_path)
+                if progress_callback:
+                    progress_callback(
+                        finished, f"Rendered {os.path.basename(job.output_path)}")
+
+    return {
+        'total_files': len(jobs),
+        'successful_files': len(jobs) - len(failed_paths),
+        'failed_files': len(failed_paths),
+        'failed_paths': failed_paths,
+        'workers': workers
+    }
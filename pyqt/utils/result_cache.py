@@ -0,0 +1,243 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.paths import get_cache_path
+
+try:
+    import xxhash
+except ImportError:  # Optional, content hashes fall back to BLAKE2
+    xxhash = None
+
+# Preprocessing the cached detections were made with, part of every key so
+# results from an older preprocessing are not reused
+PREPROCESSING = "letterbox"
+
+# Videos are identified by their size and the bytes at both ends
+VIDEO_SAMPLE_BYTES = 4 * 1024 * 1024
+HASH_CHUNK_BYTES = 1024 * 1024
+
+
+def _new_hasher():
+    if xxhash is not None:
+        return xxhash.xxh3_128()
+    return hashlib.blake2b(digest_size=16)
+
+
+def content_hash(file_path: str, sample_bytes: Optional[int] = None) -> str:
+    """
+    Hash the contents of a file.
+
+    Args:
+        file_path (str): File to hash
+        sample_bytes (int, optional): Only hash the file size and the first
+            and last sample_bytes bytes, for large videos
+
+    Returns:
+        Hex digest, prefixed with the hash algorithm
+    """
+    hasher = _new_hasher()
+    size = os.path.getsize(file_path)
+    with open(file_path, 'rb') as media_file:
+        if sample_bytes and size > 2 * sample_bytes:
+            hasher.update(str(size).encode())
+            hasher.update(media_file.read(sample_bytes))
+            media_file.seek(size - sample_bytes)
+            hasher.update(media_file.read(sample_bytes))
+        else:
+            for chunk in iter(lambda: media_file.read(HASH_CHUNK_BYTES), b''):
+                hasher.update(chunk)
+    prefix = "xxh3" if xxhash is not None else "b2"
+    return f"{prefix}:{hasher.hexdigest()}"
+
+
+_model_hashes = {}
+_model_hashes_lock = threading.Lock()
+
+
+def model_hash(model_path: str) -> str:
+    """Hash a model file, remembered while its size and mtime do not change."""
+    stat = os.stat(model_path)
+    key = (os.path.abspath(model_path), stat.st_size, stat.st_mtime_ns)
+    with _model_hashes_lock:
+        if key not in _model_hashes:
+            _model_hashes[key] = content_hash(model_path)
+        return _model_hashes[key]
+
+
+def filter_detections(detections: List[Dict[str, Any]], threshold: float) -> List[Dict[str, Any]]:
+    """Keep the detections at or above a confidence threshold."""
+    return [detection for detection in detections
+            if detection.get('confidence', 0.0) >= threshold]
+
+
+class ResultCache:
+    """
+    Persistent cache of raw detection results, keyed by file contents.
+
+    Entries are keyed by a content hash of the media file, a hash of the
+    model file, the model input size and preprocessing, and the options that
+    change the result (video frame sampling). They store the detections (per frame for
+    videos) found at the threshold inference ran with and the threshold
+    floor. An entry answers any request at or above its threshold floor, so
+    copies of a file and re-runs of a folder only cost a hash and drawing
+    the output.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS results (
+            content_hash TEXT NOT NULL,
+            model_hash TEXT NOT NULL,
+            input_size INTEGER NOT NULL,
+            options TEXT NOT NULL,
+            threshold_floor REAL NOT NULL,
+            media_type TEXT NOT NULL,
+            payload BLOB NOT NULL,
+            created_at REAL NOT NULL,
+            PRIMARY KEY (content_hash, model_hash, input_size, options, threshold_floor)
+        );
+    """
+
+    def __init__(self, db_path: str):
+        """
+        Open (and create if needed) the result cache.
+
+        Args:
+            db_path (str): Path to the SQLite database file
+        """
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Decoder threads share the connection, access is serialized through
+        # self._lock
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(db_path, check_same_thread=False,
+                                          timeout=30)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(self.SCHEMA)
+        self.connection.commit()
+
+    def lookup(self, file_path: str, model_path: str, threshold: float,
+               input_size: int = 640, options: str = "",
+               sample_bytes: Optional[int] = None) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """
+        Find the cached result of a file.
+
+        Args:
+            file_path (str): Media file
+            model_path (str): Model file the result must come from
+            threshold (float): Confidence threshold of the request
+            input_size (int): Model input size
+            options (str): Options that change the result
+            sample_bytes (int, optional): See content_hash()
+
+        Returns:
+            Tuple of (content hash, cached result or None). The hash is None
+            if the file or model could not be read. Detections in the result
+            are not yet filtered to the threshold.
+        """
+        try:
+            file_hash = content_hash(file_path, sample_bytes)
+            weights_hash = model_hash(model_path)
+        except OSError as e:
+            print(f"Error hashing {file_path} for the result cache: {e}")
+            return None, None
+
+        options = f"{PREPROCESSING};{options}"
+        with self._lock:
+            if self.connection is None:
+                return file_hash, None
+            row = self.connection.execute(
+                "SELECT payload FROM results WHERE content_hash = ? AND model_hash = ? "
+                "AND input_size = ? AND options = ? AND threshold_floor <= ? "
+                "ORDER BY threshold_floor DESC LIMIT 1",
+                (file_hash, weights_hash, input_size, options, threshold)).fetchone()
+        if row is None:
+            return file_hash, None
+
+        try:
+            return file_hash, json.loads(zlib.decompress(row[0]))
+        except (zlib.error, ValueError) as e:
+            print(f"Error reading cached result of {file_path}: {e}")
+            return file_hash, None
+
+    def store(self, file_hash: str, model_path: str, threshold_floor: float,
+              media_type: str, result: Dict[str, Any], input_size: int = 640,
+              options: str = ""):
+        """
+        Store the result of a file.
+
+        Args:
+            file_hash (str): Content hash returned by lookup()
+            model_path (str): Model file the result comes from
+            threshold_floor (float): Confidence threshold inference ran with
+            media_type (str): 'image' or 'video'
+            result (dict): JSON-serializable result
+            input_size (int): Model input size
+            options (str): Options that change the result
+        """
+        try:
+            weights_hash = model_hash(model_path)
+            options = f"{PREPROCESSING};{options}"
+            payload = zlib.compress(json.dumps(result).encode('utf-8'))
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Error caching result: {e}")
+            return
+
+        with self._lock:
+            if self.connection is None:
+                return
+            with self.connection:
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO results (content_hash, model_hash, input_size, "
+                    "options, threshold_floor, media_type, payload, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (file_hash, weights_hash, input_size, options, threshold_floor,
+                     media_type, sqlite3.Binary(payload), time.time()))
+
+    def clear(self):
+        """Remove all cached results."""
+        with self._lock:
+            if self.connection is None:
+                return
+            with self.connection:
+                self.connection.execute("DELETE FROM results")
+            self.connection.execute("VACUUM")
+
+    def close(self):
+        """Close the database."""
+        with self._lock:
+            if self.connection is None:
+                return
+            self.connection.close()
+            self.connection = None
+
+
+_result_cache = None
+_result_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> Optional[ResultCache]:
+    """
+    Get the result cache shared by image and video prediction.
+
+    Returns:
+        The cache, or None if it could not be opened
+    """
+    global _result_cache
+    with _result_cache_lock:
+        if _result_cache is None:
+            try:
+                _result_cache = ResultCache(get_cache_path()["results"])
+            except Exception as e:
+                print(f"Error opening result cache: {e}")
+                return None
+        return _result_cache
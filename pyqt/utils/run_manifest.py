@@ -0,0 +1,220 @@
+import datetime
+import glob
+import json
+import os
+from typing import Any, Dict, List, Optional
+
+
+def _normalize_path(file_path: str) -> str:
+    """Path used to identify an input file in a manifest."""
+    return os.path.normcase(os.path.abspath(file_path))
+
+
+class Checkpoint:
+    """
+    Completion marker of one input file, queued in the CSV logger buffer
+    behind the file's detection rows.
+    """
+
+    __slots__ = ('path', 'size', 'mtime_ns', 'detection_id', 'csv_offset', 'raw_records')
+
+    def __init__(self, file_path: str, detection_id: int,
+                 raw_records: Optional[int] = None):
+        stat = os.stat(file_path)
+        self.path = _normalize_path(file_path)
+        self.size = stat.st_size
+        self.mtime_ns = stat.st_mtime_ns
+        self.detection_id = detection_id
+        self.csv_offset = None
+        self.raw_records = raw_records
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'path': self.path,
+            'size': self.size,
+            'mtime_ns': self.mtime_ns,
+            'detection_id': self.detection_id,
+            'csv_offset': self.csv_offset,
+            'raw_records': self.raw_records
+        }
+
+
+class RunManifest:
+    """
+    Checkpoint manifest of a prediction run.
+
+    The manifest is a JSON-lines file next to the run's CSV reports. The first
+    line identifies the run (input folder, model file and threshold) and its
+    output files, every following line records one completed input file with
+    its size and mtime, the last detection id, the size of the detection
+    CSV once the file's rows were written and, when raw predictions are
+    kept, the number of records in the raw sidecar.
+
+    A resumed run skips the completed files whose size and mtime did not
+    change, and truncates the detection CSV and the raw sidecar to the last
+    checkpoint, dropping the rows of a file that was interrupted halfway.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: str, header: Dict[str, Any],
+                 entries: Optional[List[Dict[str, Any]]] = None):
+        self.path = path
+        self.header = header
+        self.completed = {}
+        self.csv_offset = header.get('csv_offset')
+        self.detection_id = 0
+        self.raw_records = None
+        self._file = None
+        for entry in entries or []:
+            self._add_entry(entry)
+
+    @staticmethod
+    def run_key(input_folder: str, model_path: str, threshold: float) -> Dict[str, Any]:
+        """
+        Identify a run by its input folder, model file and threshold.
+
+        The model is identified by its path, size and mtime, so replacing the
+        weights invalidates the checkpoints of earlier runs.
+        """
+        try:
+            stat = os.stat(model_path)
+            model_size, model_mtime_ns = stat.st_size, stat.st_mtime_ns
+        except (OSError, TypeError):
+            model_size = model_mtime_ns = None
+        return {
+            'input_folder': _normalize_path(input_folder),
+            'model_path': _normalize_path(model_path) if model_path else None,
+            'model_size': model_size,
+            'model_mtime_ns': model_mtime_ns,
+            'threshold': round(float(threshold), 6)
+        }
+
+    @classmethod
+    def create(cls, path: str, run_key: Dict[str, Any], session_id: str,
+               detections_csv: str, summary_csv: str, csv_offset: int) -> 'RunManifest':
+        """
+        Start the manifest of a new run.
+
+        Args:
+            path (str): Manifest file to create
+            run_key (dict): Run identity from run_key()
+            session_id (str): Session id used in the reports
+            detections_csv (str): Detection CSV of the run
+            summary_csv (str): Summary CSV of the run
+            csv_offset (int): Size of the detection CSV holding only its header
+        """
+        header = {
+            'manifest_version': cls.VERSION,
+            'run': run_key,
+            'session_id': session_id,
+            'detections_csv': detections_csv,
+            'summary_csv': summary_csv,
+            'csv_offset': csv_offset,
+            'created_at': datetime.datetime.now().isoformat()
+        }
+        manifest = cls(path, header)
+        manifest._file = open(path, 'w', encoding='utf-8')
+        manifest._file.write(json.dumps(header) + "\n")
+        manifest._file.flush()
+        return manifest
+
+    @classmethod
+    def load(cls, path: str) -> Optional['RunManifest']:
+        """
+        Read a manifest.
+
+        A partially written last line, from a run that was killed while
+        writing it, is ignored.
+
+        Returns:
+            The manifest, or None if it could not be read
+        """
+        try:
+            with open(path, 'r', encoding='utf-8') as manifest_file:
+                lines = manifest_file.read().splitlines()
+            header = json.loads(lines[0])
+        except (OSError, IndexError, ValueError) as e:
+            print(f"Error reading run manifest {path}: {e}")
+            return None
+        if header.get('manifest_version') != cls.VERSION:
+            return None
+
+        entries = []
+        for line in lines[1:]:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                break
+        return cls(path, header, entries)
+
+    @classmethod
+    def find_resumable(cls, directory: str, run_key: Dict[str, Any]) -> Optional['RunManifest']:
+        """
+        Find the latest manifest of the same run whose reports still exist.
+
+        Args:
+            directory (str): Report directory to search
+            run_key (dict): Run identity from run_key()
+
+        Returns:
+            The manifest, opened for appending, or None
+        """
+        paths = glob.glob(os.path.join(glob.escape(directory), "manifest_*.jsonl"))
+        for path in sorted(paths, key=os.path.getmtime, reverse=True):
+            manifest = cls.load(path)
+            if manifest is None or manifest.header.get('run') != run_key:
+                continue
+            if not os.path.exists(manifest.header.get('detections_csv', '')):
+                continue
+            manifest._file = open(path, 'a', encoding='utf-8')
+            return manifest
+        return None
+
+    @property
+    def session_id(self) -> str:
+        return self.header['session_id']
+
+    @property
+    def detections_csv(self) -> str:
+        return self.header['detections_csv']
+
+    @property
+    def summary_csv(self) -> str:
+        return self.header['summary_csv']
+
+    def _add_entry(self, entry: Dict[str, Any]):
+        self.completed[entry['path']] = (entry['size'], entry['mtime_ns'])
+        self.csv_offset = entry['csv_offset']
+        self.detection_id = entry['detection_id']
+        self.raw_records = entry.get('raw_records')
+
+    def is_completed(self, file_path: str) -> bool:
+        """Check if a file was completed and has not changed since."""
+        completed = self.completed.get(_normalize_path(file_path))
+        if completed is None:
+            return False
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return False
+        return completed == (stat.st_size, stat.st_mtime_ns)
+
+    def record(self, checkpoints: List[Checkpoint]):
+        """
+        Append completed files to the manifest.
+
+        Only call this once the detection rows of these files are on disk.
+        """
+        if not checkpoints or self._file is None:
+            return
+        for checkpoint in checkpoints:
+            entry = checkpoint.to_dict()
+            self._file.write(json.dumps(entry) + "\n")
+            self._add_entry(entry)
+        self._file.flush()
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,99 @@
+import datetime
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, NamedTuple, Optional
+
+from PIL import Image
+
+# EXIF tags holding the capture time
+EXIF_IFD = 0x8769
+DATETIME_ORIGINAL = 36867
+DATETIME = 306
+
+
+class Sequence(NamedTuple):
+    """A burst of images taken by one camera in one trigger"""
+    sequence_id: str  # relative path of the first image
+    camera_folder: str
+    names: List[str]  # in capture order
+    start_time: Optional[datetime.datetime] = None
+    end_time: Optional[datetime.datetime] = None
+
+    @property
+    def representative(self) -> str:
+        """Middle image of the burst, the one most likely to show the whole animal"""
+        return self.names[len(self.names) // 2]
+
+
+def read_capture_time(image_path: str) -> Optional[datetime.datetime]:
+    """
+    Read when an image was taken from its EXIF DateTimeOriginal tag, falling
+    back to DateTime. Only the file header is read.
+
+    Returns:
+        Capture time, or None if the image has no usable EXIF timestamp
+    """
+    try:
+        with Image.open(image_path) as img:
+            exif = img.getexif()
+            value = exif.get_ifd(EXIF_IFD).get(DATETIME_ORIGINAL) or exif.get(DATETIME)
+    except Exception:
+        return None
+    if not value:
+        return None
+    try:
+        return datetime.datetime.strptime(str(value).strip('\x00 '), "%Y:%m:%d %H:%M:%S")
+    except ValueError:
+        return None
+
+
+def group_sequences(folder_path: str, names: List[str],
+                    max_gap_seconds: float = 10.0,
+                    workers: int = 8) -> List[Sequence]:
+    """
+    Group images into bursts by camera folder and capture time.
+
+    Images of the same folder whose EXIF capture times are at most
+    max_gap_seconds apart form one sequence. Images without a capture time
+    form a sequence of their own. A sequence is identified by its first
+    image, so grouping the same images again gives the same ids.
+
+    Args:
+        folder_path (str): Input folder the names are relative to
+        names (list): Relative image paths, as passed to label_all_images
+        max_gap_seconds (float): Largest gap between two images of a burst
+        workers (int): Threads reading EXIF headers
+
+    Returns:
+        Sequences ordered by folder and start time
+    """
+    base = folder_path.replace("\\", "/")
+    with ThreadPoolExecutor(max_workers=max(1, workers),
+                            thread_name_prefix='exif') as pool:
+        capture_times = list(pool.map(
+            lambda name: read_capture_time(base + "/" + name), names))
+
+    folders: Dict[str, list] = {}
+    for name, capture_time in zip(names, capture_times):
+        folders.setdefault(os.path.dirname(name), []).append((capture_time, name))
+
+    sequences = []
+    for camera_folder in sorted(folders):
+        timed = sorted((item for item in folders[camera_folder] if item[0] is not None),
+                       key=lambda item: (item[0], item[1]))
+        bursts = []
+        for capture_time, name in timed:
+            if bursts and (capture_time - bursts[-1][-1][0]).total_seconds() <= max_gap_seconds:
+                bursts[-1].append((capture_time, name))
+            else:
+                bursts.append([(capture_time, name)])
+        bursts.extend([item] for item in folders[camera_folder] if item[0] is None)
+
+        for burst in bursts:
+            sequences.append(Sequence(
+                sequence_id=burst[0][1],
+                camera_folder=camera_folder,
+                names=[name for _, name in burst],
+                start_time=burst[0][0],
+                end_time=burst[-1][0]))
+    return sequences
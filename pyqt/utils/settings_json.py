@@ -3,5 +3,33 @@ settings_data = {
     "media_output_path": "pyqt/output",
     "report": "pyqt/reports",
     "recursive_folder_search": False,
-    "threshold": 0.7
+    "threshold": 0.7,
+    "batch_size": 8,
+    "decode_workers": 4,
+    "write_workers": 2,
+    "execution_mode": "threaded",
+    "num_workers": 0,
+    "motion_gating": False,
+    "motion_threshold": 0.002,
+    "sampling_mode": "all",
+    "frame_stride": 5,
+    "target_fps": 2.0,
+    "fill_mode": "hold",
+    "parquet_output": False,
+    "sqlite_output": False,
+    "resume_predictions": False,
+    "use_result_cache": True,
+    "keep_raw_predictions": False,
+    "raw_threshold_floor": 0.05,
+    "tiled_inference": "off",
+    "tile_size": 640,
+    "tile_overlap": 0.2,
+    "tile_merge": "nms",
+    "tile_fallback_threshold": 0.5,
+    "cascade_filter": False,
+    "cascade_screen_size": 320,
+    "cascade_screen_threshold": 0.1,
+    "sequence_grouping": False,
+    "sequence_gap_seconds": 10.0,
+    "sequence_ambiguity_floor": 0.25
 }
@@ -0,0 +1,196 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional, Tuple
+
+from utils.paths import get_cache_path
+
+
+class ThumbnailCache:
+    """
+    Persistent thumbnail cache stored as encoded image blobs in SQLite.
+
+    Entries are keyed by file path and thumbnail dimensions and are only
+    returned while the file's modification time and size still match. When
+    the cache grows beyond max_bytes, the least recently used thumbnails are
+    evicted.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS thumbnails (
+            file_path TEXT NOT NULL,
+            width INTEGER NOT NULL,
+            height INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            file_size INTEGER NOT NULL,
+            data BLOB NOT NULL,
+            last_access REAL NOT NULL,
+            PRIMARY KEY (file_path, width, height)
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_thumbnails_last_access
+            ON thumbnails(last_access);
+    """
+
+    def __init__(self, db_path: str, max_bytes: int = 512 * 1024 * 1024,
+                 touch_batch: int = 500):
+        """
+        Open (and create if needed) the thumbnail cache.
+
+        Args:
+            db_path (str): Path to the SQLite database file
+            max_bytes (int): Maximum total size of the cached thumbnails
+            touch_batch (int): Number of cache hits collected before their
+                access times are written
+        """
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.touch_batch = touch_batch
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Thumbnail threads share the connection, access is serialized
+        # through self._lock
+        self._lock = threading.Lock()
+        self._touched = {}
+        self.connection = sqlite3.connect(db_path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(self.SCHEMA)
+        self.connection.commit()
+        self._total_bytes = self.connection.execute(
+            "SELECT COALESCE(SUM(LENGTH(data)), 0) FROM thumbnails").fetchone()[0]
+
+    def get(self, file_path: str, size: Tuple[int, int]) -> Optional[bytes]:
+        """
+        Get the cached thumbnail of a file.
+
+        Args:
+            file_path (str): Path of the original file
+            size (tuple): (width, height) the thumbnail was generated for
+
+        Returns:
+            Encoded thumbnail, or None if it is missing or the file changed
+        """
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+
+        key = (file_path, size[0], size[1])
+        with self._lock:
+            if self.connection is None:
+                return None
+            row = self.connection.execute(
+                "SELECT data, mtime_ns, file_size FROM thumbnails "
+                "WHERE file_path = ? AND width = ? AND height = ?", key).fetchone()
+            if row is None or row[1] != stat.st_mtime_ns or row[2] != stat.st_size:
+                return None
+
+            # Access times are only needed for eviction, write them in batches
+            self._touched[key] = time.time()
+            if len(self._touched) >= self.touch_batch:
+                self._write_touches()
+            return row[0]
+
+    def put(self, file_path: str, size: Tuple[int, int], data: bytes):
+        """
+        Store the thumbnail of a file.
+
+        Args:
+            file_path (str): Path of the original file
+            size (tuple): (width, height) the thumbnail was generated for
+            data (bytes): Encoded thumbnail
+        """
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return
+
+        key = (file_path, size[0], size[1])
+        with self._lock:
+            if self.connection is None:
+                return
+            with self.connection:
+                previous = self.connection.execute(
+                    "SELECT LENGTH(data) FROM thumbnails "
+                    "WHERE file_path = ? AND width = ? AND height = ?", key).fetchone()
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO thumbnails (file_path, width, height, "
+                    "mtime_ns, file_size, data, last_access) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (*key, stat.st_mtime_ns, stat.st_size, sqlite3.Binary(data), time.time()))
+            self._total_bytes += len(data) - (previous[0] if previous else 0)
+
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _write_touches(self):
+        """Write the collected access times."""
+        if not self._touched:
+            return
+        with self.connection:
+            self.connection.executemany(
+                "UPDATE thumbnails SET last_access = ? "
+                "WHERE file_path = ? AND width = ? AND height = ?",
+                [(access, *key) for key, access in self._touched.items()])
+        self._touched = {}
+
+    def _evict(self):
+        """Remove least recently used thumbnails until the cache is below 90% of its cap."""
+        self._write_touches()
+        target = int(self.max_bytes * 0.9)
+        evicted = []
+        for rowid, length in self.connection.execute(
+                "SELECT rowid, LENGTH(data) FROM thumbnails ORDER BY last_access"):
+            if self._total_bytes <= target:
+                break
+            evicted.append((rowid,))
+            self._total_bytes -= length
+
+        with self.connection:
+            self.connection.executemany(
+                "DELETE FROM thumbnails WHERE rowid = ?", evicted)
+
+    def clear(self):
+        """Remove all cached thumbnails."""
+        with self._lock:
+            if self.connection is None:
+                return
+            with self.connection:
+                self.connection.execute("DELETE FROM thumbnails")
+            self.connection.execute("VACUUM")
+            self._touched = {}
+            self._total_bytes = 0
+
+    def close(self):
+        """Write pending access times and close the database."""
+        with self._lock:
+            if self.connection is None:
+                return
+            self._write_touches()
+            self.connection.close()
+            self.connection = None
+
+
+_thumbnail_cache = None
+_thumbnail_cache_lock = threading.Lock()
+
+
+def get_thumbnail_cache() -> Optional[ThumbnailCache]:
+    """
+    Get the thumbnail cache shared by the gallery and the file explorer.
+
+    Returns:
+        The cache, or None if it could not be opened
+    """
+    global _thumbnail_cache
+    with _thumbnail_cache_lock:
+        if _thumbnail_cache is None:
+            try:
+                _thumbnail_cache = ThumbnailCache(get_cache_path()["thumbnails"])
+            except Exception as e:
+                print(f"Error opening thumbnail cache: {e}")
+                return None
+        return _thumbnail_cache
@@ -0,0 +1,345 @@
+import io
+import os
+import struct
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import cv2
+from PIL import Image, ImageQt
+from PyQt5.QtCore import QThread, pyqtSignal
+from PyQt5.QtGui import QImage
+
+from utils.thumbnail_cache import get_thumbnail_cache
+
+IMAGE_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.bmp', '.gif', '.tiff', '.webp']
+VIDEO_EXTENSIONS = ['.mp4', '.avi', '.mov', '.mkv', '.wmv', '.flv', '.webm']
+
+
+class ThumbnailGenerator(QThread):
+    """
+    Background thread scheduling thumbnail generation on a pool of workers.
+
+    Files are generated in list order, except that files reported through
+    set_visible_files() jump the queue. Visible requests for files that have
+    scrolled out of view are cancelled and those files fall back to their
+    place in list order. With wait_for_requests, the thread keeps running
+    once the list is done and generates the files reported through
+    set_visible_files() until it is stopped, so a view can start it with an
+    empty list and only ask for what it shows. Workers produce QImages;
+    converting them to pixmaps is left to the GUI thread. Files without a
+    thumbnail (unreadable or unsupported) are reported through
+    thumbnail_failed.
+    """
+
+    thumbnail_ready = pyqtSignal(str, QImage)  # file_path, thumbnail
+    thumbnail_failed = pyqtSignal(str)  # file_path
+    progress_updated = pyqtSignal(int, int)  # current, total
+
+    def __init__(self, file_paths, thumbnail_size=(150, 150), cache=None,
+                 max_workers=None, wait_for_requests=False):
+        super().__init__()
+        self.file_paths = file_paths
+        self.wait_for_requests = wait_for_requests
+        self.thumbnail_size = thumbnail_size
+        self.cache = cache if cache is not None else get_thumbnail_cache()
+        self.max_workers = max_workers or min(8, os.cpu_count() or 4)
+        self.is_running = True
+
+        self._condition = threading.Condition()
+        self._pending = set(file_paths)
+        self._next_index = 0
+        self._visible_queue = []
+        self._in_flight = 0
+        self._completed = 0
+
+    def set_visible_files(self, file_paths):
+        """
+        Generate these files next, in the given order.
+
+        Replaces the previous visible files, cancelling their requests. Files
+        that were already generated are generated again (normally a cache hit),
+        for views that dropped their thumbnail.
+        """
+        with self._condition:
+            self._pending.update(file_paths)
+            self._visible_queue = list(reversed(file_paths))
+            self._condition.notify()
+
+    def _next_file(self):
+        """Pop the next pending file, visible files first."""
+        while self._visible_queue:
+            path = self._visible_queue.pop()
+            if path in self._pending:
+                return path
+        while self._next_index < len(self.file_paths):
+            path = self.file_paths[self._next_index]
+            self._next_index += 1
+            if path in self._pending:
+                return path
+        return None
+
+    def _wait_for_file(self):
+        """Wait for a free worker and the next file, None once stopped or done"""
+        while self.is_running:
+            if self._in_flight < self.max_workers:
+                file_path = self._next_file()
+                if file_path is not None or not self.wait_for_requests:
+                    return file_path
+            self._condition.wait()
+        return None
+
+    def run(self):
+        """Generate thumbnails for all files"""
+        total_files = len(self.file_paths)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers,
+                                thread_name_prefix="thumbnail") as executor:
+            while True:
+                with self._condition:
+                    file_path = self._wait_for_file()
+                    if file_path is None:
+                        break
+                    self._pending.discard(file_path)
+                    self._in_flight += 1
+                executor.submit(self._generate_and_emit, file_path, total_files)
+
+    def _generate_and_emit(self, file_path, total_files):
+        """Worker task generating one thumbnail"""
+        try:
+            if self.is_running:
+                thumbnail = self.generate_thumbnail(file_path)
+                if thumbnail is not None and self.is_running:
+                    self.thumbnail_ready.emit(file_path, thumbnail)
+                elif self.is_running:
+                    self.thumbnail_failed.emit(file_path)
+        finally:
+            with self._condition:
+                self._in_flight -= 1
+                self._completed += 1
+                completed = self._completed
+                self._condition.notify()
+            self.progress_updated.emit(completed, max(completed, total_files))
+
+    def generate_thumbnail(self, file_path):
+        """Get the thumbnail for a single file from the cache, or generate it"""
+        try:
+            if self.cache:
+                cached = self.cache.get(file_path, self.thumbnail_size)
+                if cached:
+                    image = QImage.fromData(cached)
+                    if not image.isNull():
+                        return image
+
+            file_ext = Path(file_path).suffix.lower()
+
+            # Image files
+            if file_ext in IMAGE_EXTENSIONS:
+                img = self.generate_image_thumbnail(file_path)
+
+            # Video files
+            elif file_ext in VIDEO_EXTENSIONS:
+                img = self.generate_video_thumbnail(file_path)
+
+            else:
+                return None
+
+            if img is None:
+                return None
+
+            if self.cache:
+                data = encode_thumbnail(img)
+                if data:
+                    self.cache.put(file_path, self.thumbnail_size, data)
+
+            # Convert to a QImage that owns its pixel data
+            return ImageQt.ImageQt(img).copy()
+
+        except Exception as e:
+            print(f"Error generating thumbnail for {file_path}: {e}")
+            return None
+
+    def generate_image_thumbnail(self, image_path):
+        """Generate thumbnail image for image file"""
+        try:
+            # Use PIL for better format support
+            with Image.open(image_path) as img:
+                if img.format == 'JPEG':
+                    # Camera JPEGs usually carry a small preview in their EXIF data
+                    preview = read_exif_thumbnail(img, self.thumbnail_size)
+                    if preview is not None:
+                        return preview
+                    # Otherwise img.thumbnail() below drafts the JPEG, so
+                    # libjpeg decodes at 1/2 to 1/8 scale while keeping twice
+                    # the thumbnail size for LANCZOS
+
+                # Convert RGBA to RGB if necessary
+                if img.mode in ('RGBA', 'LA', 'P'):
+                    rgb_img = Image.new('RGB', img.size, (255, 255, 255))
+                    if img.mode == 'P':
+                        img = img.convert('RGBA')
+                    rgb_img.paste(img, mask=img.split()
+                                  [-1] if img.mode in ('RGBA', 'LA') else None)
+                    img = rgb_img
+
+                # Create thumbnail
+                img.thumbnail(self.thumbnail_size, Image.Resampling.LANCZOS)
+
+                # Detach from the file, which is closed when leaving the block
+                return img.copy()
+
+        except Exception as e:
+            print(f"Error creating image thumbnail: {e}")
+            return None
+
+    def generate_video_thumbnail(self, video_path):
+        """Generate thumbnail image for video file"""
+        try:
+            # Use OpenCV to extract first frame
+            cap = cv2.VideoCapture(video_path)
+
+            if not cap.isOpened():
+                return None
+
+            # Read first frame
+            ret, frame = cap.read()
+            cap.release()
+
+            if not ret:
+                return None
+
+            # Convert BGR to RGB
+            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+            # Convert to PIL Image
+            pil_img = Image.fromarray(frame_rgb)
+
+            # Create thumbnail
+            pil_img.thumbnail(self.thumbnail_size, Image.Resampling.LANCZOS)
+
+            return pil_img
+
+        except Exception as e:
+            print(f"Error creating video thumbnail: {e}")
+            return None
+
+    def stop(self):
+        """Stop thumbnail generation, dropping all queued files"""
+        with self._condition:
+            self.is_running = False
+            self._pending.clear()
+            self._condition.notify_all()
+
+
+class BoundedThumbnailDict(OrderedDict):
+    """
+    Thumbnails by file path, keeping only the max_items most recently used.
+
+    Reads count as a use, so the thumbnails a view keeps painting are
+    evicted last. Membership tests do not.
+    """
+
+    def __init__(self, max_items=2000):
+        super().__init__()
+        self.max_items = max_items
+
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        self.move_to_end(key)
+        return value
+
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+        return default
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        while len(self) > self.max_items:
+            self.popitem(last=False)
+
+
+def _exif_thumbnail_bytes(exif):
+    """Extract the JPEG thumbnail stored in IFD1 of raw EXIF data."""
+    if not exif or not exif.startswith(b'Exif\x00\x00'):
+        return None
+    tiff = exif[6:]
+    if tiff[:2] == b'II':
+        endian = '<'
+    elif tiff[:2] == b'MM':
+        endian = '>'
+    else:
+        return None
+
+    try:
+        ifd0 = struct.unpack_from(endian + 'I', tiff, 4)[0]
+        entries = struct.unpack_from(endian + 'H', tiff, ifd0)[0]
+        ifd1 = struct.unpack_from(endian + 'I', tiff, ifd0 + 2 + 12 * entries)[0]
+        if not ifd1:
+            return None
+
+        offset = length = None
+        entries = struct.unpack_from(endian + 'H', tiff, ifd1)[0]
+        for i in range(entries):
+            tag, _, _, value = struct.unpack_from(
+                endian + 'HHII', tiff, ifd1 + 2 + 12 * i)
+            if tag == 0x0201:  # JPEGInterchangeFormat
+                offset = value
+            elif tag == 0x0202:  # JPEGInterchangeFormatLength
+                length = value
+    except struct.error:
+        return None
+
+    if not offset or not length or offset + length > len(tiff):
+        return None
+    return tiff[offset:offset + length]
+
+
+def read_exif_thumbnail(img, thumbnail_size):
+    """
+    Get a thumbnail from the preview embedded in a JPEG's EXIF data.
+
+    The preview is only used if it is large enough for thumbnail_size and
+    has the aspect ratio of the full image (some cameras letterbox it).
+
+    Returns:
+        RGB PIL image scaled to thumbnail_size, or None
+    """
+    data = _exif_thumbnail_bytes(img.info.get('exif'))
+    if not data:
+        return None
+
+    try:
+        with Image.open(io.BytesIO(data)) as preview:
+            width, height = preview.size
+            full_width, full_height = img.size
+            if min(thumbnail_size[0] / width, thumbnail_size[1] / height) > 1:
+                return None
+            if abs(width / height - full_width / full_height) > 0.02:
+                return None
+
+            preview = preview.convert('RGB')
+            preview.thumbnail(thumbnail_size, Image.Resampling.LANCZOS)
+            return preview
+    except Exception:
+        return None
+
+
+def encode_thumbnail(img):
+    """
+    Encode a thumbnail image for the cache.
+
+    Returns:
+        JPEG bytes, or None if the image could not be encoded
+    """
+    try:
+        if img.mode not in ('RGB', 'L'):
+            img = img.convert('RGB')
+        buffer = io.BytesIO()
+        img.save(buffer, format='JPEG', quality=85)
+        return buffer.getvalue()
+    except Exception as e:
+        print(f"Error encoding thumbnail: {e}")
+        return None
@@ -0,0 +1,129 @@
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+TILING_MODES = ('off', 'always', 'fallback')
+MERGE_METHODS = ('nms', 'wbf')
+
+
+def tile_grid(width: int, height: int, tile_size: int = 640,
+              overlap: float = 0.2) -> List[Tuple[int, int, int, int]]:
+    """
+    Cut an image into overlapping square tiles.
+
+    Tiles step by tile_size * (1 - overlap). The last tile of each row and
+    column is moved back to end on the image border, so every tile has the
+    full size and no strip is left out.
+
+    Args:
+        width (int): Image width
+        height (int): Image height
+        tile_size (int): Tile width and height in image pixels
+        overlap (float): Fraction of a tile shared with its neighbours, 0 to 0.9
+
+    Returns:
+        List of (x, y, width, height) tiles, empty if the image fits in one tile
+    """
+    if width <= tile_size and height <= tile_size:
+        return []
+
+    step = max(1, int(tile_size * (1 - min(max(overlap, 0.0), 0.9))))
+
+    def starts(length):
+        if length <= tile_size:
+            return [0]
+        positions = list(range(0, length - tile_size, step))
+        positions.append(length - tile_size)
+        return positions
+
+    return [(x, y, min(tile_size, width), min(tile_size, height))
+            for y in starts(height) for x in starts(width)]
+
+
+def offset_detections(detections: List[Dict[str, Any]],
+                      x: int, y: int) -> List[Dict[str, Any]]:
+    """Move detections found in a tile into the coordinates of the full image."""
+    for detection in detections:
+        detection['bbox']['x_center'] += x
+        detection['bbox']['y_center'] += y
+    return detections
+
+
+def _corners(detections: List[Dict[str, Any]]) -> np.ndarray:
+    boxes = np.empty((len(detections), 4))
+    for i, detection in enumerate(detections):
+        bbox = detection['bbox']
+        boxes[i] = (bbox['x_center'] - bbox['width'] / 2,
+                    bbox['y_center'] - bbox['height'] / 2,
+                    bbox['x_center'] + bbox['width'] / 2,
+                    bbox['y_center'] + bbox['height'] / 2)
+    return boxes
+
+
+def _overlap_with(boxes: np.ndarray, box: np.ndarray) -> np.ndarray:
+    """Intersection over the smaller box of one box against many."""
+    width = np.clip(np.minimum(boxes[:, 2], box[2]) - np.maximum(boxes[:, 0], box[0]), 0, None)
+    height = np.clip(np.minimum(boxes[:, 3], box[3]) - np.maximum(boxes[:, 1], box[1]), 0, None)
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    area = (box[2] - box[0]) * (box[3] - box[1])
+    return width * height / np.maximum(np.minimum(areas, area), 1e-9)
+
+
+def merge_detections(detections: List[Dict[str, Any]], method: str = 'nms',
+                     match_threshold: float = 0.5) -> List[Dict[str, Any]]:
+    """
+    Merge the duplicate detections that overlapping tiles (and the
+    full-frame pass) produce for the same object.
+
+    Boxes of the same class are matched by intersection over the smaller
+    box rather than IoU, so an animal cut off at a tile border still matches
+    its complete box from the neighbouring tile.
+
+    Args:
+        detections (list): Detection dicts in full image coordinates
+        method (str): 'nms' keeps the most confident box of each group,
+            'wbf' replaces the group by its confidence-weighted average box
+        match_threshold (float): Overlap above which two boxes are the same object
+
+    Returns:
+        Merged detections, most confident first
+    """
+    if len(detections) < 2:
+        return list(detections)
+
+    order = sorted(range(len(detections)),
+                   key=lambda i: detections[i]['confidence'], reverse=True)
+    detections = [detections[i] for i in order]
+    boxes = _corners(detections)
+    confidences = np.array([detection['confidence'] for detection in detections])
+    classes = np.array([detection['class'] for detection in detections])
+    unassigned = np.ones(len(detections), dtype=bool)
+
+    merged = []
+    for i in range(len(detections)):
+        if not unassigned[i]:
+            continue
+        group = unassigned & (classes == classes[i])
+        group &= _overlap_with(boxes, boxes[i]) >= match_threshold
+        group[i] = True
+        unassigned &= ~group
+
+        if method != 'wbf' or group.sum() == 1:
+            merged.append(detections[i])
+            continue
+
+        weights = confidences[group]
+        x1, y1, x2, y2 = (boxes[group] * weights[:, None]).sum(axis=0) / weights.sum()
+        merged.append({
+            'class': detections[i]['class'],
+            # Keep the best score, so fusing never drops an object below
+            # the threshold it was found at
+            'confidence': detections[i]['confidence'],
+            'bbox': {
+                'x_center': float(x1 + x2) / 2,
+                'y_center': float(y1 + y2) / 2,
+                'width': float(x2 - x1),
+                'height': float(y2 - y1)
+            }
+        })
+    return merged
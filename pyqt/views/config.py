@@ -10,6 +10,7 @@ from PyQt5.QtWidgets import (
     QLineEdit,
     QComboBox,
     QDoubleSpinBox,
+    QSpinBox,
     QGroupBox,
     QGridLayout
 )
@@ -132,6 +133,81 @@ class ConfigView(QWidget):
         threshold_desc.setStyleSheet("color: gray; font-size: 10px;")
         layout.addWidget(threshold_desc, 1, 0, 1, 2)
 
+        # Inference batch size
+        batch_size_label = QLabel("Inference Batch Size:")
+        batch_size_label.setToolTip(
+            "Number of images or video frames sent to the model in a single pass")
+        layout.addWidget(batch_size_label, 2, 0)
+
+        self.batch_size_spin = QSpinBox()
+        self.batch_size_spin.setRange(1, 64)
+        self.batch_size_spin.setValue(8)
+        self.batch_size_spin.setToolTip(
+            "Higher values = better throughput\nLower values = less memory usage")
+        self.style_spinbox(self.batch_size_spin)
+        layout.addWidget(self.batch_size_spin, 2, 1)
+
+        # Execution mode selection with mapping
+        self.execution_mode_mapping = {
+            "Single process": "threaded",
+            "Multi-process (all CPU cores)": "multiprocess"
+        }
+        self.reverse_execution_mode_mapping = {
+            v: k for k, v in self.execution_mode_mapping.items()}
+
+        execution_mode_label = QLabel("Execution Mode:")
+        execution_mode_label.setToolTip(
+            "How images are distributed across the CPU during prediction")
+        layout.addWidget(execution_mode_label, 3, 0)
+
+        self.execution_mode_combo = QComboBox()
+        self.execution_mode_combo.addItems(
+            list(self.execution_mode_mapping.keys()))
+        self.execution_mode_combo.setToolTip(
+            "Multi-process runs one model per worker process\nRecommended on machines with many CPU cores")
+        self.style_dropdown(self.execution_mode_combo)
+        layout.addWidget(self.execution_mode_combo, 3, 1)
+
+        # Motion gating for videos
+        self.motion_gating_checkbox = QCheckBox(
+            "Skip static video frames (motion gating)")
+        self.motion_gating_checkbox.setToolTip(
+            "When enabled, only video frames with motion are sent to the model\nStatic frames reuse the last detections")
+        self.style_checkbox(self.motion_gating_checkbox)
+        layout.addWidget(self.motion_gating_checkbox, 4, 0, 1, 2)
+
+        # Result cache for duplicate and unchanged files
+        self.result_cache_checkbox = QCheckBox(
+            "Reuse results for duplicate and unchanged files")
+        self.result_cache_checkbox.setToolTip(
+            "When enabled, files are identified by a hash of their contents\nFiles already processed with the same model are not sent to the model again")
+        self.style_checkbox(self.result_cache_checkbox)
+        layout.addWidget(self.result_cache_checkbox, 5, 0, 1, 2)
+
+        # Raw low-confidence predictions for threshold tuning
+        self.raw_predictions_checkbox = QCheckBox(
+            "Keep low-confidence predictions for threshold tuning")
+        self.raw_predictions_checkbox.setToolTip(
+            "When enabled, the model runs at a low confidence floor and all predictions are saved next to the CSV\nReports and outputs can then be regenerated for any higher threshold without running the model")
+        self.style_checkbox(self.raw_predictions_checkbox)
+        layout.addWidget(self.raw_predictions_checkbox, 6, 0, 1, 2)
+
+        # Two-stage cascade for image folders
+        self.cascade_checkbox = QCheckBox(
+            "Skip empty images with a quick low-resolution pass")
+        self.cascade_checkbox.setToolTip(
+            "When enabled, images are first screened at low resolution\nOnly images where something may be present go through full detection")
+        self.style_checkbox(self.cascade_checkbox)
+        layout.addWidget(self.cascade_checkbox, 7, 0, 1, 2)
+
+        # Camera-trap bursts
+        self.sequence_checkbox = QCheckBox(
+            "Group image bursts and check one image per burst first")
+        self.sequence_checkbox.setToolTip(
+            "When enabled, images are grouped into bursts by folder and EXIF capture time\nThe rest of a burst is skipped when its middle image is clearly empty")
+        self.style_checkbox(self.sequence_checkbox)
+        layout.addWidget(self.sequence_checkbox, 8, 0, 1, 2)
+
         return group
 
     def create_output_settings_group(self):
@@ -189,6 +265,13 @@ class ConfigView(QWidget):
         self.style_checkbox(self.recursive_checkbox)
         layout.addWidget(self.recursive_checkbox, 2, 0, 1, 3)
 
+        # Resume interrupted runs
+        self.resume_checkbox = QCheckBox("Resume interrupted prediction runs")
+        self.resume_checkbox.setToolTip(
+            "When enabled, files completed by the last run on the same folder, model and threshold are skipped\nNew detections are appended to that run's reports")
+        self.style_checkbox(self.resume_checkbox)
+        layout.addWidget(self.resume_checkbox, 3, 0, 1, 3)
+
         return group
 
     def create_buttons(self):
@@ -221,6 +304,18 @@ class ConfigView(QWidget):
         self.theme_combo.currentTextChanged.connect(self.on_settings_changed)
         self.recursive_checkbox.stateChanged.connect(self.on_settings_changed)
         self.threshold_spin.valueChanged.connect(self.on_settings_changed)
+        self.batch_size_spin.valueChanged.connect(self.on_settings_changed)
+        self.execution_mode_combo.currentTextChanged.connect(
+            self.on_settings_changed)
+        self.motion_gating_checkbox.stateChanged.connect(
+            self.on_settings_changed)
+        self.resume_checkbox.stateChanged.connect(self.on_settings_changed)
+        self.result_cache_checkbox.stateChanged.connect(
+            self.on_settings_changed)
+        self.raw_predictions_checkbox.stateChanged.connect(
+            self.on_settings_changed)
+        self.cascade_checkbox.stateChanged.connect(self.on_settings_changed)
+        self.sequence_checkbox.stateChanged.connect(self.on_settings_changed)
 
     def get_current_theme(self):
         """Safely get the current theme"""
@@ -267,19 +362,45 @@ class ConfigView(QWidget):
         self.recursive_checkbox.setChecked(
             settings.get("recursive_folder_search", False))
         self.threshold_spin.setValue(settings.get("threshold", 0.7))
+        self.batch_size_spin.setValue(settings.get("batch_size", 8))
+        self.execution_mode_combo.setCurrentText(
+            self.reverse_execution_mode_mapping.get(
+                settings.get("execution_mode", "threaded"), "Single process"))
+        self.motion_gating_checkbox.setChecked(
+            settings.get("motion_gating", False))
+        self.resume_checkbox.setChecked(
+            settings.get("resume_predictions", False))
+        self.result_cache_checkbox.setChecked(
+            settings.get("use_result_cache", True))
+        self.raw_predictions_checkbox.setChecked(
+            settings.get("keep_raw_predictions", False))
+        self.cascade_checkbox.setChecked(
+            settings.get("cascade_filter", False))
+        self.sequence_checkbox.setChecked(
+            settings.get("sequence_grouping", False))
 
     def get_settings(self):
         """Get current settings from UI"""
         # Convert display name back to internal theme value
         display_name = self.theme_combo.currentText()
         theme_value = self.theme_mapping.get(display_name, "light")
+        execution_mode = self.execution_mode_mapping.get(
+            self.execution_mode_combo.currentText(), "threaded")
 
         return {
             "theme": theme_value,
             "media_output_path": self.media_output_edit.text(),
             "report_output_path": self.report_output_edit.text(),
             "recursive_folder_search": self.recursive_checkbox.isChecked(),
-            "threshold": self.threshold_spin.value()
+            "threshold": self.threshold_spin.value(),
+            "batch_size": self.batch_size_spin.value(),
+            "execution_mode": execution_mode,
+            "motion_gating": self.motion_gating_checkbox.isChecked(),
+            "resume_predictions": self.resume_checkbox.isChecked(),
+            "use_result_cache": self.result_cache_checkbox.isChecked(),
+            "keep_raw_predictions": self.raw_predictions_checkbox.isChecked(),
+            "cascade_filter": self.cascade_checkbox.isChecked(),
+            "sequence_grouping": self.sequence_checkbox.isChecked()
         }
 
     def save_settings(self):
@@ -294,7 +415,15 @@ class ConfigView(QWidget):
             "media_output_path": "pyqt/output",
             "report": "pyqt/reports",
             "recursive_folder_search": False,
-            "threshold": 0.7
+            "threshold": 0.7,
+            "batch_size": 8,
+            "execution_mode": "threaded",
+            "motion_gating": False,
+            "resume_predictions": False,
+            "use_result_cache": True,
+            "keep_raw_predictions": False,
+            "cascade_filter": False,
+            "sequence_grouping": False
         }
         self.load_settings(default_settings)
 
@@ -450,7 +579,7 @@ class ConfigView(QWidget):
             border_color = "#CCC"
 
         spinbox.setStyleSheet(f"""
-            QDoubleSpinBox {{
+            QDoubleSpinBox, QSpinBox {{
                 padding: 4px 8px;
                 font-size: 12px;
                 border: 1px solid {border_color};
@@ -461,10 +590,10 @@ class ConfigView(QWidget):
                 background-color: {bg_color};
                 color: {text_color};
             }}
-            QDoubleSpinBox:hover {{
+            QDoubleSpinBox:hover, QSpinBox:hover {{
                 border-color: #00ccff;
             }}
-            QDoubleSpinBox:focus {{
+            QDoubleSpinBox:focus, QSpinBox:focus {{
                 border-color: #00ccff;
                 outline: none;
             }}
@@ -517,10 +646,18 @@ class ConfigView(QWidget):
         """Refresh all component styling - useful when theme changes"""
         try:
             self.style_dropdown(self.theme_combo)
+            self.style_dropdown(self.execution_mode_combo)
             self.style_spinbox(self.threshold_spin)
+            self.style_spinbox(self.batch_size_spin)
             self.style_input_field(self.media_output_edit)
             self.style_input_field(self.report_output_edit)
             self.style_checkbox(self.recursive_checkbox)
+            self.style_checkbox(self.motion_gating_checkbox)
+            self.style_checkbox(self.resume_checkbox)
+            self.style_checkbox(self.result_cache_checkbox)
+            self.style_checkbox(self.raw_predictions_checkbox)
+            self.style_checkbox(self.cascade_checkbox)
+            self.style_checkbox(self.sequence_checkbox)
             self.style_button(self.media_browse_btn, "secondary")
             self.style_button(self.report_browse_btn, "secondary")
             self.style_button(self.reset_btn, "secondary")
@@ -1,14 +1,151 @@
+import bisect
 import glob
 import os
 from datetime import datetime
 
 import pandas as pd
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import (QAbstractTableModel, QModelIndex, Qt, QThread,
+                          pyqtSignal)
 from PyQt5.QtGui import QFont
-from PyQt5.QtWidgets import (QDialog, QFileDialog, QFrame, QGroupBox,
-                             QHBoxLayout, QLabel, QListWidget, QListWidgetItem,
-                             QMessageBox, QPushButton, QTableWidget,
-                             QTableWidgetItem, QVBoxLayout, QWidget)
+from PyQt5.QtWidgets import (QAbstractItemView, QDialog, QFileDialog, QFrame,
+                             QGroupBox, QHBoxLayout, QHeaderView, QLabel,
+                             QListWidget, QListWidgetItem, QMessageBox,
+                             QPushButton, QTableView, QVBoxLayout, QWidget)
+
+
+class CSVLoader(QThread):
+    """Background thread reading a CSV file in chunks"""
+
+    chunk_loaded = pyqtSignal(object)  # DataFrame with the next rows
+    progress_updated = pyqtSignal(int, int)  # bytes read, file size
+    loading_finished = pyqtSignal(int)  # total rows
+    loading_error = pyqtSignal(str)
+
+    def __init__(self, file_path, first_chunk_rows=1000, chunk_rows=50000):
+        super().__init__()
+        self.file_path = file_path
+        self.first_chunk_rows = first_chunk_rows
+        self.chunk_rows = chunk_rows
+        self.is_running = True
+
+    def run(self):
+        """Read the file, emitting a small first chunk so it can be shown at once"""
+        total_rows = 0
+        try:
+            file_size = os.path.getsize(self.file_path)
+            with open(self.file_path, 'rb') as csv_file:
+                with pd.read_csv(csv_file, chunksize=self.chunk_rows) as reader:
+                    chunk_rows = self.first_chunk_rows
+                    while self.is_running:
+                        try:
+                            chunk = reader.get_chunk(chunk_rows)
+                        except StopIteration:
+                            break
+                        chunk_rows = self.chunk_rows
+                        total_rows += len(chunk)
+                        self.chunk_loaded.emit(chunk)
+                        self.progress_updated.emit(csv_file.tell(), file_size)
+        except pd.errors.EmptyDataError:
+            pass
+        except Exception as e:
+            self.loading_error.emit(str(e))
+            return
+
+        if self.is_running:
+            self.loading_finished.emit(total_rows)
+
+    def stop(self):
+        """Stop loading after the current chunk"""
+        self.is_running = False
+
+
+class DataFrameTableModel(QAbstractTableModel):
+    """
+    Table model backed by pandas DataFrames.
+
+    Cell text is only produced when the view asks for it, so only the
+    visible rows are materialized no matter how large the report is. Rows
+    can be appended chunk by chunk while a file is still loading.
+    """
+
+    def __init__(self, df=None, parent=None):
+        super().__init__(parent)
+        self._chunks = []
+        self._offsets = []
+        self._columns = []
+        self._row_count = 0
+        if df is not None:
+            self.set_dataframe(df)
+
+    def dataframe(self):
+        """Get the DataFrame shown by the model (in display order)."""
+        if not self._chunks:
+            return pd.DataFrame(columns=self._columns)
+        if len(self._chunks) > 1:
+            self._chunks = [pd.concat(self._chunks, ignore_index=True)]
+            self._offsets = [0]
+        return self._chunks[0]
+
+    def set_dataframe(self, df):
+        """Replace the shown DataFrame."""
+        self.beginResetModel()
+        self._chunks = [df] if len(df) else []
+        self._offsets = [0] if len(df) else []
+        self._columns = list(df.columns)
+        self._row_count = len(df)
+        self.endResetModel()
+
+    def append_dataframe(self, df):
+        """Append rows at the end of the table."""
+        if not self._columns:
+            self.set_dataframe(df)
+            return
+        if not len(df):
+            return
+        self.beginInsertRows(QModelIndex(), self._row_count,
+                             self._row_count + len(df) - 1)
+        self._chunks.append(df)
+        self._offsets.append(self._row_count)
+        self._row_count += len(df)
+        self.endInsertRows()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._row_count
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._columns)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role in (Qt.DisplayRole, Qt.ToolTipRole):
+            row = index.row()
+            chunk_index = bisect.bisect_right(self._offsets, row) - 1
+            value = self._chunks[chunk_index].iat[
+                row - self._offsets[chunk_index], index.column()]
+            # Handle NaN values
+            if pd.isna(value):
+                return ""
+            return str(value)
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return str(self._columns[section])
+        return str(section + 1)
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        """Sort the rows by a column, as requested by the header."""
+        if not self._row_count:
+            return
+        self.layoutAboutToBeChanged.emit()
+        df = self.dataframe()
+        self._chunks = [df.sort_values(
+            df.columns[column], ascending=order == Qt.AscendingOrder,
+            kind='mergesort', na_position='last').reset_index(drop=True)]
+        self.layoutChanged.emit()
 
 
 class CSVDataModal(QDialog):
@@ -18,6 +155,7 @@ class CSVDataModal(QDialog):
         super().__init__(parent)
         self.file_path = file_path
         self.current_csv_data = None
+        self.csv_loader = None
         self.parent_widget = parent
         self.setup_ui()
         self.apply_theme_styling()
@@ -76,11 +214,17 @@ class CSVDataModal(QDialog):
             "color: #666; font-size: 14px;")
         layout.addWidget(self.status_label)
 
-        # Table widget for CSV data
-        self.data_table = QTableWidget()
+        # Table view for CSV data, backed by a DataFrame model
+        self.table_model = DataFrameTableModel(parent=self)
+        self.data_table = QTableView()
+        self.data_table.setModel(self.table_model)
         self.data_table.setAlternatingRowColors(True)
-        self.data_table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.data_table.setSelectionBehavior(QAbstractItemView.SelectRows)
         self.data_table.setSortingEnabled(True)
+        # Fixed row heights and sample-based column sizing keep the view
+        # independent of the number of rows
+        self.data_table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.data_table.horizontalHeader().setResizeContentsPrecision(200)
         self.data_table.setVisible(False)
         layout.addWidget(self.data_table)
 
@@ -169,7 +313,7 @@ class CSVDataModal(QDialog):
                 margin: 0px;
             }}
             
-            QTableWidget {{
+            QTableView {{
                 background-color: {table_bg};
                 alternate-background-color: {table_alt_bg};
                 color: {text_color};
@@ -177,13 +321,13 @@ class CSVDataModal(QDialog):
                 gridline-color: {border_color};
             }}
             
-            QTableWidget::item {{
+            QTableView::item {{
                 padding: 2px;
                 border: none;
                 margin: 0px;
             }}
             
-            QTableWidget::item:selected {{
+            QTableView::item:selected {{
                 background-color: #00ccff;
                 color: white;
             }}
@@ -231,62 +375,85 @@ class CSVDataModal(QDialog):
         """)
 
     def load_csv_data(self):
-        """Load CSV data into the table"""
-        try:
-            self.status_label.setText("Loading CSV data...")
-
-            # Read CSV data
-            df = pd.read_csv(self.file_path)
-            self.current_csv_data = df
-
-            # Set up table
-            self.data_table.setRowCount(df.shape[0])
-            self.data_table.setColumnCount(df.shape[1])
-            self.data_table.setHorizontalHeaderLabels(df.columns.tolist())
-
-            # Populate table
-            for row in range(df.shape[0]):
-                for col in range(df.shape[1]):
-                    value = df.iat[row, col]
-                    # Handle NaN values
-                    if pd.isna(value):
-                        value = ""
-                    item = QTableWidgetItem(str(value))
-                    self.data_table.setItem(row, col, item)
-
-            # Resize columns to content (but limit width)
+        """Start loading the CSV data into the table in the background"""
+        self.status_label.setText("Loading CSV data...")
+        # Sorting would mix sorted and appended rows, enable it once loaded
+        self.data_table.setSortingEnabled(False)
+
+        self.csv_loader = CSVLoader(self.file_path)
+        self.csv_loader.chunk_loaded.connect(self.on_chunk_loaded)
+        self.csv_loader.progress_updated.connect(self.on_load_progress)
+        self.csv_loader.loading_finished.connect(self.on_loading_finished)
+        self.csv_loader.loading_error.connect(self.on_loading_error)
+        self.csv_loader.start()
+
+    def on_chunk_loaded(self, chunk):
+        """Append a loaded chunk to the table, showing it after the first one"""
+        first_chunk = self.table_model.columnCount() == 0
+        self.table_model.append_dataframe(chunk)
+
+        if first_chunk:
+            # Resize columns to a sample of the content (but limit width)
             self.data_table.resizeColumnsToContents()
-            for col in range(df.shape[1]):
+            for col in range(self.table_model.columnCount()):
                 width = self.data_table.columnWidth(col)
                 if width > 200:  # Limit column width
                     self.data_table.setColumnWidth(col, 200)
-
-            # Show table and hide status label
             self.data_table.setVisible(True)
-            self.status_label.setVisible(False)
-            self.export_btn.setEnabled(True)
 
-            # Update header with CSV statistics
-            try:
-                file_size = os.path.getsize(self.file_path)
-                mod_time = datetime.fromtimestamp(
-                    os.path.getmtime(self.file_path))
-                size_mb = file_size / (1024 * 1024)
+        self.update_data_info()
 
-                # Add CSV stats to the header info
-                self.info_label.setText(
-                    f"Path: {self.file_path}\n"
-                    f"Size: {size_mb:.2f} MB | Modified: {mod_time.strftime('%Y-%m-%d %H:%M:%S')} | "
-                    f"Data: {df.shape[0]} rows × {df.shape[1]} columns"
-                )
-            except Exception:
-                self.info_label.setText(
-                    f"Data: {df.shape[0]} rows × {df.shape[1]} columns")
+    def on_load_progress(self, bytes_read, file_size):
+        """Show how much of the file has been read"""
+        percent = int(bytes_read * 100 / file_size) if file_size else 100
+        self.status_label.setText(
+            f"Loading CSV data... {percent}% ({self.table_model.rowCount()} rows)")
 
-        except Exception as e:
-            self.status_label.setText(f"❌ Error loading file: {str(e)}")
-            QMessageBox.critical(self, "Error Loading CSV",
-                                 f"Failed to load CSV file:\n{str(e)}")
+    def on_loading_finished(self, total_rows):
+        """Enable sorting and export once the whole file is loaded"""
+        self.current_csv_data = self.table_model.dataframe()
+        self.data_table.setVisible(True)
+        self.data_table.setSortingEnabled(True)
+        self.status_label.setVisible(False)
+        self.export_btn.setEnabled(True)
+        self.update_data_info()
+
+    def on_loading_error(self, message):
+        """Show a loading error"""
+        self.status_label.setText(f"❌ Error loading file: {message}")
+        QMessageBox.critical(self, "Error Loading CSV",
+                             f"Failed to load CSV file:\n{message}")
+
+    def update_data_info(self):
+        """Update header with CSV statistics"""
+        rows = self.table_model.rowCount()
+        columns = self.table_model.columnCount()
+        try:
+            file_size = os.path.getsize(self.file_path)
+            mod_time = datetime.fromtimestamp(
+                os.path.getmtime(self.file_path))
+            size_mb = file_size / (1024 * 1024)
+
+            # Add CSV stats to the header info
+            self.info_label.setText(
+                f"Path: {self.file_path}\n"
+                f"Size: {size_mb:.2f} MB | Modified: {mod_time.strftime('%Y-%m-%d %H:%M:%S')} | "
+                f"Data: {rows} rows × {columns} columns"
+            )
+        except Exception:
+            self.info_label.setText(
+                f"Data: {rows} rows × {columns} columns")
+
+    def stop_loading(self):
+        """Cancel a running load"""
+        if self.csv_loader and self.csv_loader.isRunning():
+            self.csv_loader.stop()
+            self.csv_loader.wait()
+
+    def done(self, result):
+        """Cancel loading when the dialog is closed"""
+        self.stop_loading()
+        super().done(result)
 
     def export_data(self):
         """Export the current data to a new CSV file"""
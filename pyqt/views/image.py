@@ -1,125 +1,16 @@
-import glob
 import os
 from pathlib import Path
 
-import cv2
-from PIL import Image, ImageQt
-from PyQt5.QtCore import QSize, Qt, QThread, pyqtSignal
-from PyQt5.QtGui import QFont, QPixmap
-from PyQt5.QtWidgets import (QComboBox, QDialog, QFileDialog, QFrame,
-                             QGridLayout, QGroupBox, QHBoxLayout, QLabel,
-                             QProgressBar, QPushButton, QScrollArea,
-                             QVBoxLayout, QWidget)
+from PyQt5.QtCore import (QAbstractListModel, QEvent, QModelIndex, QRect,
+                          QSize, Qt, QTimer)
+from PyQt5.QtGui import QColor, QFont, QPainter, QPen, QPixmap
+from PyQt5.QtWidgets import (QComboBox, QDialog, QFileDialog, QGroupBox,
+                             QHBoxLayout, QLabel, QListView, QProgressBar,
+                             QPushButton, QScrollArea, QStyle,
+                             QStyledItemDelegate, QVBoxLayout, QWidget)
 
-
-class ThumbnailGenerator(QThread):
-    """Background thread for generating thumbnails"""
-
-    thumbnail_ready = pyqtSignal(str, QPixmap)  # file_path, thumbnail
-    progress_updated = pyqtSignal(int, int)  # current, total
-
-    def __init__(self, file_paths, thumbnail_size=(150, 150)):
-        super().__init__()
-        self.file_paths = file_paths
-        self.thumbnail_size = thumbnail_size
-        self.is_running = True
-
-    def run(self):
-        """Generate thumbnails for all files"""
-        total_files = len(self.file_paths)
-
-        for i, file_path in enumerate(self.file_paths):
-            if not self.is_running:
-                break
-
-            thumbnail = self.generate_thumbnail(file_path)
-            if thumbnail:
-                self.thumbnail_ready.emit(file_path, thumbnail)
-
-            self.progress_updated.emit(i + 1, total_files)
-
-    def generate_thumbnail(self, file_path):
-        """Generate thumbnail for a single file"""
-        try:
-            file_ext = Path(file_path).suffix.lower()
-
-            # Image files
-            if file_ext in ['.jpg', '.jpeg', '.png', '.bmp', '.gif', '.tiff', '.webp']:
-                return self.generate_image_thumbnail(file_path)
-
-            # Video files
-            elif file_ext in ['.mp4', '.avi', '.mov', '.mkv', '.wmv', '.flv', '.webm']:
-                return self.generate_video_thumbnail(file_path)
-
-            return None
-
-        except Exception as e:
-            print(f"Error generating thumbnail for {file_path}: {e}")
-            return None
-
-    def generate_image_thumbnail(self, image_path):
-        """Generate thumbnail for image file"""
-        try:
-            with Image.open(image_path) as img:
-                # Convert RGBA to RGB if necessary
-                if img.mode in ('RGBA', 'LA', 'P'):
-                    rgb_img = Image.new('RGB', img.size, (255, 255, 255))
-                    if img.mode == 'P':
-                        img = img.convert('RGBA')
-                    rgb_img.paste(img, mask=img.split()
-                                  [-1] if img.mode in ('RGBA', 'LA') else None)
-                    img = rgb_img
-
-                # Create thumbnail
-                img.thumbnail(self.thumbnail_size, Image.Resampling.LANCZOS)
-
-                # Convert to QPixmap
-                qt_img = ImageQt.ImageQt(img)
-                pixmap = QPixmap.fromImage(qt_img)
-
-                return pixmap
-
-        except Exception as e:
-            print(f"Error creating image thumbnail: {e}")
-            return None
-
-    def generate_video_thumbnail(self, video_path):
-        """Generate thumbnail for video file"""
-        try:
-            cap = cv2.VideoCapture(video_path)
-
-            if not cap.isOpened():
-                return None
-
-            # Read first frame
-            ret, frame = cap.read()
-            cap.release()
-
-            if not ret:
-                return None
-
-            # Convert BGR to RGB
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-
-            # Convert to PIL Image
-            pil_img = Image.fromarray(frame_rgb)
-
-            # Create thumbnail
-            pil_img.thumbnail(self.thumbnail_size, Image.Resampling.LANCZOS)
-
-            # Convert to QPixmap
-            qt_img = ImageQt.ImageQt(pil_img)
-            pixmap = QPixmap.fromImage(qt_img)
-
-            return pixmap
-
-        except Exception as e:
-            print(f"Error creating video thumbnail: {e}")
-            return None
-
-    def stop(self):
-        """Stop thumbnail generation"""
-        self.is_running = False
+from utils.media_index import scan_media_files
+from utils.thumbnails import BoundedThumbnailDict, ThumbnailGenerator
 
 
 class ImageViewerDialog(QDialog):
@@ -439,6 +330,140 @@ class ImageViewerDialog(QDialog):
         super().keyPressEvent(event)
 
 
+class GalleryModel(QAbstractListModel):
+    """List model of the gallery files and their loaded thumbnails"""
+
+    FilePathRole = Qt.UserRole
+    FailedRole = Qt.UserRole + 1
+
+    def __init__(self, thumbnails, parent=None):
+        super().__init__(parent)
+        self.files = []
+        self.thumbnails = thumbnails
+        self.failed_thumbnails = set()  # Files whose thumbnail could not be made
+        self._rows = {}
+
+    def set_files(self, files):
+        """Replace the files shown in the gallery"""
+        self.beginResetModel()
+        self.files = list(files)
+        self._rows = {path: row for row, path in enumerate(self.files)}
+        self.endResetModel()
+
+    def set_thumbnail(self, file_path, thumbnail):
+        """Store a loaded thumbnail and repaint its cell"""
+        self.thumbnails[file_path] = thumbnail
+        self._repaint(file_path)
+
+    def set_failed(self, file_path):
+        """Mark a file whose thumbnail failed, so it is not requested again"""
+        self.failed_thumbnails.add(file_path)
+        self._repaint(file_path)
+
+    def _repaint(self, file_path):
+        row = self._rows.get(file_path)
+        if row is not None:
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [Qt.DecorationRole])
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.files)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        file_path = self.files[index.row()]
+        if role == Qt.DisplayRole:
+            return os.path.basename(file_path)
+        if role == Qt.DecorationRole:
+            return self.thumbnails.get(file_path)
+        if role == Qt.ToolTipRole:
+            return f"Click to view: {file_path}"
+        if role == self.FilePathRole:
+            return file_path
+        if role == self.FailedRole:
+            return file_path in self.failed_thumbnails
+        return None
+
+
+class GalleryItemDelegate(QStyledItemDelegate):
+    """Paints a gallery cell: thumbnail (or placeholder) and file name"""
+
+    ITEM_SIZE = QSize(200, 220)
+    THUMBNAIL_SIZE = QSize(180, 160)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.colors = {
+            'border': "#DEE2E6",
+            'background': "#FFFFFF",
+            'hover_border': "#00ccff",
+            'hover_background': "#F8F9FA",
+            'placeholder': "#f9f9f9",
+            'text': "#333333"
+        }
+
+    def set_colors(self, **colors):
+        """Update the colors used to paint the cells"""
+        self.colors.update(colors)
+
+    def sizeHint(self, option, index):
+        return self.ITEM_SIZE
+
+    def paint(self, painter, option, index):
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+
+        # Cell frame
+        hovered = bool(option.state & QStyle.State_MouseOver)
+        rect = option.rect.adjusted(2, 2, -2, -2)
+        painter.setPen(QPen(QColor(
+            self.colors['hover_border' if hovered else 'border']), 1))
+        painter.setBrush(QColor(
+            self.colors['hover_background' if hovered else 'background']))
+        painter.drawRoundedRect(rect, 6, 6)
+
+        # Thumbnail area
+        thumb_rect = QRect(
+            rect.left() + (rect.width() - self.THUMBNAIL_SIZE.width()) // 2,
+            rect.top() + 5, self.THUMBNAIL_SIZE.width(), self.THUMBNAIL_SIZE.height())
+        file_path = index.data(GalleryModel.FilePathRole)
+        thumbnail = index.data(Qt.DecorationRole)
+        if thumbnail is not None:
+            x = thumb_rect.left() + (thumb_rect.width() - thumbnail.width()) // 2
+            y = thumb_rect.top() + (thumb_rect.height() - thumbnail.height()) // 2
+            painter.drawPixmap(x, y, thumbnail)
+        else:
+            painter.setPen(QPen(QColor(self.colors['border']), 1))
+            painter.setBrush(QColor(self.colors['placeholder']))
+            painter.drawRoundedRect(thumb_rect, 4, 4)
+            painter.setPen(QColor(self.colors['text']))
+            failed = index.data(GalleryModel.FailedRole)
+            if Path(file_path).suffix.lower() in ['.jpg', '.jpeg', '.png', '.bmp', '.gif', '.tiff', '.webp']:
+                icon = "🖼️"
+            else:
+                icon = "🎥"
+            if failed:
+                placeholder = f"{icon}\nNo\nPreview"
+            else:
+                placeholder = f"{icon}\nLoading\nPreview..."
+            painter.drawText(thumb_rect, Qt.AlignCenter, placeholder)
+
+        # File name label
+        name_font = QFont(option.font)
+        name_font.setPointSize(9)
+        name_font.setBold(True)
+        painter.setFont(name_font)
+        painter.setPen(QColor(self.colors['text']))
+        name_rect = QRect(rect.left() + 5, thumb_rect.bottom() + 5,
+                          rect.width() - 10, rect.bottom() - thumb_rect.bottom() - 10)
+        display_name = painter.fontMetrics().elidedText(
+            index.data(Qt.DisplayRole), Qt.ElideMiddle, name_rect.width())
+        painter.drawText(name_rect, Qt.AlignCenter, display_name)
+
+        painter.restore()
+
+
 class ImageView(QWidget):
     """Modern image gallery view with thumbnails and expansion"""
 
@@ -449,9 +474,16 @@ class ImageView(QWidget):
         self.current_folder = ""
         self.all_files = []
         self.filtered_files = []
-        self.thumbnails = {}
+        self.thumbnails = BoundedThumbnailDict()
         self.thumbnail_generator = None
 
+        # Report the visible files to the thumbnail generator once scrolling
+        # or resizing settles, only those are generated
+        self.visible_files_timer = QTimer(self)
+        self.visible_files_timer.setSingleShot(True)
+        self.visible_files_timer.setInterval(100)
+        self.visible_files_timer.timeout.connect(self.update_visible_thumbnails)
+
         self.setup_ui()
         self.apply_styling()
 
@@ -567,20 +599,32 @@ class ImageView(QWidget):
         """)
         gallery_layout.addWidget(self.gallery_info)
 
-        # Thumbnail grid
-        self.gallery_scroll = QScrollArea()
-        self.gallery_scroll.setWidgetResizable(True)
-        self.gallery_scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarAsNeeded)
-        self.gallery_scroll.setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
-
-        self.gallery_widget = QWidget()
-        self.gallery_layout = QGridLayout(self.gallery_widget)
-        self.gallery_layout.setSpacing(8)
-        self.gallery_layout.setContentsMargins(5, 5, 5, 5)
-
-        self.gallery_scroll.setWidget(self.gallery_widget)
-        self.gallery_scroll.setVisible(False)
-        gallery_layout.addWidget(self.gallery_scroll)
+        # Thumbnail grid, only the visible cells are painted
+        self.gallery_model = GalleryModel(self.thumbnails, self)
+        self.gallery_delegate = GalleryItemDelegate(self)
+
+        self.gallery_view = QListView()
+        self.gallery_view.setViewMode(QListView.IconMode)
+        self.gallery_view.setResizeMode(QListView.Adjust)
+        self.gallery_view.setMovement(QListView.Static)
+        self.gallery_view.setUniformItemSizes(True)
+        self.gallery_view.setLayoutMode(QListView.Batched)
+        self.gallery_view.setBatchSize(500)
+        self.gallery_view.setSpacing(4)
+        self.gallery_view.setSelectionMode(QListView.NoSelection)
+        self.gallery_view.setMouseTracking(True)
+        self.gallery_view.viewport().setCursor(Qt.PointingHandCursor)
+        self.gallery_view.setModel(self.gallery_model)
+        self.gallery_view.setItemDelegate(self.gallery_delegate)
+        self.gallery_view.clicked.connect(
+            lambda index: self.open_image_viewer(
+                index.data(GalleryModel.FilePathRole)))
+        # start() without arguments, the scroll position is not an interval
+        self.gallery_view.verticalScrollBar().valueChanged.connect(
+            lambda: self.visible_files_timer.start())
+        self.gallery_view.viewport().installEventFilter(self)
+        self.gallery_view.setVisible(False)
+        gallery_layout.addWidget(self.gallery_view)
 
         self.main_layout.addWidget(gallery_group)
 
@@ -625,15 +669,7 @@ class ImageView(QWidget):
             self.current_folder = folder_path
             self.folder_label.setText(f"📁 {folder_path}")
 
-            # Get supported file types
-            image_extensions = ['.jpg', '.jpeg', '.png',
-                                '.bmp', '.gif', '.tiff', '.webp']
-            video_extensions = ['.mp4', '.avi', '.mov',
-                                '.mkv', '.wmv', '.flv', '.webm']
-            all_extensions = image_extensions + video_extensions
-
             # Find all supported files (with optional recursion)
-            self.all_files = []
             recursive_search = False
             try:
                 # Try to get recursive search setting from view instance
@@ -643,31 +679,15 @@ class ImageView(QWidget):
             except (AttributeError, TypeError):
                 pass
 
-            for ext in all_extensions:
-                # Use case-insensitive pattern with optional recursion
-                if recursive_search:
-                    pattern = os.path.join(folder_path, "**", f"*{ext}")
-                    pattern_upper = os.path.join(
-                        folder_path, "**", f"*{ext.upper()}")
-                else:
-                    pattern = os.path.join(folder_path, f"*{ext}")
-                    pattern_upper = os.path.join(
-                        folder_path, f"*{ext.upper()}")
-
-                files_found = glob.glob(pattern, recursive=recursive_search)
-                files_found.extend(
-                    glob.glob(pattern_upper, recursive=recursive_search))
-                self.all_files.extend(files_found)
-
-            # Remove duplicates (in case of case-insensitive filesystem)
-            self.all_files = list(set(self.all_files))
-
-            # Sort files
-            self.all_files.sort()
+            # One directory walk, sorted by path
+            self.all_files = [media_file.path for media_file in
+                              scan_media_files(folder_path, recursive=recursive_search)]
+            # Give files that failed before another try
+            self.gallery_model.failed_thumbnails.clear()
 
             if self.all_files:
                 # Show gallery and hide info label
-                self.gallery_scroll.setVisible(True)
+                self.gallery_view.setVisible(True)
                 self.gallery_info.setVisible(False)
 
                 # Apply current filter
@@ -677,7 +697,7 @@ class ImageView(QWidget):
                 self.start_thumbnail_generation()
             else:
                 # Hide gallery and show info
-                self.gallery_scroll.setVisible(False)
+                self.gallery_view.setVisible(False)
                 self.gallery_info.setVisible(True)
                 self.gallery_info.setText(
                     f"📂 No supported media files found in:\n{folder_path}\n\nSupported formats: JPG, PNG, MP4, AVI, MOV, etc.")
@@ -716,136 +736,73 @@ class ImageView(QWidget):
 
     def populate_gallery(self, files):
         """Populate the gallery with file thumbnails"""
-        # Clear existing thumbnails
-        self.clear_gallery()
-
-        if not files:
-            return
-
-        # Calculate grid dimensions
-        columns = 4  # Number of thumbnails per row
-
-        for i, file_path in enumerate(files):
-            row = i // columns
-            col = i % columns
-
-            # Create thumbnail item
-            item_widget = self.create_thumbnail_item(file_path)
-            self.gallery_layout.addWidget(item_widget, row, col)
-
-    def create_thumbnail_item(self, file_path):
-        """Create a thumbnail item widget"""
-        item_frame = QFrame()
-        item_frame.setFrameStyle(QFrame.Box)
-        item_frame.setFixedSize(200, 220)
-        item_layout = QVBoxLayout(item_frame)
-        item_layout.setContentsMargins(5, 5, 5, 5)
-
-        # Thumbnail label
-        thumb_label = QLabel()
-        thumb_label.setFixedSize(180, 160)
-        thumb_label.setAlignment(Qt.AlignCenter)
-        thumb_label.setStyleSheet("""
-            QLabel {
-                border: 1px solid #ddd;
-                background-color: #f9f9f9;
-                border-radius: 4px;
-                padding: 2px;
-            }
-        """)
-
-        # Set default icon based on file type
-        file_ext = Path(file_path).suffix.lower()
-        if file_ext in ['.jpg', '.jpeg', '.png', '.bmp', '.gif', '.tiff', '.webp']:
-            thumb_label.setText("🖼️\nLoading\nPreview...")
-        else:
-            thumb_label.setText("🎥\nLoading\nPreview...")
-
-        # Make clickable
-        thumb_label.mousePressEvent = lambda event, path=file_path: self.open_image_viewer(
-            path)
-        thumb_label.setCursor(Qt.PointingHandCursor)
-
-        item_layout.addWidget(thumb_label)
-
-        # File name label
-        file_name = os.path.basename(file_path)
-        if len(file_name) > 18:
-            display_name = file_name[:15] + "..."
-        else:
-            display_name = file_name
-
-        name_label = QLabel(display_name)
-        name_label.setAlignment(Qt.AlignCenter)
-        name_label.setToolTip(f"Click to view: {file_path}")
-        name_label.setWordWrap(True)
-        name_label.setMaximumHeight(40)
-        name_label.setStyleSheet(
-            "font-size: 11px; color: #333; font-weight: bold;")
-        item_layout.addWidget(name_label)
-
-        # Store reference for thumbnail updates
-        thumb_label.setProperty("file_path", file_path)
-
-        return item_frame
-
-    def clear_gallery(self):
-        """Clear all thumbnail items from gallery"""
-        while self.gallery_layout.count():
-            child = self.gallery_layout.takeAt(0)
-            if child.widget():
-                child.widget().deleteLater()
+        # The view only paints the visible cells, so this is independent of
+        # the number of files
+        self.gallery_model.set_files(files)
+        self.gallery_view.scrollToTop()
+        self.visible_files_timer.start()
+
+    def eventFilter(self, watched, event):
+        # A resized gallery shows other cells
+        if event.type() == QEvent.Resize and watched is self.gallery_view.viewport():
+            self.visible_files_timer.start()
+        return super().eventFilter(watched, event)
 
     def start_thumbnail_generation(self):
-        """Start generating thumbnails in background"""
+        """
+        Start the background thumbnail generator of the folder. It only
+        generates the thumbnails the gallery shows, see
+        update_visible_thumbnails().
+        """
         if self.thumbnail_generator and self.thumbnail_generator.isRunning():
             self.thumbnail_generator.stop()
             self.thumbnail_generator.wait()
 
-        # Show progress bar
-        self.progress_bar.setVisible(True)
-        self.progress_bar.setValue(0)
-        self.progress_bar.setFormat("Generating thumbnails... %p%")
-
-        # Start thumbnail generation for current files
-        if hasattr(self, 'filtered_files') and self.filtered_files:
-            self.thumbnail_generator = ThumbnailGenerator(self.filtered_files)
-            self.thumbnail_generator.thumbnail_ready.connect(
-                self.on_thumbnail_ready)
-            self.thumbnail_generator.progress_updated.connect(
-                self.on_progress_updated)
-            self.thumbnail_generator.finished.connect(
-                self.on_thumbnail_generation_finished)
-            self.thumbnail_generator.start()
-
-    def on_thumbnail_ready(self, file_path, thumbnail):
-        """Handle thumbnail ready signal"""
-        self.thumbnails[file_path] = thumbnail
+        self.thumbnail_generator = ThumbnailGenerator([], wait_for_requests=True)
+        self.thumbnail_generator.thumbnail_ready.connect(
+            self.on_thumbnail_ready)
+        self.thumbnail_generator.thumbnail_failed.connect(
+            self.gallery_model.set_failed)
+        self.thumbnail_generator.start()
+        self.visible_files_timer.start()
+
+    def get_visible_files(self):
+        """Get the files of the cells shown in the gallery viewport, plus one screen below"""
+        row_count = self.gallery_model.rowCount()
+        viewport_height = self.gallery_view.viewport().height()
+
+        # Cells flow row by row, so their rectangles are ordered by position
+        def first_row_below(y):
+            low, high = 0, row_count
+            while low < high:
+                middle = (low + high) // 2
+                rect = self.gallery_view.visualRect(self.gallery_model.index(middle))
+                if rect.bottom() < y:
+                    low = middle + 1
+                else:
+                    high = middle
+            return low
 
-        # Find and update the corresponding thumbnail label
-        for i in range(self.gallery_layout.count()):
-            item = self.gallery_layout.itemAt(i)
-            if item and item.widget():
-                frame = item.widget()
-                # Look for the thumbnail label specifically (first QLabel child)
-                for child in frame.findChildren(QLabel):
-                    if child.property("file_path") == file_path:
-                        # Scale thumbnail to fit the label size
-                        label_size = child.size()
-                        if label_size.width() > 0 and label_size.height() > 0:
-                            scaled_thumbnail = thumbnail.scaled(
-                                label_size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                            child.setPixmap(scaled_thumbnail)
-                        break
-
-    def on_progress_updated(self, current, total):
-        """Handle progress update"""
-        self.progress_bar.setMaximum(total)
-        self.progress_bar.setValue(current)
-
-    def on_thumbnail_generation_finished(self):
-        """Handle thumbnail generation completion"""
-        self.progress_bar.setVisible(False)
+        first = first_row_below(0)
+        last = first_row_below(2 * viewport_height)
+        return self.gallery_model.files[first:min(last + 1, row_count)]
+
+    def update_visible_thumbnails(self):
+        """Ask the thumbnail generator for the visible files that have no thumbnail"""
+        if not self.thumbnail_generator or not self.thumbnail_generator.isRunning():
+            return
+        self.thumbnail_generator.set_visible_files(
+            [path for path in self.get_visible_files()
+             if path not in self.thumbnails
+             and path not in self.gallery_model.failed_thumbnails])
+
+    def on_thumbnail_ready(self, file_path, image):
+        """Handle thumbnail ready signal"""
+        # Scale thumbnail to fit the gallery cell once, not on every paint
+        thumbnail = QPixmap.fromImage(image).scaled(
+            GalleryItemDelegate.THUMBNAIL_SIZE, Qt.KeepAspectRatio,
+            Qt.SmoothTransformation)
+        self.gallery_model.set_thumbnail(file_path, thumbnail)
 
     def open_image_viewer(self, file_path):
         """Open the full-screen image viewer"""
@@ -994,7 +951,7 @@ class ImageView(QWidget):
                 background-color: {secondary_bg};
             }}
             
-            QScrollArea {{
+            QListView, QListView:hover {{
                 border: 1px solid {border_color};
                 border-radius: 6px;
                 background-color: {bg_color};
@@ -1014,6 +971,16 @@ class ImageView(QWidget):
             }}
         """)
 
+        # Gallery cells are painted by the delegate, not styled by the sheet
+        self.gallery_delegate.set_colors(
+            border=border_color,
+            background=button_bg,
+            hover_border=button_hover,
+            hover_background=secondary_bg,
+            placeholder=secondary_bg,
+            text=text_color)
+        self.gallery_view.viewport().update()
+
     def closeEvent(self, event):
         """Handle close event"""
         if self.thumbnail_generator and self.thumbnail_generator.isRunning():
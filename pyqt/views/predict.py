@@ -38,6 +38,40 @@ class PredictionWorker(QThread):
             self.prediction_error.emit(str(e))
 
 
+class RegenerationWorker(QThread):
+    """Worker thread that regenerates outputs from stored detections"""
+    progress_updated = pyqtSignal(float, str)
+    regeneration_finished = pyqtSignal(dict)
+    regeneration_error = pyqtSignal(str)
+
+    def __init__(self, store_path, regenerate):
+        """
+        Args:
+            store_path (str): Detections CSV or raw prediction sidecar
+            regenerate (callable): Presenter method taking the path and a
+                progress_callback
+        """
+        super().__init__()
+        self.store_path = store_path
+        self.regenerate = regenerate
+
+    def run(self):
+        """Regenerate the outputs in background thread"""
+        try:
+            def progress_callback(progress, message):
+                self.progress_updated.emit(progress, message)
+
+            results = self.regenerate(
+                self.store_path,
+                progress_callback=progress_callback
+            )
+
+            self.regeneration_finished.emit(results)
+
+        except Exception as e:
+            self.regeneration_error.emit(str(e))
+
+
 class PredictView(QWidget):
     def __init__(self, view_instance):
         super(PredictView, self).__init__()
@@ -47,6 +81,7 @@ class PredictView(QWidget):
         self.model = None
         self.output_path = ""
         self.prediction_worker = None  # For background processing
+        self.regeneration_worker = None
 
         self.setup_ui()
 
@@ -219,6 +254,22 @@ class PredictView(QWidget):
         self.style_button(self.predict_button, "secondary")
         self.action_buttons_layout.addWidget(self.predict_button)
 
+        # Re-apply the threshold to a run that kept its raw predictions
+        self.regenerate_button = QPushButton("Apply Threshold to Stored Predictions")
+        self.regenerate_button.setToolTip(
+            "Regenerate reports and annotated media from a .raw file\nusing the current threshold, without running the model")
+        self.regenerate_button.clicked.connect(self.regenerate_outputs)
+        self.style_button(self.regenerate_button, "secondary")
+        self.action_buttons_layout.addWidget(self.regenerate_button)
+
+        # Redraw the annotated media of a run without the model
+        self.render_button = QPushButton("Re-render Outputs")
+        self.render_button.setToolTip(
+            "Redraw annotated images and videos from a detections CSV or .raw file\nwithout running the model")
+        self.render_button.clicked.connect(self.render_outputs)
+        self.style_button(self.render_button, "secondary")
+        self.action_buttons_layout.addWidget(self.render_button)
+
     def update_model_label(self):
         selected_model = self.model_combo_box.currentText()
         self.model_description_label.setText(
@@ -407,6 +458,14 @@ Results saved to: {output_path}"""
                 completion_msg += f"\n\nCSV Files Created:"
                 completion_msg += f"\nDetections: {csv_paths.get('detections', 'N/A')}"
                 completion_msg += f"\nSummary: {csv_paths.get('summary', 'N/A')}"
+                if csv_paths.get('parquet'):
+                    completion_msg += f"\nParquet: {csv_paths['parquet']}"
+                if csv_paths.get('sqlite'):
+                    completion_msg += f"\nSQLite: {csv_paths['sqlite']}"
+                if csv_paths.get('raw'):
+                    completion_msg += f"\nRaw predictions: {csv_paths['raw']}"
+                if csv_paths.get('sequences'):
+                    completion_msg += f"\nSequences: {csv_paths['sequences']}"
 
             QMessageBox.information(
                 self, "Prediction Complete", completion_msg)
@@ -430,6 +489,103 @@ Results saved to: {output_path}"""
         self.predict_button.setEnabled(True)
         self.progress_bar.setVisible(False)
 
+    def regenerate_outputs(self):
+        """Re-apply the current threshold to stored raw predictions"""
+        raw_path, _ = QFileDialog.getOpenFileName(
+            self, "Select Stored Predictions", "",
+            "Raw predictions (*.raw)")
+        if raw_path:
+            self.start_regeneration(
+                raw_path,
+                self.view_instance.presenter.predict_presenter.regenerate_outputs,
+                "Regenerating outputs...")
+
+    def render_outputs(self):
+        """Redraw the annotated media of a run from its stored detections"""
+        store_path, _ = QFileDialog.getOpenFileName(
+            self, "Select Stored Detections", "",
+            "Detections (*.csv *.raw)")
+        if store_path:
+            self.start_regeneration(
+                store_path,
+                self.view_instance.presenter.predict_presenter.render_outputs,
+                "Rendering outputs...")
+
+    def start_regeneration(self, store_path, regenerate, message):
+        """Run a presenter regeneration method in background thread"""
+        if ((self.prediction_worker and self.prediction_worker.isRunning()) or
+                (self.regeneration_worker and self.regeneration_worker.isRunning())):
+            QMessageBox.warning(self, "Prediction Running",
+                                "A prediction is already in progress. Please wait for it to complete.")
+            return
+
+        self.status_label.setText(message)
+        self.progress_bar.setVisible(True)
+        self.progress_bar.setValue(0)
+        self.set_action_buttons_enabled(False)
+
+        self.regeneration_worker = RegenerationWorker(store_path, regenerate)
+        self.regeneration_worker.progress_updated.connect(
+            self.on_progress_updated)
+        self.regeneration_worker.regeneration_finished.connect(
+            self.on_regeneration_finished)
+        self.regeneration_worker.regeneration_error.connect(
+            self.on_regeneration_error)
+        self.regeneration_worker.start()
+
+    def set_action_buttons_enabled(self, enabled):
+        """Enable or disable the buttons that start background work"""
+        self.predict_button.setEnabled(enabled)
+        self.regenerate_button.setEnabled(enabled)
+        self.render_button.setEnabled(enabled)
+
+    def on_regeneration_finished(self, results):
+        """Handle successful regeneration"""
+        try:
+            csv_paths = results.get('csv_paths')
+            summary = results['summary']
+            self.update_progress_bar(1.0)
+
+            if csv_paths:
+                self.status_label.setText(
+                    f"Regenerated {summary['successful_files']} files at threshold {summary['threshold']}")
+                QMessageBox.information(
+                    self, "Outputs Regenerated",
+                    f"""Outputs Regenerated!
+
+Threshold: {summary['threshold']}
+Files: {summary['total_files']}
+Successful: {summary['successful_files']}
+Failed: {summary['failed_files']}
+Total Detections: {summary['total_detections']}
+
+Detections: {csv_paths.get('detections', 'N/A')}
+Summary: {csv_paths.get('summary', 'N/A')}""")
+            else:
+                self.status_label.setText(
+                    f"Rendered {summary['successful_files']} files")
+                QMessageBox.information(
+                    self, "Outputs Rendered",
+                    f"""Outputs Rendered!
+
+Files: {summary['total_files']}
+Successful: {summary['successful_files']}
+Failed: {summary['failed_files']}
+Rendering Time: {summary['total_processing_time_ms']/1000:.2f} seconds""")
+        finally:
+            self.set_action_buttons_enabled(True)
+            self.progress_bar.setVisible(False)
+
+    def on_regeneration_error(self, error_message):
+        """Handle regeneration errors"""
+        self.status_label.setText("Regeneration failed!")
+        QMessageBox.critical(
+            self, "Regeneration Error",
+            f"An error occurred while regenerating outputs:\n{error_message}"
+        )
+        self.set_action_buttons_enabled(True)
+        self.progress_bar.setVisible(False)
+
     def update_progress_bar(self, progress_ratio):
         """Update progress bar with a ratio between 0.0 and 1.0"""
         progress_value = int(progress_ratio * 100)
@@ -601,6 +757,8 @@ Results saved to: {output_path}"""
             self.style_button(self.details_button, "secondary")
             self.style_button(self.select_folder_button, "secondary")
             self.style_button(self.predict_button, "secondary")
+            self.style_button(self.regenerate_button, "secondary")
+            self.style_button(self.render_button, "secondary")
         except AttributeError:
             # Some components might not be created yet
             pass